@@ -13,6 +13,10 @@ if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
 
+# A function instance has no persistent disk and may be frozen before a
+# background flush runs, so audit events are always inserted in the request
+os.environ["AUDIT_WRITE_BEHIND"] = "0"
+
 # Expose FastAPI app for Vercel's Python ASGI runtime
 from fastapi import FastAPI  # noqa: E402
 from app.main import app as backend_app  # noqa: E402
@@ -0,0 +1,341 @@
+"""Async versions of the v2 endpoints, mounted by app.main when DB_ASYNC=1.
+
+Same paths, parameters and responses as the sync handlers in app.main; the
+statements come from app.queries so both paths issue identical SQL.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app import audit
+from app.auth import get_current_operator_async
+from app.database import get_async_db
+from app.models import (
+    Operator, SourceCase, CaseStatusSnapshot as CaseStatusModel, CaseLog as CaseLogModel,
+    AspectFeedback as AspectFeedbackModel,
+)
+from app.queries import (
+    CASE_SUMMARY_COLUMNS, CaseListParams, case_key, case_page_stmt, case_page, profiles_stmt, profile_page,
+    feedback_stmt, default_status, case_etag_stmt, case_with_status_stmt, recent_logs_stmt, case_review, LogQueryParams, logs_stmt, log_page,
+    record_index_stmt, record_text_stmt, record_view, unindexed_record_view,
+    status_stmt, apply_review_submission, review_submission_result,
+    batch_status_keys, statuses_by_key_stmt, insert_default_statuses, batch_status_response,
+)
+from app.archive import archive_files_stmt, archived_log_page
+from app.case_cache import cached_case_response, case_response
+from app.names import key_counts_stmt, name_keys, selective_keys, similar_names, similar_names_stmt
+from app.records import section_ranges
+from app.responses import model_json_response
+from app.search import match_query, search_stmt, search_page
+from app.schemas import (
+    AspectFeedbackSchema, AspectFeedbackCreate,
+    SourceCase as SourceCaseSchema, SourceCaseSummary as SourceCaseSummarySchema, CaseStatusSchema, CaseLogSchema,
+    ProfileSummary as ProfileSummarySchema, CaseReview as CaseReviewSchema,
+    ReviewSubmission, ReviewSubmissionResult, RecordView, SearchHit, SimilarName,
+    BatchCaseStatusRequest, BatchCaseStatusResponse,
+)
+
+router = APIRouter()
+
+
+@router.get("/v2/cases", response_model=List[SourceCaseSchema])
+async def list_cases(
+    response: Response,
+    params: CaseListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    rows = (await db.execute(case_page_stmt(params))).all()
+    return model_json_response(List[SourceCaseSchema], case_page(rows, response, params.limit), response)
+
+
+@router.get("/v2/cases/summary", response_model=List[SourceCaseSummarySchema])
+async def list_case_summaries(
+    response: Response,
+    params: CaseListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    rows = (await db.execute(case_page_stmt(params, CASE_SUMMARY_COLUMNS))).all()
+    return case_page(rows, response, params.limit)
+
+
+@router.get("/v2/profiles", response_model=List[ProfileSummarySchema])
+async def list_profiles(
+    response: Response,
+    updated_since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 200,
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    rows = (await db.execute(profiles_stmt(updated_since, cursor, limit))).all()
+    return profile_page(rows, response, limit)
+
+
+@router.get("/v2/cases/similar-names", response_model=List[SimilarName])
+async def list_similar_names(
+    name: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    min_score: float = Query(0.5, ge=0.0, le=1.0),
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    keys = name_keys(name)
+    keys, scan_limit = selective_keys(keys, dict((await db.execute(key_counts_stmt(keys))).all()))
+    if not keys:
+        return []
+    rows = (await db.execute(similar_names_stmt(keys, limit, scan_limit))).all()
+    return similar_names(name, rows, limit, min_score)
+
+
+@router.get("/v2/search", response_model=List[SearchHit])
+async def search_cases(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    match = match_query(q)
+    if match is None:
+        return []
+    rows = (await db.execute(search_stmt(match, cursor, limit))).all()
+    return search_page(rows, response, limit)
+
+
+@router.get("/v2/cases/{profile_id}/{dj_id}", response_model=SourceCaseSchema)
+async def get_case_detail_v2(
+    profile_id: str,
+    dj_id: str,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    row = (await db.execute(case_etag_stmt(profile_id, dj_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Case not found")
+    cached = cached_case_response(profile_id, dj_id, row.content_hash, if_none_match)
+    if cached is not None:
+        return cached
+    return case_response(await db.get(SourceCase, row.id), if_none_match)
+
+
+@router.get("/v2/cases/{profile_id}/{dj_id}/record", response_model=RecordView)
+async def get_case_record_v2(
+    profile_id: str,
+    dj_id: str,
+    section: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    row = (await db.execute(record_index_stmt(profile_id, dj_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Case not found")
+    case_id, index = row
+    if index is None:
+        view = unindexed_record_view(await db.scalar(record_text_stmt(case_id)), section)
+    else:
+        ranges = section_ranges(index, section) if section is not None else None
+        view = record_view(index, section, ranges, (await db.execute(record_text_stmt(case_id, ranges))).one()) if ranges != [] else None
+    if view is None:
+        raise HTTPException(status_code=404, detail="Section not found")
+    return view
+
+
+@router.get("/v2/cases/{profile_id}/{dj_id}/review", response_model=CaseReviewSchema)
+async def get_case_review_v2(
+    profile_id: str,
+    dj_id: str,
+    log_limit: int = 20,
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    row = (await db.execute(case_with_status_stmt(profile_id, dj_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Case not found")
+    feedback = await db.scalars(feedback_stmt(profile_id, dj_id, current_operator.id))
+    logs = await db.scalars(recent_logs_stmt(profile_id, dj_id, log_limit))
+    return case_review(row[0], row[1], feedback, logs)
+
+
+@router.post("/v2/cases/{profile_id}/{dj_id}/review:submit", response_model=ReviewSubmissionResult)
+async def submit_case_review_v2(
+    profile_id: str,
+    dj_id: str,
+    submission: ReviewSubmission,
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    existing = (await db.scalars(feedback_stmt(profile_id, dj_id, current_operator.id))).all() if submission.feedback else []
+    status = await db.scalar(status_stmt(profile_id, dj_id)) if submission.status is not None else None
+    new_objects, status, logs = apply_review_submission(
+        profile_id, dj_id, current_operator.id, submission, existing, status
+    )
+    db.add_all(new_objects)
+    try:
+        await db.flush()
+        log_ids = [log.id for log in logs]
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Case was updated concurrently; retry the submission")
+    # expire_on_commit is off here, so reload for the server-generated timestamps
+    feedback = (await db.scalars(
+        feedback_stmt(profile_id, dj_id, current_operator.id).execution_options(populate_existing=True)
+    )).all()
+    if status is not None:
+        status = await db.scalar(status_stmt(profile_id, dj_id).execution_options(populate_existing=True))
+    logs = (await db.scalars(
+        select(CaseLogModel).where(CaseLogModel.id.in_(log_ids)).execution_options(populate_existing=True)
+    )).all() if log_ids else []
+    return review_submission_result(status, feedback, logs)
+
+
+@router.get("/v2/cases/{profile_id}/{dj_id}/status", response_model=CaseStatusSchema)
+async def get_case_status_v2(
+    profile_id: str,
+    dj_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    status_query = select(CaseStatusModel).where(case_key(CaseStatusModel, profile_id, dj_id))
+    status = await db.scalar(status_query)
+    if not status:
+        status = default_status(profile_id, dj_id)
+        db.add(status)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent request created it first; the unique case key index rejects the duplicate
+            await db.rollback()
+            return (await db.scalars(status_query)).one()
+        await db.refresh(status)
+    return status
+
+
+@router.patch("/v2/cases/{profile_id}/{dj_id}/status", response_model=CaseStatusSchema)
+async def update_case_status_v2(
+    profile_id: str,
+    dj_id: str,
+    payload: Dict[str, Any],
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    status = await db.scalar(select(CaseStatusModel).where(case_key(CaseStatusModel, profile_id, dj_id)))
+    if not status:
+        status = default_status(profile_id, dj_id)
+        db.add(status)
+    if 'case_status' in payload:
+        status.case_status = payload['case_status']
+    if 'aspects_status' in payload:
+        status.aspects_status = payload['aspects_status']
+    status.last_updated_by = current_operator.id
+    # Inserted in this transaction, or queued once it commits
+    await audit.log_event_async(db, profile_id, dj_id, 'status_change', payload, current_operator.id)
+    await audit.commit(db)
+    await db.refresh(status)
+    return status
+
+
+@router.post("/v2/cases/{profile_id}/{dj_id}/logs", response_model=CaseLogSchema)
+async def append_log_v2(
+    profile_id: str,
+    dj_id: str,
+    payload: Dict[str, Any],
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    return await run_in_threadpool(
+        audit.insert_event, profile_id, dj_id, payload.get('event_type','comment'), payload.get('payload'), current_operator.id
+    )
+
+
+@router.get("/v2/cases/{profile_id}/{dj_id}/logs", response_model=List[CaseLogSchema])
+async def list_case_logs_v2(
+    profile_id: str,
+    dj_id: str,
+    response: Response,
+    params: LogQueryParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    if params.archived:
+        files = (await db.scalars(archive_files_stmt("case_logs", params))).all()
+        return await run_in_threadpool(archived_log_page, files, response, params, profile_id, dj_id)
+    rows = (await db.execute(logs_stmt(params, profile_id, dj_id))).all()
+    return log_page(rows, response, params.limit)
+
+
+@router.get("/v2/logs", response_model=List[CaseLogSchema])
+async def list_logs_v2(
+    response: Response,
+    params: LogQueryParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    if params.archived:
+        files = (await db.scalars(archive_files_stmt("case_logs", params))).all()
+        return await run_in_threadpool(archived_log_page, files, response, params)
+    rows = (await db.execute(logs_stmt(params))).all()
+    return log_page(rows, response, params.limit)
+
+
+@router.post("/v2/cases/{profile_id}/{dj_id}/feedback", response_model=AspectFeedbackSchema)
+async def create_aspect_feedback_v2(
+    profile_id: str,
+    dj_id: str,
+    feedback_data: AspectFeedbackCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    feedback = await db.scalar(feedback_stmt(profile_id, dj_id, current_operator.id, feedback_data.aspect_type))
+    if feedback:
+        for field, value in feedback_data.dict(exclude_unset=True).items():
+            setattr(feedback, field, value)
+    else:
+        feedback = AspectFeedbackModel(
+            profile_unique_id=profile_id,
+            dj_profile_id=dj_id,
+            operator_id=current_operator.id,
+            **feedback_data.dict()
+        )
+        db.add(feedback)
+    await db.commit()
+    await db.refresh(feedback)
+    return feedback
+
+
+@router.get("/v2/cases/{profile_id}/{dj_id}/feedback", response_model=List[AspectFeedbackSchema])
+async def get_aspect_feedback_v2(
+    profile_id: str,
+    dj_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    return (await db.scalars(feedback_stmt(profile_id, dj_id, current_operator.id))).all()
+
+
+@router.post("/v2/cases/status:batch", response_model=BatchCaseStatusResponse)
+async def batch_get_case_status(
+    req: BatchCaseStatusRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_operator: Operator = Depends(get_current_operator_async)
+):
+    if not req.pairs:
+        return {"items": []}
+    keys = batch_status_keys(req)
+    rows = (await db.execute(statuses_by_key_stmt(keys))).all()
+
+    found = {(r.profile_unique_id, r.dj_profile_id) for r in rows}
+    missing = [k for k in keys if k not in found]
+    if missing:
+        await db.execute(insert_default_statuses(missing))
+        await db.commit()
+        rows += (await db.execute(statuses_by_key_stmt(missing))).all()
+    return batch_status_response(req, rows)
@@ -0,0 +1,149 @@
+"""Archive of old ``case_logs`` and ``aspect_feedback`` rows.
+
+scripts/archive_history.py moves rows older than a cutoff out of the database
+into gzipped JSON-lines files under ``ARCHIVE_DIR``, one directory per table
+and month of the row's timestamp::
+
+    case_logs/2024-01/<first id>-<last id>.jsonl.gz
+
+Each file is listed in the ``archive_files`` manifest with its row count,
+timestamp and id range and SHA-256. The manifest row is inserted in the same
+transaction that deletes the file's rows, so every row is either in its table
+or in a listed file. Timestamps are archived as their stored text, so they
+compare and page exactly like the live rows.
+
+The log queries read archived events with ``archived=true``: only the files
+whose time range can hold the requested page are opened.
+
+``aspect_feedback`` holds each operator's current verdict per aspect, upserted
+in place, so age alone does not make it history. Only feedback on cases that
+were closed before the cutoff is archived (see ``archivable``). Open cases
+keep theirs for ``GET .../feedback`` and ``GET .../review``, which do not read
+the archive.
+"""
+import gzip
+import hashlib
+import heapq
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import DateTime, String, and_, select, type_coerce
+
+from app.database import PROJECT_ROOT, Base
+from app.models import ArchiveFile, CaseStatusSnapshot
+from app.pagination import encode_cursor, decode_cursor
+from app.queries import LogQueryParams, case_key, naive_utc
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(PROJECT_ROOT, "archive"))
+
+# Archivable table -> the timestamp column rows are archived by
+ARCHIVED = {"case_logs": "created_at", "aspect_feedback": "updated_at"}
+# Status after which a case's feedback no longer changes
+CLOSED_STATUS = "closed"
+
+
+def stored_text(value: datetime) -> str:
+    """``value`` in the text form SQLAlchemy stores SQLite datetimes in."""
+    return naive_utc(value).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def archivable(table_name: str, cutoff: str):
+    """Condition for rows of ``table_name`` that can be archived at ``cutoff``."""
+    table = Base.metadata.tables[table_name]
+    condition = type_coerce(table.c[ARCHIVED[table_name]], String) < cutoff
+    if table_name == "aspect_feedback":
+        closed = select(CaseStatusSnapshot.id).where(
+            case_key(CaseStatusSnapshot, table.c.profile_unique_id, table.c.dj_profile_id),
+            CaseStatusSnapshot.case_status == CLOSED_STATUS,
+            type_coerce(CaseStatusSnapshot.last_updated_at, String) < cutoff,
+        )
+        condition = and_(condition, closed.exists())
+    return condition
+
+
+def archive_columns(table) -> list:
+    """Columns of ``table`` to archive, with datetimes read as stored text."""
+    return [type_coerce(c, String).label(c.name) if isinstance(c.type, DateTime) else c for c in table.columns]
+
+
+def archive_path(table_name: str, month: str, first_id: int, last_id: int) -> str:
+    return f"{table_name}/{month}/{first_id}-{last_id}.jsonl.gz"
+
+
+def write_archive_file(path: str, rows: Sequence[Dict[str, Any]], directory: Optional[str] = None) -> str:
+    """Write ``rows`` to ``path`` under the archive directory and return the
+    file's SHA-256. The file only appears once fully written and synced."""
+    full = os.path.join(directory or ARCHIVE_DIR, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    tmp = full + ".tmp"
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            for row in rows:
+                f.write((json.dumps(dict(row), separators=(",", ":")) + "\n").encode())
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, full)
+    with open(full, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_archive_file(path: str, directory: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    with gzip.open(os.path.join(directory or ARCHIVE_DIR, path), "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def archive_files_stmt(table_name: str, params: LogQueryParams):
+    """Manifest entries whose time range overlaps the query window, oldest first."""
+    stmt = select(ArchiveFile).where(ArchiveFile.table_name == table_name)
+    if params.since is not None:
+        stmt = stmt.where(ArchiveFile.last_at >= stored_text(params.since))
+    if params.until is not None:
+        stmt = stmt.where(ArchiveFile.first_at < stored_text(params.until))
+    if params.cursor:
+        after_at, _ = decode_cursor(params.cursor, 2)
+        stmt = stmt.where(ArchiveFile.last_at >= after_at)
+    return stmt.order_by(ArchiveFile.first_at, ArchiveFile.id)
+
+
+def archived_log_page(
+    files: Sequence[ArchiveFile],
+    response: Response,
+    params: LogQueryParams,
+    profile_id: Optional[str] = None,
+    dj_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """One page of archived case log events from the ``archive_files_stmt``
+    entries, in the same (created_at, id) order and cursor format as
+    ``logs_stmt``. Files are read oldest first and reading stops once no
+    remaining file can hold an event of the page."""
+    since = stored_text(params.since) if params.since is not None else None
+    until = stored_text(params.until) if params.until is not None else None
+    after = tuple(decode_cursor(params.cursor, 2)) if params.cursor else None
+
+    def wanted(row) -> bool:
+        return (
+            (profile_id is None or (row["profile_unique_id"], row["dj_profile_id"]) == (profile_id, dj_id))
+            and (params.operator_id is None or row["operator_id"] == params.operator_id)
+            and (not params.event_type or row["event_type"] == params.event_type)
+            and (since is None or row["created_at"] >= since)
+            and (until is None or row["created_at"] < until)
+            and (after is None or (row["created_at"], row["id"]) > after)
+        )
+
+    def key(row):
+        return row["created_at"], row["id"]
+
+    page: List[Dict[str, Any]] = []
+    for entry in files:
+        if len(page) == params.limit and entry.first_at > page[-1]["created_at"]:
+            break
+        page = heapq.nsmallest(
+            params.limit, page + [row for row in read_archive_file(entry.path) if wanted(row)], key=key
+        )
+    if len(page) == params.limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(*key(page[-1]))
+    return page
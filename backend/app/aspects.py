@@ -0,0 +1,44 @@
+import json
+import re
+from typing import Any, Dict, Optional
+
+ASPECTS = ('name', 'age', 'nationality', 'risk')
+
+_CITATION = re.compile(r"(\d+):(\d+)")
+
+
+def structure_aspect(aspect_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse one aspect's LLM output into the stored structured form.
+
+    ``aspect_json`` is the text ``sanitize_llm_output`` writes to the
+    ``aspect_*_json`` columns. The result is::
+
+        {"reasoning": str, "verdict": str | None,
+         "claims": [{"statement": str,
+                     "citations": [{"start_line": int, "end_line": int}]}]}
+
+    Text that is not JSON becomes reasoning-only output, as the review page
+    used to render it.
+    """
+    if aspect_json is None:
+        return None
+    try:
+        obj = json.loads(aspect_json)
+    except (TypeError, ValueError):
+        obj = None
+    if not isinstance(obj, dict):
+        return {"reasoning": str(aspect_json), "verdict": None, "claims": []}
+    claims = []
+    for claim in obj.get("claims") or []:
+        statement = claim.get("statement") if isinstance(claim, dict) else str(claim)
+        citations = []
+        for cit in (claim.get("citations") or [] if isinstance(claim, dict) else []):
+            m = _CITATION.search(str(cit))
+            if m:
+                citations.append({"start_line": int(m.group(1)), "end_line": int(m.group(2))})
+        claims.append({"statement": statement or "", "citations": citations})
+    return {
+        "reasoning": obj.get("reasoning") or obj.get("explanation") or "",
+        "verdict": (obj.get("category") or {}).get("verdict"),
+        "claims": claims,
+    }
@@ -0,0 +1,363 @@
+"""Write-behind sink for ``case_logs`` audit events.
+
+``append`` writes the event as a JSON line to a local segment file and
+fsyncs it before returning, so an acknowledged event survives a crash. A
+background thread flushes queued events to the database with one multi-row
+INSERT once ``AUDIT_FLUSH_SIZE`` events are waiting or every
+``AUDIT_FLUSH_SECONDS``, whichever comes first.
+
+Each flush seals the current segment and starts a new one; a sealed segment
+is deleted only after its events are committed. Every event carries a unique
+``event_id`` and is inserted with ``ON CONFLICT DO NOTHING``, so a segment
+replayed after a crash between commit and delete is not written twice.
+
+Each process holds an exclusive ``flock`` on its open segments. On start,
+segments left in ``AUDIT_WAL_DIR`` that nobody holds (a worker that died
+before flushing) are replayed, so several workers can share the directory.
+The sink is started by the app's startup hook, or by the first ``append``
+where startup hooks never run.
+
+The WAL is only as durable as the disk it is on, so write-behind is used
+only when ``AUDIT_WAL_DIR`` names persistent storage shared by restarts of
+the app. Without it (and with ``AUDIT_WRITE_BEHIND=0``, which the
+serverless entry point api/index.py forces) every event is inserted in the
+request.
+
+The event of a state change is part of that change: without write-behind
+it is inserted in the change's transaction; with write-behind it is queued
+once the change has committed, and a change that rolls back is never
+logged. Queued events reach ``case_logs`` up to ``AUDIT_FLUSH_SECONDS``
+after the request returns.
+"""
+import fcntl
+import glob
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import engine
+from app.models import CaseLog, utc_now
+
+# Must be persistent storage: events in it are already acknowledged
+WAL_DIR = os.getenv("AUDIT_WAL_DIR")
+WRITE_BEHIND = WAL_DIR is not None and os.getenv("AUDIT_WRITE_BEHIND", "1") == "1"
+FLUSH_SIZE = int(os.getenv("AUDIT_FLUSH_SIZE", "200"))
+FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "1"))
+
+_INSERT = sqlite_insert(CaseLog.__table__).on_conflict_do_nothing(index_elements=[CaseLog.event_id])
+_INSERT_RETURNING_ID = _INSERT.returning(CaseLog.id)
+
+
+def new_event(profile_id: str, dj_id: str, event_type: str, payload: Optional[Dict[str, Any]], operator_id: Optional[int]) -> Dict[str, Any]:
+    """A ``case_logs`` row with its ``event_id`` and ``created_at`` set here,
+    so the values acknowledged to the client are the ones stored."""
+    return {
+        "event_id": uuid.uuid4().hex,
+        "profile_unique_id": profile_id,
+        "dj_profile_id": dj_id,
+        "event_type": event_type,
+        "payload": payload,
+        "operator_id": operator_id,
+        # Stored as 'YYYY-MM-DD HH:MM:SS.ffffff', like every case_logs row
+        "created_at": utc_now(),
+    }
+
+
+def _encode(event: Dict[str, Any]) -> str:
+    return json.dumps({**event, "created_at": event["created_at"].isoformat()}, separators=(",", ":")) + "\n"
+
+
+def _decode(line: str) -> Dict[str, Any]:
+    event = json.loads(line)
+    event["created_at"] = datetime.fromisoformat(event["created_at"])
+    return event
+
+
+class Segment:
+    """One append-only WAL file, exclusively locked while this process owns it."""
+
+    def __init__(self, path: str, file, events: Optional[List[Dict[str, Any]]] = None):
+        self.path = path
+        self.file = file
+        self.events = events if events is not None else []
+
+    @classmethod
+    def create(cls, directory: str) -> "Segment":
+        path = os.path.join(directory, f"audit-{os.getpid()}-{uuid.uuid4().hex}.wal")
+        file = open(path, "a", encoding="utf-8")
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        return cls(path, file)
+
+    @classmethod
+    def claim(cls, path: str) -> Optional["Segment"]:
+        """Lock and read a segment left by a dead process; None while another
+        process still holds it."""
+        try:
+            file = open(path, "r+", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return None
+        if not os.path.exists(path):
+            # Replayed and deleted by another process while we waited
+            file.close()
+            return None
+        events = []
+        for line in file:
+            # A torn last line was never acknowledged
+            if line.endswith("\n"):
+                events.append(_decode(line))
+        return cls(path, file, events)
+
+    def write(self, event: Dict[str, Any]) -> None:
+        self.file.write(_encode(event))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.events.append(event)
+
+    def remove(self) -> None:
+        os.unlink(self.path)
+        self.file.close()
+
+
+class AuditSink:
+    def __init__(self, directory: Optional[str] = WAL_DIR, flush_size: int = FLUSH_SIZE, flush_seconds: float = FLUSH_SECONDS):
+        self.directory = directory
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.appended = 0
+        self.flushed = 0
+        self.batches = 0
+        self.flush_failures = 0
+        self.replayed = 0
+        self._current: Optional[Segment] = None
+        self._sealed: List[Segment] = []
+        # Guards the current segment; appends take only this one
+        self._lock = threading.Lock()
+        # Serialises flushes (background thread, shutdown, tests)
+        self._flush_lock = threading.Lock()
+        # Serialises start/stop, including the lazy start in ``append``
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Replay orphaned segments, then start accepting and flushing events."""
+        with self._start_lock:
+            if self._thread is None:
+                self._start()
+
+    def _start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._current = Segment.create(self.directory)
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.wal"))):
+            if path == self._current.path:
+                continue
+            segment = Segment.claim(path)
+            if segment is None:
+                continue
+            self.replayed += len(segment.events)
+            with self._flush_lock:
+                self._sealed.append(segment)
+        self.flush()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name="audit-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write out everything still queued."""
+        with self._start_lock:
+            if self._thread is not None:
+                self._stop_flusher()
+
+    def _stop_flusher(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        with self._lock:
+            if self._current is not None:
+                # Anything appended during the final flush is replayed on restart
+                if self._current.events:
+                    self._current.file.close()
+                else:
+                    self._current.remove()
+            self._current = None
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Durably queue ``event``; returns once it is fsynced to the WAL.
+        Starts the sink if no startup hook has."""
+        if self._thread is None:
+            self.start()
+        with self._lock:
+            if self._current is None:
+                raise RuntimeError("Audit sink is stopped")
+            self._current.write(event)
+            self.appended += 1
+            full = len(self._current.events) >= self.flush_size
+        if full:
+            self._wake.set()
+
+    def _seal(self) -> None:
+        with self._lock:
+            if self._current is None or not self._current.events:
+                return
+            self._sealed.append(self._current)
+            self._current = Segment.create(self.directory)
+
+    def flush(self) -> int:
+        """Insert every queued event now; returns how many were written."""
+        with self._flush_lock:
+            self._seal()
+            written = 0
+            while self._sealed:
+                segment = self._sealed[0]
+                try:
+                    if segment.events:
+                        with engine.begin() as conn:
+                            conn.execute(_INSERT, segment.events)
+                except Exception as e:
+                    # Keep the segment; the next flush retries it
+                    self.flush_failures += 1
+                    print(f"Audit log flush failed: {e}")
+                    break
+                segment.remove()
+                self._sealed.pop(0)
+                written += len(segment.events)
+                self.batches += 1
+            self.flushed += written
+            return written
+
+    def _flush_loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            if not self._stop.is_set():
+                self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = len(self._current.events) if self._current is not None else 0
+        queued += sum(len(s.events) for s in list(self._sealed))
+        return {
+            "enabled": True,
+            "queued": queued,
+            "appended": self.appended,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "flush_failures": self.flush_failures,
+            "replayed": self.replayed,
+        }
+
+
+sink = AuditSink()
+
+
+def start() -> None:
+    if WRITE_BEHIND:
+        sink.start()
+
+
+def stop() -> None:
+    if WRITE_BEHIND:
+        sink.stop()
+
+
+def stats() -> dict:
+    return sink.stats() if WRITE_BEHIND else {"enabled": False}
+
+
+# session.info keys: events of uncommitted changes, queued on the sink once
+# the session commits (sync sessions: the listener below; async: ``commit``)
+_PENDING = "audit_pending"
+_PENDING_ASYNC = "audit_pending_async"
+
+
+def insert_event(
+    profile_id: str,
+    dj_id: str,
+    event_type: str,
+    payload: Optional[Dict[str, Any]],
+    operator_id: Optional[int],
+) -> Dict[str, Any]:
+    """Insert a ``case_logs`` event now, on its own transaction; returns the
+    stored row values including its ``id``."""
+    event = new_event(profile_id, dj_id, event_type, payload, operator_id)
+    with engine.begin() as conn:
+        event["id"] = conn.execute(_INSERT_RETURNING_ID, event).scalar()
+    return event
+
+
+def log_event(
+    profile_id: str,
+    dj_id: str,
+    event_type: str,
+    payload: Optional[Dict[str, Any]],
+    operator_id: Optional[int],
+    db: Session,
+) -> None:
+    """Record the event of a change the caller is about to commit on ``db``.
+
+    Without write-behind the row is inserted in that transaction. With it
+    the event is held on the session and queued on the sink after the
+    commit succeeds; a rollback discards it. Its ``event_id`` makes a
+    replayed event idempotent.
+    """
+    event = new_event(profile_id, dj_id, event_type, payload, operator_id)
+    if WRITE_BEHIND:
+        db.info.setdefault(_PENDING, []).append(event)
+    else:
+        db.execute(_INSERT, event)
+
+
+async def log_event_async(
+    db: AsyncSession,
+    profile_id: str,
+    dj_id: str,
+    event_type: str,
+    payload: Optional[Dict[str, Any]],
+    operator_id: Optional[int],
+) -> None:
+    """``log_event`` for a change on an ``AsyncSession``; commit it with
+    ``commit`` so queued events reach the sink."""
+    event = new_event(profile_id, dj_id, event_type, payload, operator_id)
+    if WRITE_BEHIND:
+        db.sync_session.info.setdefault(_PENDING_ASYNC, []).append(event)
+    else:
+        await db.execute(_INSERT, event)
+
+
+async def commit(db: AsyncSession) -> None:
+    """Commit ``db``, then queue the events ``log_event_async`` held for it.
+    The WAL fsync blocks, so it runs off the event loop."""
+    events = db.sync_session.info.pop(_PENDING_ASYNC, [])
+    await db.commit()
+    for event in events:
+        await run_in_threadpool(sink.append, event)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _queue_committed_events(session: Session) -> None:
+    for event in session.info.pop(_PENDING, ()):
+        sink.append(event)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_events(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+    session.info.pop(_PENDING_ASYNC, None)
@@ -1,21 +1,40 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from starlette.concurrency import run_in_threadpool
+from app.cache import TTLCache
+from app.database import get_async_db, get_db
 from app.models import Operator
+from app.passwords import pwd_context, verify_password_async
 import os
+import time
+import uuid
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Operator identity per (token subject, token id), so authenticated requests
+# skip the operators lookup; invalidate_operator() drops an operator's entries.
+# Changes committed through any Session of this process invalidate them (see
+# the listeners below); the TTL bounds how long other workers or scripts that
+# edit operators can be served the old row.
+operator_cache = TTLCache(
+    maxsize=int(os.getenv("OPERATOR_CACHE_MAX_SIZE", "1024")),
+    ttl=float(os.getenv("OPERATOR_CACHE_TTL_SECONDS", "10")),
+)
+# session.info key: emails of operators changed in the open transaction, or
+# None in the set when a bulk UPDATE/DELETE may have changed any of them
+_CHANGED_OPERATORS = "changed_operators"
+_OPERATOR_FIELDS = ("id", "name", "email", "password_hash", "role", "created_at")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -28,40 +47,124 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[str]:
+def decode_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+        if payload.get("sub") is None:
             return None
-        return email
+        return payload
     except JWTError:
         return None
 
+def verify_token(token: str) -> Optional[str]:
+    payload = decode_token(token)
+    return payload["sub"] if payload else None
+
+def invalidate_operator(email: str) -> None:
+    """Forget cached identities for ``email``; call after the operator is
+    registered, changed or deleted."""
+    operator_cache.invalidate(lambda key: key[0] == email)
+
+def _note_changed(session: Optional[Session], *emails: Optional[str]) -> None:
+    if session is not None:
+        session.info.setdefault(_CHANGED_OPERATORS, set()).update(emails)
+
+@event.listens_for(Operator, "after_update")
+@event.listens_for(Operator, "after_delete")
+def _operator_changed(mapper, connection, target: Operator) -> None:
+    # Both the old and the new email when the email itself changed
+    history = inspect(target).attrs.email.history
+    _note_changed(object_session(target), target.email, *history.deleted)
+
+@event.listens_for(Session, "do_orm_execute")
+def _operators_bulk_changed(orm_execute_state) -> None:
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper is inspect(Operator):
+        _note_changed(orm_execute_state.session, None)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_operators(session: Session) -> None:
+    # Only after commit: invalidating at flush would let a concurrent request
+    # re-cache the still-committed old row
+    changed = session.info.pop(_CHANGED_OPERATORS, None)
+    if not changed:
+        return
+    if None in changed:
+        operator_cache.clear()
+        return
+    for email in changed:
+        invalidate_operator(email)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_operators(session: Session) -> None:
+    session.info.pop(_CHANGED_OPERATORS, None)
+
 def get_current_operator(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> Operator:
     token = credentials.credentials
-    email = verify_token(token)
-    if email is None:
+    payload = decode_token(token)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    operator = db.query(Operator).filter(Operator.email == email).first()
+    email = payload["sub"]
+
+    operator = _cached_operator(payload)
+    if operator is None:
+        operator = _remember_operator(payload, db.query(Operator).filter(Operator.email == email).first())
+    # Lets app.replica attribute this request's commits for read-your-writes
+    db.info["operator_id"] = operator.id
+    return operator
+
+async def get_current_operator_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Operator:
+    """``get_current_operator`` on the async session, for app.api_async."""
+    payload = decode_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    cached = _cached_operator(payload)
+    if cached is not None:
+        return cached
+
+    operator = await db.scalar(select(Operator).where(Operator.email == payload["sub"]))
+    return _remember_operator(payload, operator)
+
+def _cached_operator(payload: dict) -> Optional[Operator]:
+    cached = operator_cache.get((payload["sub"], payload.get("jti")))
+    if cached is None:
+        return None
+    # A fresh transient copy, so no request can mutate the shared entry
+    return Operator(**cached)
+
+def _remember_operator(payload: dict, operator: Optional[Operator]) -> Operator:
     if operator is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Operator not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Never cache past the token's own expiry
+    expires_at = time.monotonic() + (payload["exp"] - time.time()) if "exp" in payload else None
+    operator_cache.set(
+        (payload["sub"], payload.get("jti")),
+        {f: getattr(operator, f) for f in _OPERATOR_FIELDS},
+        expires_at=expires_at,
+    )
     return operator
 
 def authenticate_operator(db: Session, email: str, password: str) -> Optional[Operator]:
@@ -70,4 +173,16 @@ def authenticate_operator(db: Session, email: str, password: str) -> Optional[Op
         return None
     if not verify_password(password, operator.password_hash):
         return None
-    return operator
\ No newline at end of file
+    return operator
+
+async def authenticate_operator_async(db: Session, email: str, password: str) -> Optional[Operator]:
+    """``authenticate_operator`` for async handlers: the lookup runs in the
+    threadpool and the bcrypt check in the password-hashing process pool."""
+    operator = await run_in_threadpool(
+        lambda: db.query(Operator).filter(Operator.email == email).first()
+    )
+    if not operator:
+        return None
+    if not await verify_password_async(password, operator.password_hash):
+        return None
+    return operator
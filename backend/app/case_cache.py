@@ -0,0 +1,86 @@
+"""HTTP caching of ``GET /v2/cases/{profile_id}/{dj_id}``.
+
+A case only changes when it is re-ingested, so the ingest paths store a
+``content_hash`` of its stored columns and the detail endpoint serves it as a
+strong ETag:
+
+* the hash is read through the ``(profile_unique_id, dj_profile_id,
+  content_hash)`` index without touching the row, and a matching
+  ``If-None-Match`` gets a 304;
+* otherwise the serialised response body is looked up in ``case_cache`` by
+  ``(profile_id, dj_id, etag)``, so the record text is neither re-read nor
+  re-serialised while the case is unchanged.
+
+Rows ingested before ``content_hash`` existed are hashed on request until
+scripts/migrate_aspects.py has backfilled them.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+
+from app.cache import TTLCache
+from app.schemas import SourceCase as SourceCaseSchema
+
+# Columns that make up a case's content; every one can change on re-ingest
+HASHED_COLUMNS = (
+    "profile_unique_id", "dj_profile_id", "reference_id", "profile_info", "structured_record", "record_index",
+    "hit_record", "candidate_name", "final_score",
+    "aspect_name_json", "aspect_age_json", "aspect_nationality_json", "aspect_risk_json",
+    "aspect_name", "aspect_age", "aspect_nationality", "aspect_risk",
+)
+
+MAX_AGE = int(os.getenv("CASE_CACHE_MAX_AGE", "0"))
+CACHE_CONTROL = f"private, max-age={MAX_AGE}, must-revalidate"
+
+case_cache = TTLCache(
+    maxsize=int(os.getenv("CASE_CACHE_MAX_SIZE", "1024")),
+    ttl=float(os.getenv("CASE_CACHE_TTL_SECONDS", "3600")),
+)
+
+
+def content_hash(values: Mapping[str, Any]) -> str:
+    """Hash of the ``HASHED_COLUMNS`` of a case, from a dict or a row."""
+    get = values.get if isinstance(values, Mapping) else lambda c: getattr(values, c)
+    canonical = json.dumps({c: get(c) for c in HASHED_COLUMNS}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for ``If-None-Match``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+def _headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def cached_case_response(profile_id: str, dj_id: str, stored_hash: Optional[str], if_none_match: Optional[str]) -> Optional[Response]:
+    """A 304 or the cached body for a case whose hash is known; None when
+    the row has to be loaded."""
+    if stored_hash is None:
+        return None
+    etag = f'"{stored_hash}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_headers(etag))
+    body = case_cache.get((profile_id, dj_id, etag))
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json", headers=_headers(etag))
+
+
+def case_response(case, if_none_match: Optional[str]) -> Response:
+    """Serialise a loaded case, keep the bytes in ``case_cache`` and return them."""
+    etag = f'"{case.content_hash or content_hash(case)}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_headers(etag))
+    body = SourceCaseSchema.model_validate(case, from_attributes=True).model_dump_json().encode()
+    case_cache.set((case.profile_unique_id, case.dj_profile_id, etag), body)
+    return Response(content=body, media_type="application/json", headers=_headers(etag))
@@ -0,0 +1,181 @@
+"""Negotiated response compression.
+
+``CompressionMiddleware`` compresses JSON and text responses of at least
+``COMPRESSION_MIN_SIZE`` bytes with the best encoding the client accepts:
+brotli when the ``brotli`` package is installed, otherwise gzip.
+
+A compressed body is a different representation of the same resource, so a
+strong ``ETag`` is weakened (``W/"…"``) on it and on 304s to clients that
+negotiated an encoding. ``If-None-Match`` uses weak comparison, so either
+form revalidates. Bodies that carry a strong ETag are the same bytes until
+the tag changes. Their compressed form is kept in ``compressed_cache`` and
+not recompressed for every client.
+"""
+import os
+import zlib
+from typing import Callable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Whole bodies at least this large are compressed off the event loop
+THREADPOOL_SIZE = 64 * 1024
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+# Server preference among the encodings a client accepts
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+compressed_cache = TTLCache(
+    maxsize=int(os.getenv("COMPRESSION_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("COMPRESSION_CACHE_TTL_SECONDS", "3600")),
+)
+_counters = {"responses": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The preferred encoding ``accept_encoding`` allows, if any."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[token.strip()] = q
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def encoder(encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """``(compress, finish)`` functions of a streaming compressor."""
+    if encoding == "br":
+        c = brotli.Compressor(quality=BROTLI_QUALITY)
+        return c.process, c.finish
+    c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return c.compress, c.flush
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    process, finish = encoder(encoding)
+    return process(body) + finish()
+
+
+def _weaken_etag(headers: MutableHeaders) -> Optional[str]:
+    """Weaken a strong ETag in place; returns the strong tag."""
+    etag = headers.get("etag")
+    if etag is None or etag.startswith("W/"):
+        return None
+    headers["etag"] = "W/" + etag
+    return etag
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+            if encoding is not None:
+                await _Responder(self.app, encoding, self.minimum_size)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _Responder:
+    """Compresses one response. The start message is held back until the
+    first body message shows whether the response is worth compressing."""
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.path = ""
+        self.send: Send = None
+        self.start: Optional[Message] = None
+        self.stream: Optional[Tuple[Callable[[bytes], bytes], Callable[[], bytes]]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.path = scope["path"]
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            if start["status"] == 304:
+                _weaken_etag(headers)
+                headers.add_vary_header("Accept-Encoding")
+            elif self._compressible(headers) and (more_body or len(body) >= self.minimum_size):
+                headers["Content-Encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = _weaken_etag(headers)
+                if more_body:
+                    del headers["Content-Length"]
+                    self.stream = encoder(self.encoding)
+                    message["body"] = self.stream[0](body)
+                else:
+                    message["body"] = await self._compress_whole(body, etag)
+                    headers["Content-Length"] = str(len(message["body"]))
+            await self.send(start)
+        elif self.stream is not None:
+            process, finish = self.stream
+            message["body"] = process(body) + (b"" if more_body else finish())
+        await self.send(message)
+
+    @staticmethod
+    def _compressible(headers: MutableHeaders) -> bool:
+        return "content-encoding" not in headers and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    async def _compress_whole(self, body: bytes, etag: Optional[str]) -> bytes:
+        key = (self.path, etag, self.encoding) if etag else None
+        compressed = compressed_cache.get(key) if key else None
+        if compressed is None:
+            if len(body) >= THREADPOOL_SIZE:
+                compressed = await run_in_threadpool(compress, body, self.encoding)
+            else:
+                compressed = compress(body, self.encoding)
+            if key:
+                compressed_cache.set(key, compressed)
+        _counters["responses"] += 1
+        _counters["bytes_in"] += len(body)
+        _counters["bytes_out"] += len(compressed)
+        return compressed
+
+
+def stats() -> dict:
+    bytes_in = _counters["bytes_in"]
+    return {
+        "encodings": list(ENCODINGS),
+        "min_size": MIN_SIZE,
+        **_counters,
+        "ratio": _counters["bytes_out"] / bytes_in if bytes_in else None,
+        "cache": compressed_cache.stats(),
+    }
@@ -1,9 +1,18 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DisconnectionError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
 load_dotenv()
 
 # Resolve project root (backend directory) and read optional Turso info
@@ -25,6 +34,101 @@ def _read_db_info_file(path: str):
         pass
     return endpoint, token
 
+# Pool sizing; the defaults suit one uvicorn worker
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Only ping connections that sat idle at least this long, instead of a
+# round-trip on every checkout
+PRE_PING_IDLE_SECONDS = float(os.getenv("DB_PRE_PING_IDLE_SECONDS", "30"))
+
+# Local SQLite tuning, applied to every new connection
+SQLITE_PRAGMAS = {
+    # Readers no longer block behind the single writer
+    "journal_mode": "WAL",
+    # Durable at checkpoints, without an fsync per commit; safe under WAL
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative = KiB rather than pages
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536")),
+}
+
+
+class PoolStats:
+    """Time request sessions spent checking out their connection, for
+    /metrics. Measured by ``checkout``/``checkout_async`` in the session
+    dependencies, through the public Session API only."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_ms_total": self.total_wait * 1000,
+                "wait_ms_avg": self.total_wait * 1000 / self.checkouts if self.checkouts else 0.0,
+                "wait_ms_max": self.max_wait * 1000,
+            }
+
+
+pool_stats = PoolStats()
+
+
+def _pool_args(poolclass) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": POOL_SIZE,
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        # JSON columns are parsed on every row read; orjson does it several
+        # times faster than json.loads. Writes keep the stdlib serializer.
+        **({"json_deserializer": orjson.loads} if orjson is not None else {}),
+    }
+
+
+def _ping_after_idle(engine) -> None:
+    """Pre-ping, but only connections idle for ``PRE_PING_IDLE_SECONDS``."""
+
+    @event.listens_for(engine, "checkin")
+    def _checked_in(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checked_out(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < PRE_PING_IDLE_SECONDS:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception as exc:
+            # The pool discards this connection and retries with a new one
+            raise DisconnectionError() from exc
+
+
+def _apply_sqlite_pragmas(engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
 # Minimal, robust engine construction per Turso guidance
 raw_url = os.getenv("TURSO_DATABASE_URL") or ""
 auth_token = os.getenv("TURSO_AUTH_TOKEN") or os.getenv("LIBSQL_AUTH_TOKEN")
@@ -39,7 +143,12 @@ if file_token and not auth_token:
 # Default local SQLite
 if not raw_url:
     DATABASE_URL = "sqlite:///./aml_screening.db"
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **_pool_args(QueuePool),
+    )
+    _apply_sqlite_pragmas(engine)
 else:
     # Expect libsql remote url
     if not raw_url.startswith("libsql://"):
@@ -59,16 +168,82 @@ else:
     engine = create_engine(
         sa_url,
         connect_args={"auth_token": auth_token} if auth_token else {},
-        pool_pre_ping=True,
+        **_pool_args(QueuePool),
     )
+_ping_after_idle(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional async path (DB_ASYNC=1): the v2 handlers in app.api_async await the
+# database instead of holding a threadpool thread per in-flight query.
+ASYNC_DB = os.getenv("DB_ASYNC", "0") in ("1", "true", "True")
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    # sqlalchemy-libsql has no async dialect, so a Turso database needs an
+    # explicit async URL (e.g. a local embedded replica via sqlite+aiosqlite)
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+    if not ASYNC_DATABASE_URL:
+        if raw_url:
+            raise ValueError("DB_ASYNC with TURSO_DATABASE_URL requires ASYNC_DATABASE_URL")
+        ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./aml_screening.db"
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_args(AsyncAdaptedQueuePool))
+    if async_engine.dialect.name == "sqlite" and not raw_url:
+        _apply_sqlite_pragmas(async_engine.sync_engine)
+    _ping_after_idle(async_engine.sync_engine)
+    # Handlers refresh what they return, so nothing needs expiring on commit
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Optional read replica (READ_REPLICA_PATH): a local SQLite file kept in sync
+# with the primary by app.replica; read-only endpoints query it instead of
+# crossing the WAN to Turso.
+READ_REPLICA_PATH = os.getenv("READ_REPLICA_PATH")
+replica_engine = None
+ReplicaSessionLocal = None
+if READ_REPLICA_PATH:
+    replica_engine = create_engine(
+        f"sqlite:///{READ_REPLICA_PATH}",
+        connect_args={"check_same_thread": False},
+        **_pool_args(QueuePool),
+    )
+    _apply_sqlite_pragmas(replica_engine)
+
+    @event.listens_for(replica_engine, "connect")
+    def _query_only(dbapi_connection, connection_record):
+        # Only app.replica's sync writes the replica file
+        dbapi_connection.execute("PRAGMA query_only=1")
+
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
 Base = declarative_base()
 
+def checkout(db) -> None:
+    """Check out ``db``'s connection now rather than on its first query,
+    recording the wait (pool queue, pre-ping, connect) in ``pool_stats``."""
+    started = time.perf_counter()
+    try:
+        db.connection()
+    finally:
+        pool_stats.record(time.perf_counter() - started)
+
+async def checkout_async(db) -> None:
+    started = time.perf_counter()
+    try:
+        await db.connection()
+    finally:
+        pool_stats.record(time.perf_counter() - started)
+
 def get_db():
     db = SessionLocal()
     try:
+        checkout(db)
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        await checkout_async(db)
+        yield db
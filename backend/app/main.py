@@ -1,22 +1,43 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import APIRouter, FastAPI, Depends, Header, HTTPException, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 import os
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import timedelta, datetime
 from typing import Dict, Any, Optional, List
 
-from app.database import get_db, engine
-from app.models import Operator
+from app.database import ASYNC_DB, async_engine, get_db, engine, pool_stats
+from app.models import ArchiveFile, NameKey, NameKeyCount, Operator, ensure_columns, ensure_indexes
+from app.queries import (
+    CASE_SUMMARY_COLUMNS, CaseListParams, case_page_stmt, case_page, profiles_stmt, profile_page,
+    case_etag_stmt, case_with_status_stmt, feedback_stmt, recent_logs_stmt, case_review, LogQueryParams, logs_stmt, log_page,
+    record_index_stmt, record_text_stmt, record_view, unindexed_record_view,
+    status_stmt, apply_review_submission, review_submission_result,
+    batch_status_keys, statuses_by_key_stmt, insert_default_statuses, batch_status_response,
+)
 from app.schemas import (
     OperatorCreate, Operator as OperatorSchema, LoginRequest, Token,
     AspectFeedbackSchema, AspectFeedbackCreate,
-    SourceCase as SourceCaseSchema, CaseStatusSchema, CaseLogSchema,
-    BatchCaseStatusRequest, BatchCaseStatusResponse, BatchCaseStatusResponseItem
+    SourceCase as SourceCaseSchema, SourceCaseSummary as SourceCaseSummarySchema, CaseStatusSchema, CaseLogSchema,
+    ProfileSummary as ProfileSummarySchema, CaseReview as CaseReviewSchema,
+    ReviewSubmission, ReviewSubmissionResult, RecordView, SearchHit, SimilarName,
+    BatchCaseStatusRequest, BatchCaseStatusResponse
 )
+from app import audit, compression, passwords, replica
+from app.archive import archive_files_stmt, archived_log_page
+from app.case_cache import cached_case_response, case_cache, case_response
+from app.compression import CompressionMiddleware
+from app.names import key_counts_stmt, name_keys, selective_keys, similar_names, similar_names_stmt
+from app.records import section_ranges
+from app.responses import FastJSONResponse, model_json_response
+from app.search import ensure_search_index, match_query, search_stmt, search_page
+from app.replica import ReadYourWritesMiddleware, get_read_db
 from app.auth import (
-    authenticate_operator, create_access_token, get_current_operator,
-    get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES
+    authenticate_operator_async, create_access_token, get_current_operator,
+    invalidate_operator, operator_cache, ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from app.models import SourceCase, CaseStatusSnapshot as CaseStatusModel, CaseLog as CaseLogModel, AspectFeedback as AspectFeedbackModel
 
@@ -27,14 +48,22 @@ for table in [
     CaseStatusModel.__table__,
     AspectFeedbackModel.__table__,
     CaseLogModel.__table__,
+    NameKey.__table__,
+    NameKeyCount.__table__,
+    ArchiveFile.__table__,
 ]:
     try:
         table.create(bind=engine, checkfirst=True)
     except Exception:
         # Silently continue if creation fails due to race or perms
         pass
+# Existing databases predate the composite (profile_unique_id, dj_profile_id)
+# indexes, the structured aspect columns and the full-text index
+ensure_columns(engine)
+ensure_indexes(engine)
+ensure_search_index(engine)
 
-app = FastAPI(title="AML Screening API", version="1.0.0")
+app = FastAPI(title="AML Screening API", version="1.0.0", default_response_class=FastJSONResponse)
 
 origins = os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
 app.add_middleware(
@@ -43,12 +72,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+
+
+@app.on_event("startup")
+def start_read_replica():
+    replica.start()
+
+
+@app.on_event("startup")
+def start_audit_sink():
+    # Replays audit events left queued by a previous run
+    audit.start()
+
+
+@app.on_event("shutdown")
+def stop_audit_sink():
+    audit.stop()
+
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    passwords.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_read_replica():
+    replica.stop()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    # aiosqlite connections run on non-daemon threads; close them so the
+    # process can exit
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # Authentication endpoints
+# Async so bcrypt awaits the password process pool instead of holding a worker thread
 @app.post("/auth/login", response_model=Token)
-def login(login_request: LoginRequest, db: Session = Depends(get_db)):
-    operator = authenticate_operator(db, login_request.email, login_request.password)
+async def login(login_request: LoginRequest, db: Session = Depends(get_db)):
+    operator = await authenticate_operator_async(db, login_request.email, login_request.password)
     if not operator:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,21 +129,27 @@ def login(login_request: LoginRequest, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/auth/register", response_model=OperatorSchema)
-def register(operator_data: OperatorCreate, db: Session = Depends(get_db)):
-    db_operator = db.query(Operator).filter(Operator.email == operator_data.email).first()
+async def register(operator_data: OperatorCreate, db: Session = Depends(get_db)):
+    db_operator = await run_in_threadpool(
+        lambda: db.query(Operator).filter(Operator.email == operator_data.email).first()
+    )
     if db_operator:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(operator_data.password)
+    hashed_password = await passwords.get_password_hash_async(operator_data.password)
     db_operator = Operator(
         name=operator_data.name,
         email=operator_data.email,
         password_hash=hashed_password,
         role=operator_data.role
     )
-    db.add(db_operator)
-    db.commit()
-    db.refresh(db_operator)
+
+    def save():
+        db.add(db_operator)
+        db.commit()
+        db.refresh(db_operator)
+    await run_in_threadpool(save)
+    invalidate_operator(db_operator.email)
     return db_operator
 
 @app.get("/auth/me", response_model=OperatorSchema)
@@ -86,35 +159,191 @@ def get_current_user(current_operator: Operator = Depends(get_current_operator))
 # v1 endpoints removed
 
 # v2 endpoints ---------------------------------------------------------------
+# Registered on a router so DB_ASYNC can swap in app.api_async (see bottom)
+
+v2 = APIRouter()
 
-@app.get("/v2/cases", response_model=List[SourceCaseSchema])
+
+@v2.get("/v2/cases", response_model=List[SourceCaseSchema])
 def list_cases(
-    profile_unique_id: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 50,
-    db: Session = Depends(get_db),
+    response: Response,
+    params: CaseListParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_operator: Operator = Depends(get_current_operator)
 ):
-    q = db.query(SourceCase)
-    if profile_unique_id:
-        q = q.filter(SourceCase.profile_unique_id == profile_unique_id)
-    return q.offset(skip).limit(limit).all()
+    """List full cases; see ``case_page_stmt`` for ordering and the cursor."""
+    rows = db.execute(case_page_stmt(params)).all()
+    return model_json_response(List[SourceCaseSchema], case_page(rows, response, params.limit), response)
+
 
+@v2.get("/v2/cases/summary", response_model=List[SourceCaseSummarySchema])
+def list_case_summaries(
+    response: Response,
+    params: CaseListParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """Same filters and cursor as ``GET /v2/cases``, selecting only the list
+    columns; full records come from ``GET /v2/cases/{profile_id}/{dj_id}``."""
+    rows = db.execute(case_page_stmt(params, CASE_SUMMARY_COLUMNS)).all()
+    return case_page(rows, response, params.limit)
 
-@app.get("/v2/cases/{profile_id}/{dj_id}", response_model=SourceCaseSchema)
+
+@v2.get("/v2/profiles", response_model=List[ProfileSummarySchema])
+def list_profiles(
+    response: Response,
+    updated_since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 200,
+    db: Session = Depends(get_read_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """Distinct profiles with per-profile hit and review counts.
+
+    Ordered by profile_unique_id with the same ``X-Next-Cursor`` paging as the
+    case lists. ``updated_since`` returns only profiles with a case ingested or
+    a status changed at or after that second, so clients can fetch deltas.
+    """
+    rows = db.execute(profiles_stmt(updated_since, cursor, limit)).all()
+    return profile_page(rows, response, limit)
+
+
+@v2.get("/v2/cases/similar-names", response_model=List[SimilarName])
+def list_similar_names(
+    name: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    min_score: float = Query(0.5, ge=0.0, le=1.0),
+    db: Session = Depends(get_read_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """Cases whose candidate name looks like ``name`` (spelling variants,
+    transliterations, reordered tokens), best ``score`` first. Two indexed
+    statements: per-key case counts, then the candidates sharing the most
+    of the rarest keys."""
+    keys = name_keys(name)
+    keys, scan_limit = selective_keys(keys, dict(db.execute(key_counts_stmt(keys)).all()))
+    if not keys:
+        return []
+    rows = db.execute(similar_names_stmt(keys, limit, scan_limit)).all()
+    return similar_names(name, rows, limit, min_score)
+
+
+@v2.get("/v2/search", response_model=List[SearchHit])
+def search_cases(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """Cases whose candidate name, record or aspect reasoning contain every
+    word of ``q``, best match first, each with a highlighted snippet.
+    Follow ``X-Next-Cursor`` for further pages."""
+    match = match_query(q)
+    if match is None:
+        return []
+    rows = db.execute(search_stmt(match, cursor, limit)).all()
+    return search_page(rows, response, limit)
+
+
+@v2.get("/v2/cases/{profile_id}/{dj_id}", response_model=SourceCaseSchema)
 def get_case_detail_v2(
     profile_id: str,
     dj_id: str,
-    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
     current_operator: Operator = Depends(get_current_operator)
 ):
-    case = db.query(SourceCase).filter(SourceCase.profile_unique_id == profile_id, SourceCase.dj_profile_id == dj_id).first()
-    if not case:
+    """The case with a strong ``ETag``; ``If-None-Match`` with the current tag
+    gets a 304. Unchanged cases are answered from the in-process cache."""
+    row = db.execute(case_etag_stmt(profile_id, dj_id)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Case not found")
-    return case
+    cached = cached_case_response(profile_id, dj_id, row.content_hash, if_none_match)
+    if cached is not None:
+        return cached
+    return case_response(db.get(SourceCase, row.id), if_none_match)
 
 
-@app.get("/v2/cases/{profile_id}/{dj_id}/status", response_model=CaseStatusSchema)
+@v2.get("/v2/cases/{profile_id}/{dj_id}/record", response_model=RecordView)
+def get_case_record_v2(
+    profile_id: str,
+    dj_id: str,
+    section: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """The structured_record's section index plus the lines of one
+    ``section`` (all lines without it). The section is cut out with
+    ``substr`` using offsets stored at ingest."""
+    row = db.execute(record_index_stmt(profile_id, dj_id)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Case not found")
+    case_id, index = row
+    if index is None:
+        view = unindexed_record_view(db.scalar(record_text_stmt(case_id)), section)
+    else:
+        ranges = section_ranges(index, section) if section is not None else None
+        view = record_view(index, section, ranges, db.execute(record_text_stmt(case_id, ranges)).one()) if ranges != [] else None
+    if view is None:
+        raise HTTPException(status_code=404, detail="Section not found")
+    return view
+
+
+@v2.get("/v2/cases/{profile_id}/{dj_id}/review", response_model=CaseReviewSchema)
+def get_case_review_v2(
+    profile_id: str,
+    dj_id: str,
+    log_limit: int = 20,
+    db: Session = Depends(get_read_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """The case, its status, this operator's feedback and the newest
+    ``log_limit`` log entries in three indexed queries. Read-only: a case
+    nobody has opened yet has a null status rather than a new default row."""
+    row = db.execute(case_with_status_stmt(profile_id, dj_id)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Case not found")
+    feedback = db.scalars(feedback_stmt(profile_id, dj_id, current_operator.id))
+    logs = db.scalars(recent_logs_stmt(profile_id, dj_id, log_limit))
+    return case_review(row[0], row[1], feedback, logs)
+
+
+@v2.post("/v2/cases/{profile_id}/{dj_id}/review:submit", response_model=ReviewSubmissionResult)
+def submit_case_review_v2(
+    profile_id: str,
+    dj_id: str,
+    submission: ReviewSubmission,
+    db: Session = Depends(get_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """Apply feedback upserts, a status change and log events atomically with
+    one commit. Returns the status, all of this operator's feedback for the
+    case and the new log entries."""
+    existing = db.scalars(feedback_stmt(profile_id, dj_id, current_operator.id)).all() if submission.feedback else []
+    status = db.scalar(status_stmt(profile_id, dj_id)) if submission.status is not None else None
+    new_objects, status, logs = apply_review_submission(
+        profile_id, dj_id, current_operator.id, submission, existing, status
+    )
+    db.add_all(new_objects)
+    try:
+        db.flush()
+        log_ids = [log.id for log in logs]
+        db.commit()
+    except IntegrityError:
+        # Another request created the status row first; nothing was applied
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Case was updated concurrently; retry the submission")
+    # One read per table for the server-generated ids and timestamps
+    feedback = db.scalars(feedback_stmt(profile_id, dj_id, current_operator.id)).all()
+    if status is not None:
+        status = db.scalar(status_stmt(profile_id, dj_id))
+    logs = db.scalars(select(CaseLogModel).where(CaseLogModel.id.in_(log_ids))).all() if log_ids else []
+    return review_submission_result(status, feedback, logs)
+
+
+@v2.get("/v2/cases/{profile_id}/{dj_id}/status", response_model=CaseStatusSchema)
 def get_case_status_v2(
     profile_id: str,
     dj_id: str,
@@ -126,12 +355,17 @@ def get_case_status_v2(
         # initialize default
         status = CaseStatusModel(profile_unique_id=profile_id, dj_profile_id=dj_id, case_status="unreviewed", aspects_status={})
         db.add(status)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request created it first; the unique case key index rejects the duplicate
+            db.rollback()
+            return db.query(CaseStatusModel).filter(CaseStatusModel.profile_unique_id == profile_id, CaseStatusModel.dj_profile_id == dj_id).one()
         db.refresh(status)
     return status
 
 
-@app.patch("/v2/cases/{profile_id}/{dj_id}/status", response_model=CaseStatusSchema)
+@v2.patch("/v2/cases/{profile_id}/{dj_id}/status", response_model=CaseStatusSchema)
 def update_case_status_v2(
     profile_id: str,
     dj_id: str,
@@ -150,33 +384,63 @@ def update_case_status_v2(
         status.aspects_status = payload['aspects_status']
     status.last_updated_by = current_operator.id
     db.add(status)
-    # Log
-    db.add(CaseLogModel(profile_unique_id=profile_id, dj_profile_id=dj_id, event_type='status_change', payload=payload, operator_id=current_operator.id))
+    # Inserted in this transaction, or queued once it commits
+    audit.log_event(profile_id, dj_id, 'status_change', payload, current_operator.id, db)
     db.commit()
     db.refresh(status)
     return status
 
 
-@app.post("/v2/cases/{profile_id}/{dj_id}/logs", response_model=CaseLogSchema)
+@v2.post("/v2/cases/{profile_id}/{dj_id}/logs", response_model=CaseLogSchema)
 def append_log_v2(
     profile_id: str,
     dj_id: str,
     payload: Dict[str, Any],
-    db: Session = Depends(get_db),
     current_operator: Operator = Depends(get_current_operator)
 ):
-    log = CaseLogModel(profile_unique_id=profile_id, dj_profile_id=dj_id, event_type=payload.get('event_type','comment'), payload=payload.get('payload'), operator_id=current_operator.id)
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
+    return audit.insert_event(profile_id, dj_id, payload.get('event_type','comment'), payload.get('payload'), current_operator.id)
+
+
+@v2.get("/v2/cases/{profile_id}/{dj_id}/logs", response_model=List[CaseLogSchema])
+def list_case_logs_v2(
+    profile_id: str,
+    dj_id: str,
+    response: Response,
+    params: LogQueryParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """The case's log events oldest first, optionally filtered by operator,
+    event type and a ``since``/``until`` window. Follow ``X-Next-Cursor`` for
+    further pages. Events still queued in the audit sink are not included."""
+    if params.archived:
+        files = db.scalars(archive_files_stmt("case_logs", params)).all()
+        return archived_log_page(files, response, params, profile_id, dj_id)
+    rows = db.execute(logs_stmt(params, profile_id, dj_id)).all()
+    return log_page(rows, response, params.limit)
+
+
+@v2.get("/v2/logs", response_model=List[CaseLogSchema])
+def list_logs_v2(
+    response: Response,
+    params: LogQueryParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_operator: Operator = Depends(get_current_operator)
+):
+    """Log events across all cases, with the same filters and paging as the
+    per-case list; e.g. one operator's activity over a week."""
+    if params.archived:
+        files = db.scalars(archive_files_stmt("case_logs", params)).all()
+        return archived_log_page(files, response, params)
+    rows = db.execute(logs_stmt(params)).all()
+    return log_page(rows, response, params.limit)
 
 # v1 endpoints removed
 
 # v1 endpoints removed
 
 # Aspect Feedback endpoints
-@app.post("/v2/cases/{profile_id}/{dj_id}/feedback", response_model=AspectFeedbackSchema)
+@v2.post("/v2/cases/{profile_id}/{dj_id}/feedback", response_model=AspectFeedbackSchema)
 def create_aspect_feedback_v2(
     profile_id: str,
     dj_id: str,
@@ -212,11 +476,11 @@ def create_aspect_feedback_v2(
         db.refresh(db_feedback)
         return db_feedback
 
-@app.get("/v2/cases/{profile_id}/{dj_id}/feedback", response_model=List[AspectFeedbackSchema])
+@v2.get("/v2/cases/{profile_id}/{dj_id}/feedback", response_model=List[AspectFeedbackSchema])
 def get_aspect_feedback_v2(
     profile_id: str,
     dj_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_operator: Operator = Depends(get_current_operator)
 ):
     feedback = db.query(AspectFeedbackModel).filter(
@@ -231,47 +495,61 @@ def root():
     return {"message": "AML Screening API is running"}
 
 
+@app.get("/metrics")
+def get_metrics(current_operator: Operator = Depends(get_current_operator)):
+    """In-process performance counters for this worker."""
+    return {
+        "operator_cache": operator_cache.stats(),
+        "case_cache": case_cache.stats(),
+        "compression": compression.stats(),
+        "read_replica": replica.stats(),
+        "audit_log": audit.stats(),
+        "db_pool": {
+            **pool_stats.snapshot(),
+            "checked_out": engine.pool.checkedout(),
+            "overflow": engine.pool.overflow(),
+            "status": engine.pool.status(),
+            "async_status": async_engine.pool.status() if async_engine is not None else None,
+        },
+    }
+
+
 # Batch endpoints --------------------------------------------------------------
 
-@app.post("/v2/cases/status:batch", response_model=BatchCaseStatusResponse)
+@v2.post("/v2/cases/status:batch", response_model=BatchCaseStatusResponse)
 def batch_get_case_status(
     req: BatchCaseStatusRequest,
     db: Session = Depends(get_db),
     current_operator: Operator = Depends(get_current_operator)
 ):
-    # Build map for quick lookup
-    keys = [(p.profile_unique_id, p.dj_profile_id) for p in req.pairs]
-    if not keys:
+    if not req.pairs:
         return {"items": []}
+    keys = batch_status_keys(req)
+    rows = db.execute(statuses_by_key_stmt(keys)).all()
 
-    # Fetch all statuses in one query
-    statuses = db.query(CaseStatusModel).filter(
-        CaseStatusModel.profile_unique_id.in_([k[0] for k in keys]),
-    ).all()
+    found = {(r.profile_unique_id, r.dj_profile_id) for r in rows}
+    missing = [k for k in keys if k not in found]
+    if missing:
+        # Initialize all missing defaults with one insert in one transaction
+        db.execute(insert_default_statuses(missing))
+        db.commit()
+        rows += db.execute(statuses_by_key_stmt(missing)).all()
+    return batch_status_response(req, rows)
 
-    # Index by tuple
-    status_map = {(s.profile_unique_id, s.dj_profile_id): s for s in statuses}
-
-    items: List[BatchCaseStatusResponseItem] = []
-    for key in keys:
-        existing = status_map.get(key)
-        if not existing:
-            # initialize default
-            existing = CaseStatusModel(
-                profile_unique_id=key[0],
-                dj_profile_id=key[1],
-                case_status="unreviewed",
-                aspects_status={},
-            )
-            db.add(existing)
-            db.commit()
-            db.refresh(existing)
-        # Ensure proper Pydantic v2 serialization from ORM
-        serialized_status = CaseStatusSchema.model_validate(existing, from_attributes=True)
-        items.append(BatchCaseStatusResponseItem(
-            profile_unique_id=key[0],
-            dj_profile_id=key[1],
-            status=serialized_status,
-        ))
-
-    return {"items": items}
\ No newline at end of file
+
+def _include_v2(app: FastAPI) -> None:
+    """Mount the v2 API. With DB_ASYNC the async handlers serve every route
+    they implement and the sync ones above cover the rest."""
+    if not ASYNC_DB:
+        app.include_router(v2)
+        return
+    from app.api_async import router as async_v2
+
+    app.include_router(async_v2)
+    served = {(r.path, m) for r in async_v2.routes for m in r.methods}
+    fallback = APIRouter()
+    fallback.routes = [r for r in v2.routes if not any((r.path, m) in served for m in r.methods)]
+    app.include_router(fallback)
+
+
+_include_v2(app)
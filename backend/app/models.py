@@ -1,7 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float, Index, inspect
 from sqlalchemy.sql import func
+from app.aspects import ASPECTS, structure_aspect
 from app.database import Base
+from datetime import datetime, timezone
 from enum import Enum
+import uuid
+
+
+def utc_now() -> datetime:
+    """Now as the naive UTC the timestamps are stored in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 class OperatorRole(str, Enum):
@@ -25,9 +33,16 @@ class Operator(Base):
 
 class SourceCase(Base):
     __tablename__ = "source_cases"
+    __table_args__ = (
+        Index("ix_source_cases_case_key", "profile_unique_id", "dj_profile_id", unique=True),
+        # Keyset pagination order for GET /v2/cases
+        Index("ix_source_cases_created_id", "created_at", "id"),
+        # The same order within one profile for GET /v2/cases?profile_unique_id
+        Index("ix_source_cases_profile_created", "profile_unique_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    profile_unique_id = Column(String, index=True, nullable=False)
+    profile_unique_id = Column(String, nullable=False)
     dj_profile_id = Column(String, index=True, nullable=False)
     reference_id = Column(String, nullable=True)
     profile_info = Column(JSON, nullable=True)
@@ -39,11 +54,42 @@ class SourceCase(Base):
     aspect_age_json = Column(Text, nullable=True)
     aspect_nationality_json = Column(Text, nullable=True)
     aspect_risk_json = Column(Text, nullable=True)
+    # Parsed once at ingest by app.aspects.structure_aspect. None is stored
+    # as SQL NULL (not JSON 'null') so the ingest upserts' coalesce keeps the
+    # previous value
+    aspect_name = Column(JSON(none_as_null=True), nullable=True)
+    aspect_age = Column(JSON(none_as_null=True), nullable=True)
+    aspect_nationality = Column(JSON(none_as_null=True), nullable=True)
+    aspect_risk = Column(JSON(none_as_null=True), nullable=True)
+    # Section/line index of structured_record from app.records.index_record
+    record_index = Column(JSON(none_as_null=True), nullable=True)
+    # app.case_cache.content_hash of the stored content, set at ingest
+    content_hash = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    @property
+    def aspects(self) -> dict:
+        """Structured output per aspect; rows not yet backfilled by
+        scripts/migrate_aspects.py are parsed from the text column."""
+        return {
+            aspect: getattr(self, f"aspect_{aspect}") or structure_aspect(getattr(self, f"aspect_{aspect}_json"))
+            for aspect in ASPECTS
+        }
+
+
+# NOCASE so the case-insensitive LIKE 'prefix%' filter on /v2/cases can use it
+Index("ix_source_cases_candidate_name_nocase", SourceCase.candidate_name.collate("NOCASE"))
+
 
 class CaseStatusSnapshot(Base):
     __tablename__ = "case_status"
+    __table_args__ = (
+        Index("ix_case_status_case_key", "profile_unique_id", "dj_profile_id", unique=True),
+        # Finds profiles with status changes for /v2/profiles?updated_since
+        Index("ix_case_status_last_updated_at", "last_updated_at"),
+        # GET /v2/cases?case_status: the case keys with a given status
+        Index("ix_case_status_status_key", "case_status", "profile_unique_id", "dj_profile_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     profile_unique_id = Column(String, index=True, nullable=False)
@@ -56,6 +102,12 @@ class CaseStatusSnapshot(Base):
 
 class AspectFeedback(Base):
     __tablename__ = "aspect_feedback"
+    __table_args__ = (
+        # operator_id before aspect_type so the per-operator feedback list uses the same index
+        Index("ix_aspect_feedback_case_operator_aspect", "profile_unique_id", "dj_profile_id", "operator_id", "aspect_type"),
+        # Oldest-first walk of scripts/archive_history.py
+        Index("ix_aspect_feedback_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     profile_unique_id = Column(String, index=True, nullable=False)
@@ -70,13 +122,121 @@ class AspectFeedback(Base):
     operator_id = Column(Integer, nullable=False)
 
 
+class NameKey(Base):
+    """Fuzzy-match keys of a case's candidate_name (see app.names)."""
+    __tablename__ = "name_keys"
+    __table_args__ = (
+        Index("ix_name_keys_source_case_id", "source_case_id"),
+        {"sqlite_with_rowid": False},
+    )
+
+    key = Column(String, primary_key=True)
+    source_case_id = Column(Integer, primary_key=True)
+
+
+class NameKeyCount(Base):
+    """Number of cases holding each name key, kept by app.names.write_name_keys."""
+    __tablename__ = "name_key_counts"
+    __table_args__ = ({"sqlite_with_rowid": False},)
+
+    key = Column(String, primary_key=True)
+    cases = Column(Integer, nullable=False)
+
+
 class CaseLog(Base):
     __tablename__ = "case_logs"
+    __table_args__ = (
+        Index("ix_case_logs_case_created", "profile_unique_id", "dj_profile_id", "created_at"),
+        # GET /v2/logs: one index per leading filter, each in (created_at, id)
+        # order. The operator index also holds event_type, so an operator's
+        # events of one type are filtered without reading the rows.
+        Index("ix_case_logs_operator_created", "operator_id", "created_at", "id", "event_type"),
+        Index("ix_case_logs_type_created", "event_type", "created_at"),
+        Index("ix_case_logs_created", "created_at"),
+        # Makes replaying the audit WAL idempotent (app.audit)
+        Index("ix_case_logs_event_id", "event_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     profile_unique_id = Column(String, index=True, nullable=False)
     dj_profile_id = Column(String, index=True, nullable=False)
     event_type = Column(String, nullable=False)
     payload = Column(JSON, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    operator_id = Column(Integer, nullable=True)
\ No newline at end of file
+    # Set in Python, like app.audit events, so every row is stored as
+    # 'YYYY-MM-DD HH:MM:SS.ffffff' and the keyset cursors and archive cutoffs
+    # compare one text format
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now())
+    operator_id = Column(Integer, nullable=True)
+    event_id = Column(String, nullable=True, default=lambda: uuid.uuid4().hex)
+
+
+class ArchiveFile(Base):
+    """Manifest of archive files written by scripts/archive_history.py (see app.archive)."""
+    __tablename__ = "archive_files"
+    __table_args__ = (
+        Index("ix_archive_files_table_first", "table_name", "first_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    month = Column(String, nullable=False)
+    # Relative to ARCHIVE_DIR
+    path = Column(String, unique=True, nullable=False)
+    rows = Column(Integer, nullable=False)
+    # Range of the archived timestamp column, as stored text
+    first_at = Column(String, nullable=False)
+    last_at = Column(String, nullable=False)
+    first_id = Column(Integer, nullable=False)
+    last_id = Column(Integer, nullable=False)
+    sha256 = Column(String, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Indexes no longer declared, dropped from existing databases
+RETIRED_INDEXES = (
+    # Duplicated ix_source_cases_case_key plus content_hash
+    "ix_source_cases_case_hash",
+    # A prefix of ix_source_cases_profile_created
+    "ix_source_cases_profile_unique_id",
+)
+
+
+def ensure_indexes(bind) -> None:
+    """Create any declared index missing from an existing database, and drop
+    the ``RETIRED_INDEXES``.
+
+    ``create_all``/``Table.create(checkfirst=True)`` skip tables that already
+    exist, so databases created before an index was declared never get it.
+    A unique index blocked by duplicate rows is reported and skipped.
+    """
+    with bind.begin() as conn:
+        for name in RETIRED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=bind, checkfirst=True)
+            except Exception as e:
+                print(f"Could not create index {index.name} on {table.name}: {e}")
+
+
+def ensure_columns(bind) -> None:
+    """Add declared nullable columns missing from an existing database.
+
+    Like indexes, columns added to a model after its table was created are
+    not picked up by ``create_all``; SQLite can add them in place.
+    """
+    existing_tables = set(inspect(bind).get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {c["name"] for c in inspect(bind).get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            try:
+                with bind.begin() as conn:
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            except Exception as e:
+                print(f"Could not add column {column.name} to {table.name}: {e}")
@@ -0,0 +1,190 @@
+"""Fuzzy candidate-name matching backed by the ``name_keys`` table.
+
+Each case's ``candidate_name`` is reduced to a set of keys at ingest:
+character trigrams of every token (spelling and transliteration variants
+share most of them) and a Soundex code per Latin token (Mohammed / Muhammad /
+Mohamed all give M530). Tokens are handled as a set, so reordered names
+match too. Names in other scripts (Cyrillic, Arabic, CJK, ...) keep their
+letters and are matched on trigrams alone.
+
+A lookup reads how many cases hold each query key from ``name_key_counts``
+and keeps the rarest keys up to ``POSTINGS_BUDGET`` index entries in total;
+trigrams of very common first names say little about similarity. The cases
+sharing the most of those keys are found through the
+``(key, source_case_id)`` primary key and that short list is scored exactly.
+"""
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, desc, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models import NameKey, NameKeyCount, SourceCase
+from app.schemas import SimilarName
+
+# Cases fetched from the index per requested result before exact scoring
+CANDIDATES_PER_RESULT = 10
+# Index entries a lookup may read to find candidates
+POSTINGS_BUDGET = 20000
+
+_SOUNDEX = {c: str(d) for d, letters in enumerate(("aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r")) for c in letters}
+# Latin letters that NFKD does not split into a base letter and an accent
+_LATIN_FOLD = str.maketrans({"ł": "l", "ø": "o", "đ": "d", "ħ": "h", "ı": "i", "æ": "ae", "œ": "oe", "þ": "th", "ð": "d"})
+
+
+def name_tokens(name: Optional[str]) -> List[str]:
+    """Case-folded tokens of ``name`` with accents and punctuation removed.
+
+    Accented letters fold to their base letter (José, Łukasz, Арсений ->
+    арсении); letters of other scripts are kept, not dropped.
+    """
+    if not name:
+        return []
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).translate(_LATIN_FOLD)
+    # NFKD splits Hangul syllables into jamo; NFC puts them back together
+    cleaned = "".join(c if c.isalnum() else " " for c in unicodedata.normalize("NFC", folded))
+    return sorted(set(cleaned.split()))
+
+
+def phonetic_tokens(tokens: Iterable[str]) -> List[str]:
+    """The tokens Soundex applies to: those written in ASCII."""
+    return [t for t in tokens if t.isascii()]
+
+
+def soundex(token: str) -> str:
+    letters = [c for c in token if c.isalpha()]
+    if not letters:
+        return token
+    code = letters[0].upper()
+    last = _SOUNDEX.get(letters[0], "")
+    for c in letters[1:]:
+        digit = _SOUNDEX.get(c, "")
+        if digit not in ("", "0") and digit != last:
+            code += digit
+        if c not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+
+def trigrams(tokens: Iterable[str]) -> Set[str]:
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def name_keys(name: Optional[str]) -> Set[str]:
+    """Index keys for ``name``: ``g:`` trigrams and ``s:`` Soundex codes."""
+    tokens = name_tokens(name)
+    return {f"g:{g}" for g in trigrams(tokens)} | {f"s:{soundex(t)}" for t in phonetic_tokens(tokens)}
+
+
+def similarity(query: str, candidate: Optional[str]) -> float:
+    """0..1 score: the mean of the trigram Dice coefficient and the share of
+    query tokens with a Soundex match among the candidate's tokens. A query
+    with no Latin tokens is scored on the Dice coefficient alone."""
+    q_tokens, c_tokens = name_tokens(query), name_tokens(candidate)
+    if not q_tokens or not c_tokens:
+        return 0.0
+    q_grams, c_grams = trigrams(q_tokens), trigrams(c_tokens)
+    dice = 2 * len(q_grams & c_grams) / (len(q_grams) + len(c_grams))
+    q_phonetic = phonetic_tokens(q_tokens)
+    if not q_phonetic:
+        return dice
+    c_codes = {soundex(t) for t in phonetic_tokens(c_tokens)}
+    phonetic = sum(soundex(t) in c_codes for t in q_phonetic) / len(q_phonetic)
+    return (dice + phonetic) / 2
+
+
+_COUNT_UPSERT = sqlite_insert(NameKeyCount.__table__)
+_COUNT_UPSERT = _COUNT_UPSERT.on_conflict_do_update(
+    index_elements=[NameKeyCount.key], set_={"cases": NameKeyCount.cases + _COUNT_UPSERT.excluded.cases}
+)
+
+
+def write_name_keys(db, cases: Sequence[Tuple[int, Optional[str]]]) -> None:
+    """Replace the index keys of ``(source_case_id, candidate_name)`` pairs
+    and adjust ``name_key_counts`` by the difference."""
+    if not cases:
+        return
+    ids = [case_id for case_id, _ in cases]
+    delta = Counter()
+    for key, held in db.execute(
+        select(NameKey.key, func.count()).where(NameKey.source_case_id.in_(ids)).group_by(NameKey.key)
+    ):
+        delta[key] -= held
+    db.execute(delete(NameKey).where(NameKey.source_case_id.in_(ids)))
+    rows = [{"key": key, "source_case_id": case_id} for case_id, name in cases for key in name_keys(name)]
+    if rows:
+        db.execute(insert(NameKey), rows)
+    for row in rows:
+        delta[row["key"]] += 1
+    changed = [{"key": key, "cases": n} for key, n in delta.items() if n]
+    if changed:
+        db.execute(_COUNT_UPSERT, changed)
+
+
+def key_counts_stmt(keys: Iterable[str]):
+    return select(NameKeyCount.key, NameKeyCount.cases).where(NameKeyCount.key.in_(list(keys)))
+
+
+def selective_keys(keys: Iterable[str], counts: Dict[str, int]) -> Tuple[List[str], Optional[int]]:
+    """The rarest ``keys`` whose cases add up to at most ``POSTINGS_BUDGET``,
+    and a cap on index entries to read.
+
+    The rarest key is always used; when it alone is over budget (a lone very
+    common name) only ``POSTINGS_BUDGET`` of its entries are read.
+    """
+    chosen, total = [], 0
+    for key in sorted((k for k in keys if counts.get(k)), key=lambda k: (counts[k], k)):
+        if chosen and total + counts[key] > POSTINGS_BUDGET:
+            break
+        chosen.append(key)
+        total += counts[key]
+    return chosen, POSTINGS_BUDGET if total > POSTINGS_BUDGET else None
+
+
+def similar_names_stmt(keys: Sequence[str], limit: int, scan_limit: Optional[int] = None):
+    """Cases sharing the most ``keys`` with the query, best first; at most
+    ``limit * CANDIDATES_PER_RESULT`` of them for ``similar_names`` to score."""
+    matched = select(NameKey.source_case_id).where(NameKey.key.in_(keys))
+    if scan_limit is not None:
+        matched = matched.limit(scan_limit)
+    matched = matched.subquery()
+    shared = (
+        select(matched.c.source_case_id, func.count().label("shared"))
+        .group_by(matched.c.source_case_id)
+        .order_by(desc("shared"), matched.c.source_case_id)
+        .limit(limit * CANDIDATES_PER_RESULT)
+        .subquery()
+    )
+    return (
+        select(
+            SourceCase.profile_unique_id,
+            SourceCase.dj_profile_id,
+            SourceCase.candidate_name,
+            SourceCase.final_score,
+        )
+        .join(shared, SourceCase.id == shared.c.source_case_id)
+    )
+
+
+def similar_names(name: str, rows, limit: int, min_score: float) -> List[SimilarName]:
+    scored = [
+        (similarity(name, row.candidate_name), row) for row in rows
+    ]
+    scored = [(score, row) for score, row in scored if score >= min_score]
+    scored.sort(key=lambda item: (-item[0], item[1].candidate_name or "", item[1].profile_unique_id, item[1].dj_profile_id))
+    return [
+        SimilarName(
+            profile_unique_id=row.profile_unique_id,
+            dj_profile_id=row.dj_profile_id,
+            candidate_name=row.candidate_name,
+            final_score=row.final_score,
+            score=round(score, 4),
+        )
+        for score, row in scored[:limit]
+    ]
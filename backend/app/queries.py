@@ -0,0 +1,428 @@
+"""Statements shared by the sync and async v2 handlers.
+
+Each builder returns a SQLAlchemy 2.0 ``select``/``insert`` that runs unchanged
+on a ``Session`` or an ``AsyncSession``; the handlers only differ in whether
+they ``await`` the execution.
+"""
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import DateTime, String, and_, case, func, literal, or_, select, true, tuple_, type_coerce, union
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import load_only
+
+from app.models import (
+    SourceCase, CaseStatusSnapshot as CaseStatusModel, AspectFeedback as AspectFeedbackModel, CaseLog as CaseLogModel,
+)
+from app.pagination import encode_cursor, decode_cursor, like_prefix
+from app.records import index_record, section_ranges
+from app.responses import FastJSONResponse
+from app.schemas import (
+    BatchCaseStatusRequest, CaseStatusSchema, CaseReview as CaseReviewSchema,
+    ReviewSubmission, ReviewSubmissionResult,
+    ProfileSummary as ProfileSummarySchema, RecordView,
+)
+
+
+class CaseListParams:
+    """Filter and keyset pagination query parameters shared by the case lists."""
+
+    def __init__(
+        self,
+        profile_unique_id: Optional[str] = None,
+        case_status: Optional[str] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        candidate_name: Optional[str] = None,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ):
+        self.profile_unique_id = profile_unique_id
+        self.case_status = case_status
+        self.min_score = min_score
+        self.max_score = max_score
+        self.candidate_name = candidate_name
+        self.cursor = cursor
+        self.skip = skip
+        self.limit = limit
+
+
+class LogQueryParams:
+    """Filters and keyset pagination for the case log queries. ``since`` is
+    inclusive and ``until`` exclusive. ``archived`` reads the events moved
+    out by scripts/archive_history.py instead of the table."""
+
+    def __init__(
+        self,
+        operator_id: Optional[int] = None,
+        event_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=1000),
+        archived: bool = False,
+    ):
+        self.operator_id = operator_id
+        self.event_type = event_type
+        self.since = since
+        self.until = until
+        self.cursor = cursor
+        self.limit = limit
+        self.archived = archived
+
+
+# GET /v2/cases/summary projection; full records come from the case detail
+CASE_SUMMARY_COLUMNS = load_only(
+    SourceCase.id,
+    SourceCase.profile_unique_id,
+    SourceCase.dj_profile_id,
+    SourceCase.reference_id,
+    SourceCase.profile_info,
+    SourceCase.candidate_name,
+    SourceCase.final_score,
+    SourceCase.created_at,
+)
+
+
+def case_key(model, profile_id: str, dj_id: str):
+    return and_(model.profile_unique_id == profile_id, model.dj_profile_id == dj_id)
+
+
+def case_page_stmt(params: CaseListParams, *options):
+    """A case list query in stable (created_at, id) order.
+
+    Selects ``(SourceCase, created_at as text)``; pass the rows to
+    ``case_page`` for the cursor. ``skip`` is only honoured without a cursor,
+    for older clients. ``options`` are loader options such as ``load_only``
+    for projections.
+    """
+    # Compare created_at as stored text so cursor values round-trip exactly
+    created_at_key = type_coerce(SourceCase.created_at, String)
+    stmt = select(SourceCase, created_at_key.label("created_at_key"))
+    if options:
+        stmt = stmt.options(*options)
+    if params.profile_unique_id:
+        stmt = stmt.where(SourceCase.profile_unique_id == params.profile_unique_id)
+    if params.case_status:
+        stmt = stmt.outerjoin(CaseStatusModel, and_(
+            CaseStatusModel.profile_unique_id == SourceCase.profile_unique_id,
+            CaseStatusModel.dj_profile_id == SourceCase.dj_profile_id,
+        ))
+        if params.case_status == "unreviewed":
+            # Cases nobody has opened yet have no status row
+            stmt = stmt.where(or_(CaseStatusModel.case_status == params.case_status, CaseStatusModel.id.is_(None)))
+        else:
+            stmt = stmt.where(CaseStatusModel.case_status == params.case_status)
+    if params.min_score is not None:
+        stmt = stmt.where(SourceCase.final_score >= params.min_score)
+    if params.max_score is not None:
+        stmt = stmt.where(SourceCase.final_score <= params.max_score)
+    if params.candidate_name:
+        stmt = stmt.where(SourceCase.candidate_name.like(like_prefix(params.candidate_name), escape="\\"))
+    if params.cursor:
+        after_created_at, after_id = decode_cursor(params.cursor, 2)
+        stmt = stmt.where(tuple_(created_at_key, SourceCase.id) > tuple_(after_created_at, after_id))
+    elif params.skip:
+        stmt = stmt.offset(params.skip)
+    return stmt.order_by(created_at_key, SourceCase.id).limit(params.limit)
+
+
+def case_page(rows, response: Response, limit: int) -> List[SourceCase]:
+    """Cases from ``case_page_stmt`` rows. When a full page is returned the
+    ``X-Next-Cursor`` header carries the cursor for the next one."""
+    if rows and len(rows) == limit:
+        last_case, last_created_at = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last_created_at, last_case.id)
+    return [case for case, _ in rows]
+
+
+def naive_utc(value: datetime) -> datetime:
+    """``value`` as the naive UTC the timestamps are stored in."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def profiles_stmt(updated_since: Optional[datetime], cursor: Optional[str], limit: int):
+    """Per-profile hit and review counts ordered by profile_unique_id."""
+    status_join = and_(
+        CaseStatusModel.profile_unique_id == SourceCase.profile_unique_id,
+        CaseStatusModel.dj_profile_id == SourceCase.dj_profile_id,
+    )
+    unreviewed = or_(CaseStatusModel.id.is_(None), CaseStatusModel.case_status == "unreviewed")
+    stmt = (
+        select(
+            SourceCase.profile_unique_id,
+            func.count(SourceCase.id).label("hit_count"),
+            func.max(SourceCase.final_score).label("max_final_score"),
+            func.sum(case((unreviewed, 0), else_=1)).label("reviewed_count"),
+            func.sum(case((unreviewed, 1), else_=0)).label("unreviewed_count"),
+            func.max(func.max(
+                func.coalesce(SourceCase.created_at, ""), func.coalesce(CaseStatusModel.last_updated_at, "")
+            ), type_=DateTime).label("last_updated_at"),
+        )
+        .outerjoin(CaseStatusModel, status_join)
+        .group_by(SourceCase.profile_unique_id)
+    )
+    if updated_since is not None:
+        # server_default=func.now() stores whole seconds, so a change in the
+        # cursor's own second sorts before the fractional cursor as text.
+        # Compare from the start of that second instead; the profiles changed
+        # in it are sent again, once each.
+        since = naive_utc(updated_since).strftime("%Y-%m-%d %H:%M:%S")
+        changed = union(
+            select(SourceCase.profile_unique_id).where(type_coerce(SourceCase.created_at, String) >= since),
+            select(CaseStatusModel.profile_unique_id).where(
+                type_coerce(CaseStatusModel.last_updated_at, String) >= since
+            ),
+        )
+        stmt = stmt.where(SourceCase.profile_unique_id.in_(changed))
+    if cursor:
+        (after_profile,) = decode_cursor(cursor, 1)
+        stmt = stmt.where(SourceCase.profile_unique_id > after_profile)
+    return stmt.order_by(SourceCase.profile_unique_id).limit(limit)
+
+
+def profile_page(rows, response: Response, limit: int) -> List[ProfileSummarySchema]:
+    if rows and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].profile_unique_id)
+    return [ProfileSummarySchema.model_validate(r, from_attributes=True) for r in rows]
+
+
+def feedback_stmt(profile_id: str, dj_id: str, operator_id: int, aspect_type: Optional[str] = None):
+    stmt = select(AspectFeedbackModel).where(
+        case_key(AspectFeedbackModel, profile_id, dj_id),
+        AspectFeedbackModel.operator_id == operator_id,
+    )
+    if aspect_type is not None:
+        stmt = stmt.where(AspectFeedbackModel.aspect_type == aspect_type)
+    return stmt
+
+
+def case_etag_stmt(profile_id: str, dj_id: str):
+    """Id and content hash of a case, without loading its columns into the
+    ORM: one lookup through the unique case-key index."""
+    return select(SourceCase.id, SourceCase.content_hash).where(case_key(SourceCase, profile_id, dj_id))
+
+
+def case_with_status_stmt(profile_id: str, dj_id: str):
+    """The case and its status row (None if never opened) in one query."""
+    return (
+        select(SourceCase, CaseStatusModel)
+        .outerjoin(CaseStatusModel, and_(
+            CaseStatusModel.profile_unique_id == SourceCase.profile_unique_id,
+            CaseStatusModel.dj_profile_id == SourceCase.dj_profile_id,
+        ))
+        .where(case_key(SourceCase, profile_id, dj_id))
+    )
+
+
+def recent_logs_stmt(profile_id: str, dj_id: str, limit: int):
+    return (
+        select(CaseLogModel)
+        .where(case_key(CaseLogModel, profile_id, dj_id))
+        .order_by(CaseLogModel.created_at.desc(), CaseLogModel.id.desc())
+        .limit(limit)
+    )
+
+
+def logs_stmt(params: LogQueryParams, profile_id: Optional[str] = None, dj_id: Optional[str] = None):
+    """Case log events in (created_at, id) order, for one case when
+    ``profile_id``/``dj_id`` are given. Selects ``(CaseLog, created_at as
+    text)`` for ``log_page``, like ``case_page_stmt``."""
+    created_at_key = type_coerce(CaseLogModel.created_at, String)
+    stmt = select(CaseLogModel, created_at_key.label("created_at_key"))
+    if profile_id is not None:
+        stmt = stmt.where(case_key(CaseLogModel, profile_id, dj_id))
+    if params.operator_id is not None:
+        stmt = stmt.where(CaseLogModel.operator_id == params.operator_id)
+    if params.event_type:
+        event_type = CaseLogModel.event_type
+        if params.operator_id is not None:
+            # || '' keeps SQLite on the operator index, which holds event_type
+            event_type = event_type.concat("")
+        stmt = stmt.where(event_type == params.event_type)
+    if params.since is not None:
+        stmt = stmt.where(CaseLogModel.created_at >= naive_utc(params.since))
+    if params.until is not None:
+        stmt = stmt.where(CaseLogModel.created_at < naive_utc(params.until))
+    if params.cursor:
+        after_created_at, after_id = decode_cursor(params.cursor, 2)
+        stmt = stmt.where(tuple_(created_at_key, CaseLogModel.id) > tuple_(after_created_at, after_id))
+    return stmt.order_by(created_at_key, CaseLogModel.id).limit(params.limit)
+
+
+def log_page(rows, response: Response, limit: int) -> List[CaseLogModel]:
+    if rows and len(rows) == limit:
+        last_log, last_created_at = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last_created_at, last_log.id)
+    return [log for log, _ in rows]
+
+
+def case_review(case, status, feedback, logs) -> CaseReviewSchema:
+    return CaseReviewSchema.model_validate(
+        {"case": case, "status": status, "feedback": list(feedback), "recent_logs": list(logs)},
+        from_attributes=True,
+    )
+
+
+def record_index_stmt(profile_id: str, dj_id: str):
+    return select(SourceCase.id, SourceCase.record_index).where(case_key(SourceCase, profile_id, dj_id))
+
+
+def record_text_stmt(case_id: int, ranges: Optional[List[dict]] = None):
+    """The whole structured_record, or just ``ranges`` of it as ``substr``
+    slices so only that part of the record leaves the database."""
+    if ranges is None:
+        return select(SourceCase.structured_record).where(SourceCase.id == case_id)
+    return select(*(
+        func.substr(SourceCase.structured_record, r["start"] + 1, r["end"] - r["start"]) for r in ranges
+    )).where(SourceCase.id == case_id)
+
+
+def record_view(index: dict, section: Optional[str], ranges: Optional[List[dict]], texts: Sequence[str]) -> RecordView:
+    if ranges is None:
+        chunks = [{"start_line": 1, "lines": texts[0].split('\n')}]
+    else:
+        chunks = [
+            {"start_line": r["start_line"], "lines": text.split('\n')[:r["end_line"] - r["start_line"] + 1]}
+            for r, text in zip(ranges, texts)
+        ]
+    return RecordView.model_validate({"index": index, "section": section, "chunks": chunks})
+
+
+def unindexed_record_view(structured_record: str, section: Optional[str]) -> Optional[RecordView]:
+    """``record_view`` for a row ingested before record_index existed; None
+    if the section is not in the record."""
+    index = index_record(structured_record)
+    ranges = section_ranges(index, section) if section is not None else None
+    if ranges == []:
+        return None
+    texts = [structured_record] if ranges is None else [structured_record[r["start"]:r["end"]] for r in ranges]
+    return record_view(index, section, ranges, texts)
+
+
+def status_stmt(profile_id: str, dj_id: str):
+    return select(CaseStatusModel).where(case_key(CaseStatusModel, profile_id, dj_id))
+
+
+def apply_review_submission(
+    profile_id: str,
+    dj_id: str,
+    operator_id: int,
+    submission: ReviewSubmission,
+    existing_feedback: Sequence[AspectFeedbackModel],
+    status: Optional[CaseStatusModel],
+):
+    """Apply ``submission`` to the loaded rows without any I/O.
+
+    Returns ``(new_objects, status, logs)``: rows for the caller to add, the
+    status row (None if the submission has no status change) and the new log
+    rows. The status change is logged as ``status_change`` exactly as
+    ``PATCH .../status`` does.
+    """
+    new_objects = []
+    by_aspect = {f.aspect_type: f for f in existing_feedback}
+    for item in submission.feedback:
+        feedback = by_aspect.get(item.aspect_type)
+        if feedback:
+            for field, value in item.dict(exclude_unset=True).items():
+                setattr(feedback, field, value)
+        else:
+            feedback = AspectFeedbackModel(
+                profile_unique_id=profile_id, dj_profile_id=dj_id, operator_id=operator_id, **item.dict()
+            )
+            by_aspect[item.aspect_type] = feedback
+            new_objects.append(feedback)
+
+    logs = []
+    if submission.status is not None:
+        if status is None:
+            status = default_status(profile_id, dj_id)
+            new_objects.append(status)
+        change = submission.status.dict(exclude_unset=True)
+        if 'case_status' in change:
+            status.case_status = change['case_status']
+        if 'aspects_status' in change:
+            status.aspects_status = change['aspects_status']
+        status.last_updated_by = operator_id
+        logs.append(CaseLogModel(profile_unique_id=profile_id, dj_profile_id=dj_id, event_type='status_change', payload=change, operator_id=operator_id))
+    else:
+        status = None
+    logs.extend(
+        CaseLogModel(profile_unique_id=profile_id, dj_profile_id=dj_id, event_type=log.event_type, payload=log.payload, operator_id=operator_id)
+        for log in submission.logs
+    )
+    new_objects.extend(logs)
+    return new_objects, status, logs
+
+
+def review_submission_result(status, feedback, logs) -> ReviewSubmissionResult:
+    return ReviewSubmissionResult.model_validate(
+        {"status": status, "feedback": list(feedback), "logs": list(logs)},
+        from_attributes=True,
+    )
+
+
+def default_status(profile_id: str, dj_id: str) -> CaseStatusModel:
+    return CaseStatusModel(profile_unique_id=profile_id, dj_profile_id=dj_id, case_status="unreviewed", aspects_status={})
+
+
+# POST /v2/cases/status:batch --------------------------------------------------
+#
+# The whole batch is one bound JSON array of keys (``json_each``) rather than
+# an IN list of 2 parameters per pair, so the statements compile once for
+# any batch size. Statuses are read as plain rows and serialised once per
+# distinct key through CaseStatusSchema, without ORM objects or a response
+# model per pair.
+
+_STATUS = CaseStatusModel.__table__
+_STATUSES = TypeAdapter(List[CaseStatusSchema])
+
+
+def batch_status_keys(req: BatchCaseStatusRequest) -> List[Tuple[str, str]]:
+    """Distinct requested keys, in request order."""
+    return list(dict.fromkeys((p.profile_unique_id, p.dj_profile_id) for p in req.pairs))
+
+
+def _json_keys(keys: List[Tuple[str, str]]):
+    """``(profile_unique_id, dj_profile_id)`` of each key, as a subquery."""
+    pairs = func.json_each(json.dumps(keys)).table_valued("value")
+    return select(func.json_extract(pairs.c.value, "$[0]"), func.json_extract(pairs.c.value, "$[1]"))
+
+
+def statuses_by_key_stmt(keys: List[Tuple[str, str]]):
+    """Status rows of exactly the given pairs, as plain columns."""
+    return select(*_STATUS.c).where(
+        tuple_(_STATUS.c.profile_unique_id, _STATUS.c.dj_profile_id).in_(_json_keys(keys))
+    )
+
+
+def insert_default_statuses(keys: List[Tuple[str, str]]):
+    """One INSERT creating default statuses for ``keys``; rows created
+    concurrently by another request are left untouched."""
+    defaults = _json_keys(keys).add_columns(literal("unreviewed"), literal("{}")).where(true())
+    return sqlite_insert(_STATUS).from_select(
+        ["profile_unique_id", "dj_profile_id", "case_status", "aspects_status"], defaults
+    ).on_conflict_do_nothing()
+
+
+def batch_status_response(req: BatchCaseStatusRequest, rows: Sequence) -> FastJSONResponse:
+    """One item per requested pair. Each distinct status row is validated and
+    dumped once as CaseStatusSchema and shared by every pair naming it."""
+    fields = rows[0]._fields if rows else ()
+    statuses = _STATUSES.validate_python([dict(zip(fields, row)) for row in rows])
+    statuses = _STATUSES.dump_python(statuses, mode="json")
+    by_key = {(s["profile_unique_id"], s["dj_profile_id"]): s for s in statuses}
+    return FastJSONResponse({"items": [
+        {
+            "profile_unique_id": p.profile_unique_id,
+            "dj_profile_id": p.dj_profile_id,
+            "status": by_key[(p.profile_unique_id, p.dj_profile_id)],
+        }
+        for p in req.pairs
+    ]})
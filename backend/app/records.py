@@ -0,0 +1,66 @@
+import re
+from typing import Any, Dict, List, Optional
+
+# Section headers in a World-Check structured_record, in tab order. Lines
+# before the first header belong to the first section.
+SECTIONS = (
+    ('Key Data', re.compile(r"^\s*Key Data\s*$", re.I)),
+    ('Further Information', re.compile(r"^\s*Further Information\s*$", re.I)),
+    ('Aliases', re.compile(r"^\s*Aliases\s*$", re.I)),
+    ('Keywords', re.compile(r"^\s*Keywords\s*$", re.I)),
+    ('Connections/Relationships', re.compile(r"^\s*Connections\s*/?\s*Relationships\s*$", re.I)),
+    ('Sources', re.compile(r"^\s*Sources\s*$", re.I)),
+    ('Hit Category', re.compile(r"^\s*Hit Category\s*$", re.I)),
+)
+
+# Numbered items ("12) Name.fullName: ...") that LLM citations count in
+_ITEM = re.compile(r"^\s*\d+\)\s+")
+
+
+def index_record(structured_record: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Compute the section/line index stored in ``SourceCase.record_index``.
+
+    The result is::
+
+        {"line_count": int,
+         "sections": [{"name": str, "header": bool, "start_line": int,
+                       "end_line": int, "start": int, "end": int}],
+         "items": [int]}
+
+    Lines are 1-based and ranges inclusive; ``start``/``end`` are the
+    character offsets of the range (end exclusive) so a section can be read
+    with ``substr`` without loading the whole record. A section whose header
+    appears more than once has one entry per run; ``header`` is set when the
+    run starts with the header line itself. ``items[k - 1]`` is the
+    line of numbered item ``k``.
+    """
+    if structured_record is None:
+        return None
+    sections: List[Dict[str, Any]] = []
+    items: List[int] = []
+    current = SECTIONS[0][0]
+    offset = 0
+    lines = structured_record.split('\n')
+    for number, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        header = next((name for name, test in SECTIONS if test.match(stripped)), None)
+        if header is not None:
+            current = header
+        if _ITEM.match(line):
+            items.append(number)
+        end = offset + len(line) + (1 if number < len(lines) else 0)
+        if sections and sections[-1]["name"] == current and header is None:
+            sections[-1]["end_line"] = number
+            sections[-1]["end"] = end
+        else:
+            sections.append({
+                "name": current, "header": header is not None,
+                "start_line": number, "end_line": number, "start": offset, "end": end,
+            })
+        offset = end
+    return {"line_count": len(lines), "sections": sections, "items": items}
+
+
+def section_ranges(index: Dict[str, Any], section: str) -> List[Dict[str, Any]]:
+    """The runs of ``section`` in a record index, matched case-insensitively."""
+    return [s for s in index["sections"] if s["name"].lower() == section.lower()]
@@ -0,0 +1,268 @@
+"""Read-replica routing: local reads, primary writes, read-your-writes.
+
+With ``READ_REPLICA_PATH`` set, a background thread copies the primary into
+that local SQLite file every ``READ_REPLICA_SYNC_SECONDS``:
+
+* against Turso it is a libsql embedded replica (``libsql_experimental``
+  ``connect(..., sync_url=...)`` then ``sync()``);
+* against the local SQLite file (a stand-in primary for testing) it is an
+  online ``sqlite3`` backup. That copies the whole database file, so it is
+  skipped while the primary's ``PRAGMA data_version`` shows no commit since
+  the last copy; a busy primary is still copied in full every interval.
+
+Read-only endpoints take ``get_read_db``. An operator's reads go to the
+replica only once a sync has started after that operator's last commit on the
+primary, so a status they just PATCHed is never read back stale.
+
+The time of that commit has to reach whichever worker or serverless instance
+serves the next read, so it is not only kept in process. The response to a
+request that committed carries it in a signed ``aml_last_write`` cookie
+(``ReadYourWritesMiddleware``), and the browser sends it back on later
+requests (the frontend sends credentials cross-origin for this). Workers
+compare it against the wall-clock start of their own last sync, with
+``READ_REPLICA_CLOCK_SKEW_SECONDS`` of allowance for clocks between hosts.
+"""
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth import SECRET_KEY, get_current_operator
+from app.database import (
+    READ_REPLICA_PATH, ReplicaSessionLocal, SessionLocal, checkout, engine, raw_url, auth_token,
+)
+from app.models import Operator
+
+SYNC_SECONDS = float(os.getenv("READ_REPLICA_SYNC_SECONDS", "60"))
+CLOCK_SKEW_SECONDS = float(os.getenv("READ_REPLICA_CLOCK_SKEW_SECONDS", "1"))
+COOKIE = "aml_last_write"
+COOKIE_MAX_AGE = 3600
+
+# Per request: the verified (operator id, write time) the client sent, and
+# the one to send back when the request commits
+_request: "ContextVar[Optional[dict]]" = ContextVar("read_your_writes", default=None)
+
+
+class ReplicaState:
+    def __init__(self):
+        # Wall-clock start of the last successful sync; the replica holds
+        # every commit made before it
+        self.synced_through: Optional[float] = None
+        self.last_write: Dict[int, float] = {}
+        self.syncs = 0
+        self.syncs_skipped = 0
+        self.sync_failures = 0
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self._lock = threading.Lock()
+
+    def note_write(self, operator_id: int, wrote_at: float) -> None:
+        with self._lock:
+            self.last_write[operator_id] = wrote_at
+
+    def use_replica(self, operator_id: int, client_wrote_at: Optional[float] = None) -> bool:
+        """Whether the replica holds the operator's last write, as seen by
+        this process or reported by the client's cookie."""
+        with self._lock:
+            wrote_at = max(self.last_write.get(operator_id, float("-inf")), client_wrote_at or float("-inf"))
+            fresh = self.synced_through is not None and wrote_at + CLOCK_SKEW_SECONDS < self.synced_through
+            if fresh:
+                self.replica_reads += 1
+            else:
+                self.primary_reads += 1
+            return fresh
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": True,
+                "sync_age_seconds": time.time() - self.synced_through if self.synced_through else None,
+                "syncs": self.syncs,
+                "syncs_skipped": self.syncs_skipped,
+                "sync_failures": self.sync_failures,
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+            }
+
+
+state = ReplicaState()
+_libsql_conn = None
+# Kept open on the local primary: data_version only changes for commits made
+# by other connections since this one last read it
+_source_conn: Optional[sqlite3.Connection] = None
+_copied_version: Optional[int] = None
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _sync_from_turso() -> None:
+    global _libsql_conn
+    if _libsql_conn is None:
+        import libsql_experimental as libsql
+
+        _libsql_conn = libsql.connect(READ_REPLICA_PATH, sync_url=raw_url, auth_token=auth_token or "")
+    _libsql_conn.sync()
+
+
+def _sync_from_local_primary() -> bool:
+    """Copy the primary unless nothing was committed since the last copy;
+    returns whether it copied."""
+    global _source_conn, _copied_version
+    if _source_conn is None:
+        _source_conn = sqlite3.connect(engine.url.database, check_same_thread=False)
+    # Read before copying, so a commit during the copy triggers the next one
+    version = _source_conn.execute("PRAGMA data_version").fetchone()[0]
+    if version == _copied_version:
+        return False
+    target = sqlite3.connect(READ_REPLICA_PATH)
+    try:
+        _source_conn.backup(target)
+    finally:
+        target.close()
+    _copied_version = version
+    return True
+
+
+def sync_replica() -> None:
+    """Bring the replica up to date with the primary now."""
+    started = time.time()
+    copied = True
+    try:
+        if raw_url:
+            # Pulls only the frames committed since the last sync
+            _sync_from_turso()
+        else:
+            copied = _sync_from_local_primary()
+    except Exception as e:
+        with state._lock:
+            state.sync_failures += 1
+        print(f"Read replica sync failed: {e}")
+        return
+    with state._lock:
+        # Unchanged since the last copy: the replica still holds every commit
+        state.synced_through = started
+        if copied:
+            state.syncs += 1
+        else:
+            state.syncs_skipped += 1
+
+
+def _sync_loop() -> None:
+    while not _stop.wait(SYNC_SECONDS):
+        sync_replica()
+
+
+def start() -> None:
+    """Initial sync, then keep syncing in the background."""
+    global _thread
+    if not READ_REPLICA_PATH or _thread is not None:
+        return
+    sync_replica()
+    _stop.clear()
+    _thread = threading.Thread(target=_sync_loop, name="read-replica-sync", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    global _thread, _source_conn, _copied_version
+    _stop.set()
+    _thread = None
+    if _source_conn is not None:
+        _source_conn.close()
+        _source_conn, _copied_version = None, None
+
+
+def stats() -> dict:
+    return state.stats() if READ_REPLICA_PATH else {"enabled": False}
+
+
+def _sign(value: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), value.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def write_marker(operator_id: int, wrote_at: float) -> str:
+    value = f"{operator_id}:{wrote_at:.6f}"
+    return f"{value}:{_sign(value)}"
+
+
+def read_marker(cookie: Optional[str]) -> Optional[Tuple[int, float]]:
+    """``(operator id, write time)`` of a ``write_marker``; None if missing or forged."""
+    if not cookie:
+        return None
+    value, _, signature = cookie.rpartition(":")
+    if not hmac.compare_digest(signature, _sign(value)):
+        return None
+    try:
+        operator_id, wrote_at = value.split(":")
+        return int(operator_id), float(wrote_at)
+    except ValueError:
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """Carries an operator's last write time between workers in a cookie."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not READ_REPLICA_PATH:
+            await self.app(scope, receive, send)
+            return
+        cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+        request = {"client": read_marker(cookies.get(COOKIE)), "wrote": None}
+        token = _request.set(request)
+
+        async def send_with_marker(message: Message) -> None:
+            if message["type"] == "http.response.start" and request["wrote"] is not None:
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{COOKIE}={write_marker(*request['wrote'])}; Max-Age={COOKIE_MAX_AGE}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            _request.reset(token)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_write(session) -> None:
+    # get_current_operator tags the request's primary session with its operator
+    operator_id = session.info.get("operator_id")
+    if READ_REPLICA_PATH and operator_id is not None:
+        wrote_at = time.time()
+        state.note_write(operator_id, wrote_at)
+        # Sync handlers run with a copy of the request context, which still
+        # refers to the middleware's dict
+        request = _request.get()
+        if request is not None:
+            request["wrote"] = (operator_id, wrote_at)
+
+
+def get_read_db(current_operator: Operator = Depends(get_current_operator)):
+    """Session for read-only endpoints: the replica when it has caught up
+    with this operator's writes, the primary otherwise."""
+    request = _request.get()
+    marker = request["client"] if request is not None else None
+    client_wrote_at = marker[1] if marker is not None and marker[0] == current_operator.id else None
+    if READ_REPLICA_PATH and state.use_replica(current_operator.id, client_wrote_at):
+        db = ReplicaSessionLocal()
+    else:
+        db = SessionLocal()
+    try:
+        checkout(db)
+        yield db
+    finally:
+        db.close()
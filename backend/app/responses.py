@@ -0,0 +1,49 @@
+"""JSON rendering for the API.
+
+FastAPI's default path validates a handler's return value against its
+``response_model``, converts it to plain Python objects and hands those to
+``json.dumps``. ``FastJSONResponse`` renders that last step with orjson when
+it is installed. Large case payloads skip the intermediate objects entirely
+with ``model_json_response``, which validates from the ORM rows and
+serialises to bytes in one pass of Pydantic's native encoder.
+"""
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered with orjson, or compact stdlib json without it."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def model_json_response(schema, value: Any, response: Optional[Response] = None) -> Response:
+    """``value`` validated as ``schema`` (e.g. ``List[SourceCaseSchema]``)
+    from attributes and serialised straight to JSON bytes.
+
+    Returning a Response bypasses the route's ``response_model``, so headers
+    a handler set on its injected ``response`` (``X-Next-Cursor``) are
+    copied over here.
+    """
+    adapter = _adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -4,6 +4,47 @@ from datetime import datetime
 from app.models import OperatorRole
 
 
+class AspectCitation(BaseModel):
+  start_line: int
+  end_line: int
+
+
+class AspectClaim(BaseModel):
+  statement: str
+  citations: List[AspectCitation] = []
+
+
+class AspectOutput(BaseModel):
+  reasoning: str = ""
+  verdict: Optional[str] = None
+  claims: List[AspectClaim] = []
+
+
+class RecordSection(BaseModel):
+  name: str
+  header: bool = False
+  start_line: int
+  end_line: int
+
+
+class RecordIndex(BaseModel):
+  """Sections and numbered items of a structured_record, computed at ingest."""
+  line_count: int
+  sections: List[RecordSection] = []
+  items: List[int] = []
+
+
+class RecordChunk(BaseModel):
+  start_line: int
+  lines: List[str]
+
+
+class RecordView(BaseModel):
+  index: RecordIndex
+  section: Optional[str] = None
+  chunks: List[RecordChunk]
+
+
 class SourceCase(BaseModel):
   id: int
   profile_unique_id: str
@@ -18,12 +59,59 @@ class SourceCase(BaseModel):
   aspect_age_json: Optional[str] = None
   aspect_nationality_json: Optional[str] = None
   aspect_risk_json: Optional[str] = None
+  # Structured aspect outputs keyed by aspect; the *_json strings above are
+  # kept for older clients
+  aspects: Dict[str, Optional[AspectOutput]] = {}
+  record_index: Optional[RecordIndex] = None
+  created_at: datetime
+
+  class Config:
+    orm_mode = True
+
+
+class SourceCaseSummary(BaseModel):
+  """List projection of SourceCase without the record/aspect blobs."""
+  id: int
+  profile_unique_id: str
+  dj_profile_id: str
+  reference_id: Optional[str] = None
+  profile_info: Optional[Dict[str, Any]] = None
+  candidate_name: Optional[str] = None
+  final_score: Optional[float] = None
   created_at: datetime
 
   class Config:
     orm_mode = True
 
 
+class SearchHit(BaseModel):
+  profile_unique_id: str
+  dj_profile_id: str
+  candidate_name: Optional[str] = None
+  final_score: Optional[float] = None
+  # Best-matching fragment with matches wrapped in <mark></mark>; the text
+  # itself is not HTML-escaped
+  snippet: str
+  rank: float
+
+
+class SimilarName(BaseModel):
+  profile_unique_id: str
+  dj_profile_id: str
+  candidate_name: Optional[str] = None
+  final_score: Optional[float] = None
+  score: float
+
+
+class ProfileSummary(BaseModel):
+  profile_unique_id: str
+  hit_count: int
+  max_final_score: Optional[float] = None
+  reviewed_count: int
+  unreviewed_count: int
+  last_updated_at: Optional[datetime] = None
+
+
 class CaseStatusSchema(BaseModel):
   id: int
   profile_unique_id: str
@@ -70,11 +158,46 @@ class CaseLogSchema(BaseModel):
   payload: Optional[Dict[str, Any]]
   created_at: datetime
   operator_id: Optional[int]
+  event_id: Optional[str] = None
 
   class Config:
     orm_mode = True
 
 
+class CaseReview(BaseModel):
+  """Everything the case review page needs, in one response.
+
+  ``status`` is null until the case is first opened or reviewed.
+  """
+  case: SourceCase
+  status: Optional[CaseStatusSchema] = None
+  feedback: List[AspectFeedbackSchema]
+  recent_logs: List[CaseLogSchema]
+
+
+class CaseStatusUpdate(BaseModel):
+  case_status: Optional[str] = None
+  aspects_status: Optional[Dict[str, Any]] = None
+
+
+class CaseLogCreate(BaseModel):
+  event_type: str = "comment"
+  payload: Optional[Dict[str, Any]] = None
+
+
+class ReviewSubmission(BaseModel):
+  """Feedback upserts, a status change and log events applied in one transaction."""
+  feedback: List[AspectFeedbackCreate] = []
+  status: Optional[CaseStatusUpdate] = None
+  logs: List[CaseLogCreate] = []
+
+
+class ReviewSubmissionResult(BaseModel):
+  status: Optional[CaseStatusSchema] = None
+  feedback: List[AspectFeedbackSchema]
+  logs: List[CaseLogSchema]
+
+
 class OperatorBase(BaseModel):
     name: str
     email: EmailStr
@@ -0,0 +1,137 @@
+"""Full-text search over source cases with SQLite FTS5.
+
+``source_cases_fts`` is an external-content FTS5 index over the
+``source_cases_search`` view: candidate name, structured record and the
+reasoning of the four structured aspects. Only the index is stored; snippets
+are read back through the view. Triggers on ``source_cases`` keep it in step
+with every insert, update and delete, including the bulk upserts in
+migrate_csv, so there is no separate indexing job.
+"""
+from typing import List, Optional
+
+from fastapi import Response
+from sqlalchemy import column, func, inspect, literal_column, select, table, tuple_
+
+from app.aspects import ASPECTS
+from app.models import SourceCase
+from app.pagination import encode_cursor, decode_cursor
+from app.schemas import SearchHit
+
+FTS_TABLE = "source_cases_fts"
+FTS_VIEW = "source_cases_search"
+FTS_COLUMNS = ("candidate_name", "structured_record", "aspect_reasoning")
+# bm25 weight per column: a name hit outranks the same term deep in a record
+RANK = "bm25(10.0, 1.0, 2.0)"
+SNIPPET_TOKENS = 16
+MARK_START, MARK_END = "<mark>", "</mark>"
+
+# Updating any of these re-indexes the row
+_TRIGGER_COLUMNS = ("candidate_name", "structured_record", *(f"aspect_{a}" for a in ASPECTS))
+
+
+def _reasoning(row: str) -> str:
+    """SQL for the aspect reasoning text of ``row`` (``new``/``old``/table)."""
+    parts = [
+        f"coalesce(CASE WHEN json_valid({row}.aspect_{a}) THEN json_extract({row}.aspect_{a}, '$.reasoning') END, '')"
+        for a in ASPECTS
+    ]
+    return "trim(" + " || ' ' || ".join(parts) + ")"
+
+
+def _values(row: str) -> str:
+    return f"{row}.id, {row}.candidate_name, {row}.structured_record, {_reasoning(row)}"
+
+
+def _ddl() -> List[str]:
+    cols = ", ".join(FTS_COLUMNS)
+    changed = ", ".join(_TRIGGER_COLUMNS)
+    return [
+        f"CREATE VIEW IF NOT EXISTS {FTS_VIEW} AS "
+        f"SELECT {_values('source_cases')} AS aspect_reasoning FROM source_cases",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({cols}, "
+        f"content='{FTS_VIEW}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS source_cases_fts_ai AFTER INSERT ON source_cases BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES ({_values('new')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS source_cases_fts_ad AFTER DELETE ON source_cases BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', {_values('old')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS source_cases_fts_au AFTER UPDATE OF {changed} ON source_cases BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', {_values('old')}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES ({_values('new')}); END",
+    ]
+
+
+def ensure_search_index(bind) -> None:
+    """Create the FTS index, its view and triggers if missing.
+
+    A newly created index is filled from the existing rows in one rebuild;
+    after that the triggers maintain it.
+    """
+    try:
+        existed = FTS_TABLE in inspect(bind).get_table_names()
+        with bind.begin() as conn:
+            for statement in _ddl():
+                conn.exec_driver_sql(statement)
+            if not existed:
+                conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', '{RANK}')")
+                conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    except Exception as e:
+        print(f"Could not create search index {FTS_TABLE}: {e}")
+
+
+def drop_search_index(bind) -> None:
+    with bind.begin() as conn:
+        for trigger in ("source_cases_fts_ai", "source_cases_fts_ad", "source_cases_fts_au"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        conn.exec_driver_sql(f"DROP VIEW IF EXISTS {FTS_VIEW}")
+
+
+def match_query(q: str) -> Optional[str]:
+    """FTS5 query for free text ``q``: every word must match, the last one as
+    a prefix so partial names find results while typing. Words are quoted so
+    FTS5 operators and punctuation in ``q`` are taken literally."""
+    words = q.split()
+    if not words:
+        return None
+    quoted = ['"' + w.replace('"', '""') + '"' for w in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+
+def search_stmt(match: str, cursor: Optional[str], limit: int):
+    """Cases matching ``match`` in (rank, id) order.
+
+    ``rank`` is the weighted bm25 score (lower is better), so the cursor is
+    the (rank, id) of the last hit. The cursor is only stable while the
+    index is unchanged; a write between pages can shift scores slightly.
+    """
+    fts = literal_column(FTS_TABLE)
+    snippet = func.snippet(fts, -1, MARK_START, MARK_END, "…", SNIPPET_TOKENS)
+    stmt = (
+        select(
+            SourceCase.profile_unique_id,
+            SourceCase.dj_profile_id,
+            SourceCase.candidate_name,
+            SourceCase.final_score,
+            snippet.label("snippet"),
+            _fts.c.rank.label("rank"),
+            SourceCase.id,
+        )
+        .select_from(_fts.join(SourceCase, SourceCase.id == _fts.c.rowid))
+        .where(fts.op("MATCH")(match))
+    )
+    if cursor:
+        after_rank, after_id = decode_cursor(cursor, 2)
+        stmt = stmt.where(tuple_(_fts.c.rank, SourceCase.id) > tuple_(after_rank, after_id))
+    return stmt.order_by(_fts.c.rank, SourceCase.id).limit(limit)
+
+
+def search_page(rows, response: Response, limit: int) -> List[SearchHit]:
+    """Hits from ``search_stmt`` rows, with ``X-Next-Cursor`` set when a
+    full page is returned."""
+    if rows and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].rank, rows[-1].id)
+    return [SearchHit.model_validate(row, from_attributes=True) for row in rows]
@@ -0,0 +1,114 @@
+import sys
+import os
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+
+# Ensure backend root is on sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import String, delete, func, insert, select, tuple_, type_coerce
+
+from app.archive import ARCHIVED, archivable, archive_columns, archive_path, stored_text, write_archive_file
+from app.database import engine
+from app.models import ArchiveFile, Base, ensure_indexes
+
+# Ids per DELETE statement, under SQLite's bound-parameter limit
+DELETE_CHUNK = 10000
+
+
+def month_counts(table_name: str, cutoff: str) -> list:
+    table = Base.metadata.tables[table_name]
+    ts = type_coerce(table.c[ARCHIVED[table_name]], String)
+    month = func.substr(ts, 1, 7)
+    with engine.connect() as conn:
+        return conn.execute(
+            select(month, func.count()).where(archivable(table_name, cutoff)).group_by(month).order_by(month)
+        ).all()
+
+
+def archive_table(table_name: str, cutoff: str, batch_size: int = 50000) -> int:
+    """Move the ``archivable`` rows of ``table_name`` into per-month archive
+    files, oldest first.
+
+    Each batch is written to its files first; the manifest rows and the
+    DELETE then commit together. A run interrupted between the two leaves an
+    unlisted file whose rows are still in the table and are archived again
+    by the next run, so it can be re-run safely.
+    """
+    table = Base.metadata.tables[table_name]
+    ts_column = ARCHIVED[table_name]
+    ts = type_coerce(table.c[ts_column], String)
+    archived = 0
+    after = None
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as conn:
+            stmt = select(*archive_columns(table)).where(archivable(table_name, cutoff))
+            if after is not None:
+                # Rows passed over (feedback of open cases) are not rescanned
+                stmt = stmt.where(tuple_(ts, table.c.id) > tuple_(*after))
+            rows = conn.execute(
+                stmt.order_by(table.c[ts_column], table.c.id).limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                break
+            after = (rows[-1][ts_column], rows[-1]["id"])
+            for month, group in groupby(rows, key=lambda r: r[ts_column][:7]):
+                group = list(group)
+                ids = [r["id"] for r in group]
+                path = archive_path(table_name, month, min(ids), max(ids))
+                digest = write_archive_file(path, group)
+                conn.execute(insert(ArchiveFile).values(
+                    table_name=table_name, month=month, path=path, rows=len(group),
+                    first_at=group[0][ts_column], last_at=group[-1][ts_column],
+                    first_id=min(ids), last_id=max(ids), sha256=digest,
+                ))
+                for lo in range(0, len(ids), DELETE_CHUNK):
+                    conn.execute(delete(table).where(table.c.id.in_(ids[lo:lo + DELETE_CHUNK])))
+        archived += len(rows)
+        print(f"Progress: {archived} {table_name} rows archived (through {rows[-1][ts_column]})", flush=True)
+
+    elapsed = time.perf_counter() - started
+    rate = archived / elapsed if elapsed > 0 else 0.0
+    print(f"Archived {archived} {table_name} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return archived
+
+
+def vacuum() -> None:
+    print("Reclaiming free pages (VACUUM)…")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Move case_logs rows, and aspect_feedback of closed cases, older than --days into per-month archive files"
+    )
+    parser.add_argument("--days", type=int, required=True, help="Keep rows from the last N days in the database")
+    parser.add_argument(
+        "--tables", nargs="+", choices=sorted(ARCHIVED), default=sorted(ARCHIVED), help="Tables to archive"
+    )
+    parser.add_argument("--batch-size", type=int, default=50000, help="Rows per archive transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only print how many rows per month would move")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to shrink the database file")
+    args = parser.parse_args()
+
+    ArchiveFile.__table__.create(bind=engine, checkfirst=True)
+    ensure_indexes(engine)
+    cutoff = stored_text(datetime.now(timezone.utc) - timedelta(days=args.days))
+    print(f"Cutoff: {cutoff} UTC")
+    for table_name in args.tables:
+        if args.dry_run:
+            for month, count in month_counts(table_name, cutoff):
+                print(f"- {table_name} {month}: {count}")
+        else:
+            archive_table(table_name, cutoff, args.batch_size)
+    if args.vacuum and not args.dry_run:
+        vacuum()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,436 @@
+import sys
+import os
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Run against a throwaway local SQLite file: app.database falls back to
+# ./aml_screening.db in the working directory when no Turso URL is configured.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+os.environ.pop("TURSO_DATABASE_URL", None)
+os.chdir(tempfile.mkdtemp(prefix="aml-bench-"))
+
+from typing import List  # noqa: E402
+
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from sqlalchemy import event, insert, select  # noqa: E402
+
+from app.aspects import ASPECTS, structure_aspect  # noqa: E402
+
+from app import compression  # noqa: E402
+from app.auth import create_access_token, get_current_operator, operator_cache  # noqa: E402
+from app.main import app, batch_get_case_status, list_logs_v2, list_similar_names, search_cases  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.models import (  # noqa: E402
+    Operator, SourceCase, AspectFeedback, CaseLog, CaseStatusSnapshot as CaseStatusModel,
+)
+from app.names import write_name_keys  # noqa: E402
+from app.queries import LogQueryParams  # noqa: E402
+from app.records import index_record  # noqa: E402
+from app.responses import FastJSONResponse, model_json_response, orjson  # noqa: E402
+from app.schemas import BatchCaseStatusRequest, SourceCase as SourceCaseSchema  # noqa: E402
+
+
+# Statements sent to the database; each is a network round-trip against Turso
+statement_count = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global statement_count
+    statement_count += 1
+
+
+def timed(fn, repeat: int):
+    """Run ``fn`` ``repeat`` times; return per-call latencies in ms and
+    statements per call."""
+    global statement_count
+    samples = []
+    statement_count = 0
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, statement_count / repeat
+
+
+def report(label: str, result) -> None:
+    samples, statements = result
+    samples = sorted(samples)
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    print(f"{label:<40} median={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms  statements={statements:.1f}")
+
+
+def bench_batch_status(args) -> None:
+    """POST /v2/cases/status:batch latency for growing page sizes."""
+    db = SessionLocal()
+    operator = Operator(name="Bench", email="bench@example.com", password_hash="x")
+    db.add(operator)
+    largest = max(args.sizes)
+    db.add_all([
+        CaseStatusModel(profile_unique_id=f"P{i}", dj_profile_id=f"D{i}", case_status="unreviewed", aspects_status={})
+        for i in range(largest)
+    ])
+    db.commit()
+
+    for size in args.sizes:
+        existing = BatchCaseStatusRequest(pairs=[
+            {"profile_unique_id": f"P{i}", "dj_profile_id": f"D{i}"} for i in range(size)
+        ])
+        result = timed(lambda _: batch_get_case_status(existing, db, operator), args.repeat)
+        report(f"{size} pairs, all existing", result)
+        print(f"{'':<40} {statistics.median(result[0]) * 1000 / size:8.1f}µs per pair")
+
+        def missing(run):
+            req = BatchCaseStatusRequest(pairs=[
+                {"profile_unique_id": f"N{size}-{run}-{i}", "dj_profile_id": f"D{i}"} for i in range(size)
+            ])
+            batch_get_case_status(req, db, operator)
+        report(f"{size} pairs, all missing (created)", timed(missing, args.repeat))
+    db.close()
+
+
+def bench_operator_lookup(args) -> None:
+    """get_current_operator latency with a cold and a warm operator cache."""
+    db = SessionLocal()
+    db.add(Operator(name="Bench", email="bench@example.com", password_hash="x"))
+    db.commit()
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token(data={"sub": "bench@example.com"})
+    )
+
+    def cold(_):
+        operator_cache.clear()
+        get_current_operator(credentials, db)
+    report("cold cache (DB lookup every call)", timed(cold, args.repeat))
+
+    get_current_operator(credentials, db)
+    report("warm cache", timed(lambda _: get_current_operator(credentials, db), args.repeat))
+    print(operator_cache.stats())
+    db.close()
+
+
+# Statements GET /v2/cases/{profile_id}/{dj_id}/review may issue once the
+# operator is cached: case+status, feedback, recent logs
+CASE_REVIEW_MAX_STATEMENTS = 3
+
+
+def bench_case_review(args) -> int:
+    """Case review page load: the aggregate endpoint vs the old call chain.
+    Fails if the aggregate issues more than CASE_REVIEW_MAX_STATEMENTS."""
+    from fastapi.testclient import TestClient
+
+    db = SessionLocal()
+    operator = Operator(name="Bench", email="bench@example.com", password_hash="x")
+    db.add(operator)
+    db.add(SourceCase(profile_unique_id="P1", dj_profile_id="D1", structured_record="x", candidate_name="Bench Case"))
+    db.commit()
+    db.add(CaseStatusModel(profile_unique_id="P1", dj_profile_id="D1", case_status="in_review", aspects_status={}))
+    db.add_all([
+        AspectFeedback(profile_unique_id="P1", dj_profile_id="D1", aspect_type=a, operator_id=operator.id)
+        for a in ("name", "age", "nationality", "risk")
+    ])
+    db.add_all([
+        CaseLog(profile_unique_id="P1", dj_profile_id="D1", event_type="comment", payload={"n": i}, operator_id=operator.id)
+        for i in range(50)
+    ])
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'bench@example.com'})}"}
+    client.get("/auth/me", headers=headers)  # warm the operator cache
+
+    def waterfall(_):
+        client.get("/v2/cases", params={"profile_unique_id": "P1", "limit": 1}, headers=headers)
+        client.get("/v2/cases/P1/D1/status", headers=headers)
+        client.get("/v2/cases/P1/D1/feedback", headers=headers)
+
+    def aggregate(_):
+        r = client.get("/v2/cases/P1/D1/review", headers=headers)
+        r.raise_for_status()
+
+    report("list + status + feedback (3 calls)", timed(waterfall, args.repeat))
+    samples, statements = timed(aggregate, args.repeat)
+    report("GET .../review (1 call)", (samples, statements))
+    if statements > CASE_REVIEW_MAX_STATEMENTS:
+        print(f"FAIL: review issued {statements:.1f} statements, expected <= {CASE_REVIEW_MAX_STATEMENTS}")
+        return 1
+    return 0
+
+
+FIRST_NAMES = ["Ahmed", "Maria", "John", "Wei", "Olga", "Carlos", "Fatima", "Ivan", "Aisha", "Pierre"]
+SURNAME_SYLLABLES = ["ka", "ro", "mi", "tan", "vel", "dor", "su", "lin", "ber", "gov", "ez", "nak"]
+
+
+def synthetic_case(i: int) -> dict:
+    first = FIRST_NAMES[i % len(FIRST_NAMES)]
+    # ~1700 distinct surnames, so a surname matches a few hundred of 1M cases
+    n = (i * 7919) % 1728
+    surname = "".join(SURNAME_SYLLABLES[(n // 12 ** k) % 12] for k in range(3)).capitalize()
+    name = f"{first} {surname}"
+    record = (
+        f"Key Data\n1) Name.fullName: {name}\n2) Name.age: {20 + i % 60}\n3) Country: C{i % 190}\n"
+        f"Further Information\n4) Reported in case file {i} for review\nSources\n5) http://example.com/{i}"
+    )
+    return {
+        "profile_unique_id": f"P{i}", "dj_profile_id": f"D{i}", "candidate_name": name,
+        "structured_record": record, "final_score": i % 100,
+        "aspect_risk": {"reasoning": f"{surname} appears on list {i % 50}", "verdict": None, "claims": []},
+    }
+
+
+# Target for GET /v2/search on the default 1M-case local database
+SEARCH_MAX_P95_MS = 50.0
+
+
+def bench_search(args) -> int:
+    """GET /v2/search latency on a local SQLite file with --cases records.
+    Fails if a name query's p95 exceeds --max-ms."""
+    db = SessionLocal()
+    operator = Operator(name="Bench", email="bench@example.com", password_hash="x")
+    db.add(operator)
+    db.commit()
+    started = time.perf_counter()
+    chunk = 50000
+    with engine.begin() as conn:
+        for lo in range(0, args.cases, chunk):
+            # The FTS triggers index each row as it is inserted
+            conn.execute(insert(SourceCase.__table__), [synthetic_case(i) for i in range(lo, min(lo + chunk, args.cases))])
+    print(f"Seeded and indexed {args.cases} cases in {time.perf_counter() - started:.1f}s")
+
+    queries = [
+        ("full name", lambda i: synthetic_case(i * 104729 % args.cases)["candidate_name"]),
+        ("surname", lambda i: synthetic_case(i * 104729 % args.cases)["candidate_name"].split()[1]),
+        ("surname prefix (typeahead)", lambda i: synthetic_case(i * 104729 % args.cases)["candidate_name"].split()[1][:4]),
+        ("identifier in record", lambda i: str(i * 104729 % args.cases)),
+    ]
+    failed = False
+    for label, make_query in queries:
+        samples, statements = timed(lambda i: search_cases(Response(), make_query(i), None, 20, db, operator), args.repeat)
+        report(label, (samples, statements))
+        p95 = sorted(samples)[max(0, int(len(samples) * 0.95) - 1)]
+        if p95 > args.max_ms:
+            print(f"FAIL: {label} p95 {p95:.1f}ms > {args.max_ms:.0f}ms")
+            failed = True
+    # A term in every record ranks all of them; reported, not gated
+    report("term in every record (not gated)", timed(lambda _: search_cases(Response(), "key data", None, 20, db, operator), 5))
+    db.close()
+    return 1 if failed else 0
+
+
+def bench_similar_names(args) -> int:
+    """GET /v2/cases/similar-names latency with --cases keyed names.
+    Fails if the p95 exceeds --max-ms or the original name is missed in
+    more than 1 of 10 lookups."""
+    db = SessionLocal()
+    operator = Operator(name="Bench", email="bench@example.com", password_hash="x")
+    db.add(operator)
+    db.commit()
+    started = time.perf_counter()
+    chunk = 50000
+    with engine.begin() as conn:
+        for lo in range(0, args.cases, chunk):
+            cases = [synthetic_case(i) for i in range(lo, min(lo + chunk, args.cases))]
+            conn.execute(insert(SourceCase.__table__), cases)
+            write_name_keys(conn, [(i + 1, case["candidate_name"]) for i, case in zip(range(lo, lo + chunk), cases)])
+    print(f"Seeded and keyed {args.cases} names in {time.perf_counter() - started:.1f}s")
+
+    found = 0
+
+    def lookup(i):
+        # Misspelt, reordered version of an existing case's name
+        nonlocal found
+        case = synthetic_case(i * 104729 % args.cases)
+        first, surname = case["candidate_name"].split()
+        hits = list_similar_names(f"{surname.replace('a', 'e', 1)} {first}", 20, 0.5, db, operator)
+        found += any(h.candidate_name == case["candidate_name"] for h in hits)
+    samples, statements = timed(lookup, args.repeat)
+    report("misspelt, reordered name", (samples, statements))
+    print(f"original name in top 20: {found}/{args.repeat}")
+    db.close()
+    p95 = sorted(samples)[max(0, int(len(samples) * 0.95) - 1)]
+    if p95 > args.max_ms:
+        print(f"FAIL: p95 {p95:.1f}ms > {args.max_ms:.0f}ms")
+        return 1
+    if found < 0.9 * args.repeat:
+        print("FAIL: original name missing from too many lookups")
+        return 1
+    return 0
+
+
+# Target for one page of GET /v2/logs on the default 20M-event database
+LOGS_MAX_P95_MS = 20.0
+
+
+def bench_logs(args) -> int:
+    """GET /v2/logs latency for one operator's week out of --logs events
+    spread over a year and --operators operators. Fails if the first page's
+    p95 exceeds --max-ms."""
+    db = SessionLocal()
+    operator = Operator(name="Bench", email="bench@example.com", password_hash="x")
+    db.add(operator)
+    db.commit()
+    started = time.perf_counter()
+    step = 365 * 86400 / args.logs
+    with engine.begin() as conn:
+        # Generated in SQL; building tens of millions of dicts in Python
+        # would dominate the run
+        conn.exec_driver_sql(
+            "WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+            "INSERT INTO case_logs (profile_unique_id, dj_profile_id, event_type, operator_id, created_at) "
+            "SELECT 'P' || (i % 1000000), 'D' || (i % 1000000), "
+            "CASE i % 4 WHEN 0 THEN 'status_change' ELSE 'comment' END, i % ?, "
+            "strftime('%Y-%m-%d %H:%M:%f', '2024-01-01', '+' || (i * ?) || ' seconds') || '000' FROM n",
+            (args.logs - 1, args.operators, step),
+        )
+    print(f"Seeded {args.logs} log events in {time.perf_counter() - started:.1f}s")
+
+    def week(i):
+        day = i * 7 % 350
+        return {
+            "operator_id": i % args.operators,
+            "since": datetime(2024, 1, 1) + timedelta(days=day),
+            "until": datetime(2024, 1, 8) + timedelta(days=day),
+        }
+
+    first = timed(lambda i: list_logs_v2(Response(), LogQueryParams(limit=100, **week(i)), db, operator), args.repeat)
+    report("operator week, first page", first)
+    report("operator week, comments only", timed(
+        lambda i: list_logs_v2(Response(), LogQueryParams(event_type="comment", limit=100, **week(i)), db, operator), args.repeat
+    ))
+    pages = []
+
+    def whole_week(i):
+        cursor, count = None, 0
+        while True:
+            response = Response()
+            count += 1
+            list_logs_v2(response, LogQueryParams(cursor=cursor, limit=100, **week(i)), db, operator)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        pages.append(count)
+    report("operator week, every page", timed(whole_week, 10))
+    print(f"pages per operator week: {statistics.median(pages):.0f}")
+    db.close()
+    samples = sorted(first[0])
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    if p95 > args.max_ms:
+        print(f"FAIL: first page p95 {p95:.1f}ms > {args.max_ms:.0f}ms")
+        return 1
+    return 0
+
+
+def large_case(i: int, record_kb: int) -> dict:
+    """A ``synthetic_case`` grown to a record of about ``record_kb`` KB with
+    LLM output for every aspect, like the cases the review page loads."""
+    case = synthetic_case(i)
+    name = case["candidate_name"]
+    lines = [case["structured_record"]]
+    n = 6
+    while sum(len(line) for line in lines) < record_kb * 1024:
+        lines.append(f"{n}) {name} was reported by source {n % 17} in {2000 + n % 24} regarding account {i}-{n} and transfers to C{n % 190}")
+        n += 1
+    record = "\n".join(lines)
+    case.update(structured_record=record, record_index=index_record(record), reference_id=f"R{i}",
+                profile_info={"name": name, "nationality": f"C{i % 190}"}, hit_record={"name": name, "score": i % 100})
+    for aspect in ASPECTS:
+        text = json.dumps({
+            "reasoning": f"The {aspect} of {name} was compared with the profile. " * 12,
+            "category": {"verdict": "match" if i % 2 else "no_match"},
+            "claims": [{"statement": f"Line {k} supports the {aspect} finding for {name}", "citations": [f"{k}:{k + 1}"]} for k in range(8)],
+        })
+        case[f"aspect_{aspect}_json"] = text
+        case[f"aspect_{aspect}"] = structure_aspect(text)
+    return case
+
+
+def bench_payload(args) -> None:
+    """Serialise time and bytes on the wire for one --cases page of
+    GET /v2/cases, per JSON path and per content encoding."""
+    with engine.begin() as conn:
+        conn.execute(insert(SourceCase.__table__), [large_case(i, args.record_kb) for i in range(args.cases)])
+    db = SessionLocal()
+    cases = db.scalars(select(SourceCase).order_by(SourceCase.id).limit(args.cases)).all()
+    field = next(r for r in app.routes if getattr(r, "path", None) == "/v2/cases").secure_cloned_response_field
+    loop = asyncio.new_event_loop()
+
+    def fastapi_content():
+        return loop.run_until_complete(serialize_response(field=field, response_content=cases, is_coroutine=False))
+
+    paths = {
+        "JSONResponse (before)": lambda: JSONResponse(fastapi_content()).body,
+        f"FastJSONResponse ({'orjson' if orjson else 'json'})": lambda: FastJSONResponse(fastapi_content()).body,
+        "model_json_response (Pydantic)": lambda: model_json_response(List[SourceCaseSchema], cases).body,
+    }
+    bodies = {}
+    for label, render in paths.items():
+        report(label, timed(lambda _: bodies.__setitem__(label, render()), args.repeat))
+    body = bodies[label]
+    assert all(json.loads(b) == json.loads(body) for b in bodies.values()), "JSON paths disagree"
+
+    print(f"{'identity':<40} {len(body):>9} bytes")
+    for encoding in compression.ENCODINGS:
+        result = timed(lambda _: compression.compress(body, encoding), args.repeat)
+        size = len(compression.compress(body, encoding))
+        print(f"{encoding:<40} {size:>9} bytes  ({size / len(body):.1%})  median={statistics.median(result[0]):.2f}ms to compress")
+    db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for v2 API handlers on a local SQLite file")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("batch-status", help=bench_batch_status.__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    p.add_argument("--repeat", type=int, default=20)
+    p.set_defaults(func=bench_batch_status)
+
+    p = sub.add_parser("case-review", help=bench_case_review.__doc__)
+    p.add_argument("--repeat", type=int, default=50)
+    p.set_defaults(func=bench_case_review)
+
+    p = sub.add_parser("operator-lookup", help=bench_operator_lookup.__doc__)
+    p.add_argument("--repeat", type=int, default=200)
+    p.set_defaults(func=bench_operator_lookup)
+
+    p = sub.add_parser("search", help=bench_search.__doc__)
+    p.add_argument("--cases", type=int, default=1_000_000)
+    p.add_argument("--repeat", type=int, default=50)
+    p.add_argument("--max-ms", type=float, default=SEARCH_MAX_P95_MS)
+    p.set_defaults(func=bench_search)
+
+    p = sub.add_parser("similar-names", help=bench_similar_names.__doc__)
+    p.add_argument("--cases", type=int, default=1_000_000)
+    p.add_argument("--repeat", type=int, default=50)
+    p.add_argument("--max-ms", type=float, default=SEARCH_MAX_P95_MS)
+    p.set_defaults(func=bench_similar_names)
+
+    p = sub.add_parser("logs", help=bench_logs.__doc__)
+    p.add_argument("--logs", type=int, default=20_000_000)
+    p.add_argument("--operators", type=int, default=50)
+    p.add_argument("--repeat", type=int, default=50)
+    p.add_argument("--max-ms", type=float, default=LOGS_MAX_P95_MS)
+    p.set_defaults(func=bench_logs)
+
+    p = sub.add_parser("payload", help=bench_payload.__doc__)
+    p.add_argument("--cases", type=int, default=50)
+    p.add_argument("--record-kb", type=int, default=8)
+    p.add_argument("--repeat", type=int, default=50)
+    p.set_defaults(func=bench_payload)
+
+    args = parser.parse_args()
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+import httpx
+
+# Shares the throwaway SQLite file, seeding and server start-up of the login
+# storm script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from load_login_storm import EMAIL, PASSWORD, percentile, seed, start_server  # noqa: E402
+
+
+async def sustained_rps(port: int, clients: int, seconds: float, cases: int):
+    """Requests/sec and p99 with ``clients`` concurrent clients alternating the
+    case list and case detail endpoints for ``seconds``."""
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+        r = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        samples: list = []
+        errors = 0
+        deadline = time.monotonic() + seconds
+
+        async def worker(n: int):
+            nonlocal errors
+            i = n
+            while time.monotonic() < deadline:
+                if i % 2:
+                    url, params = "/v2/cases/summary", {"limit": 50}
+                else:
+                    url, params = f"/v2/cases/P{i % cases}/D{i % cases}", None
+                started = time.perf_counter()
+                r = await client.get(url, params=params, headers=headers)
+                samples.append((time.perf_counter() - started) * 1000)
+                errors += r.status_code != 200
+                i += clients
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(n) for n in range(clients)))
+        elapsed = time.monotonic() - started
+    return len(samples) / elapsed, percentile(samples, 0.99), errors
+
+
+async def register(port: int) -> None:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        await client.post("/auth/register", json={"name": "Analyst", "email": EMAIL, "password": PASSWORD})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sustained v2 API RPS with the sync and the async DB layer")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    seed(args.cases)
+    for mode, flag in (("sync", "0"), ("async", "1")):
+        server = start_server(args.port, DB_ASYNC=flag)
+        try:
+            asyncio.run(register(args.port))
+            for clients in args.clients:
+                rps, p99, errors = asyncio.run(sustained_rps(args.port, clients, args.seconds, args.cases))
+                print(f"{mode:<6} clients={clients:4d}  rps={rps:8.1f}  p99={p99:8.1f}ms  errors={errors}")
+        finally:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
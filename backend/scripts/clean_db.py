@@ -13,14 +13,20 @@ from app.models import (
     CaseStatusSnapshot as CaseStatusModel,
     AspectFeedback,
     CaseLog,
+    NameKey,
+    NameKeyCount,
+    ArchiveFile,
 )
+from app.search import drop_search_index, ensure_search_index
 
 
 def drop_and_recreate() -> None:
     print("Dropping all v2 tables…")
+    drop_search_index(engine)
     Base.metadata.drop_all(bind=engine)
     print("Recreating v2 tables…")
     Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
     print("Done.")
 
 
@@ -31,6 +37,10 @@ def delete_rows(keep_operators: bool = False) -> None:
         db.query(AspectFeedback).delete()
         db.query(CaseLog).delete()
         db.query(CaseStatusModel).delete()
+        db.query(NameKey).delete()
+        db.query(NameKeyCount).delete()
+        # Files under ARCHIVE_DIR are left on disk
+        db.query(ArchiveFile).delete()
         db.query(SourceCase).delete()
         if not keep_operators:
             db.query(Operator).delete()
@@ -48,6 +58,7 @@ def print_counts() -> None:
             "case_status": db.query(CaseStatusModel).count(),
             "aspect_feedback": db.query(AspectFeedback).count(),
             "case_logs": db.query(CaseLog).count(),
+            "archive_files": db.query(ArchiveFile).count(),
         }
         print("Current counts:")
         for k, v in counts.items():
@@ -0,0 +1,138 @@
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+# Serve the app from a throwaway local SQLite file: app.database falls back to
+# ./aml_screening.db in the working directory when no Turso URL is configured.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+os.environ.pop("TURSO_DATABASE_URL", None)
+os.chdir(tempfile.mkdtemp(prefix="aml-storm-"))
+
+EMAIL, PASSWORD = "analyst@example.com", "password123"
+
+
+def seed(cases: int) -> None:
+    from app.database import SessionLocal, engine
+    from app.models import Base, SourceCase
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([
+        SourceCase(profile_unique_id=f"P{i}", dj_profile_id=f"D{i}", candidate_name=f"Candidate {i}",
+                   structured_record="Name: Candidate", final_score=i % 100)
+        for i in range(cases)
+    ])
+    db.commit()
+    db.close()
+
+
+def start_server(port: int, **env_overrides: str) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, **env_overrides)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def percentile(samples, q: float) -> float:
+    samples = sorted(samples)
+    return samples[max(0, int(len(samples) * q) - 1)]
+
+
+async def read_cases(client, headers, stop: asyncio.Event, samples: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        r = await client.get("/v2/cases/summary", params={"limit": 50}, headers=headers)
+        r.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+
+
+async def measure_reads(client, headers, readers: int, seconds: float, during=None) -> list:
+    """Case-list latencies from ``readers`` concurrent clients for ``seconds``,
+    optionally while ``during`` runs."""
+    samples: list = []
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(read_cases(client, headers, stop, samples)) for _ in range(readers)]
+    if during is not None:
+        await during
+    else:
+        await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return samples
+
+
+async def login_storm(client, logins: int) -> list:
+    async def one():
+        started = time.perf_counter()
+        r = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        r.raise_for_status()
+        return (time.perf_counter() - started) * 1000
+    return await asyncio.gather(*(one() for _ in range(logins)))
+
+
+def report(label: str, samples) -> None:
+    print(
+        f"{label:<32} n={len(samples):5d}  median={statistics.median(samples):8.1f}ms  "
+        f"p99={percentile(samples, 0.99):8.1f}ms"
+    )
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.logins + args.readers)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120, limits=limits) as client:
+        r = await client.post("/auth/register", json={"name": "Analyst", "email": EMAIL, "password": PASSWORD})
+        r.raise_for_status()
+        r = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        report("case list, idle", await measure_reads(client, headers, args.readers, args.seconds))
+
+        logins: list = []
+
+        async def storm():
+            logins.extend(await login_storm(client, args.logins))
+        report("case list, during login storm", await measure_reads(client, headers, args.readers, 0, storm()))
+        report(f"{args.logins} concurrent logins", logins)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that case endpoints keep their latency while many operators log in at once"
+    )
+    parser.add_argument("--logins", type=int, default=200, help="Concurrent logins in the storm")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent case-list clients")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of the idle baseline")
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    seed(args.cases)
+    server = start_server(args.port)
+    try:
+        asyncio.run(run(args))
+    finally:
+        server.terminate()
+        server.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
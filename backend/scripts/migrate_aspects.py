@@ -0,0 +1,167 @@
+import sys
+import os
+import argparse
+import time
+
+# Ensure backend root is on sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import bindparam, exists, or_, select, update
+
+from app.aspects import ASPECTS, structure_aspect
+from app.case_cache import HASHED_COLUMNS, content_hash
+from app.database import engine
+from app.models import NameKey, NameKeyCount, SourceCase, ensure_columns
+from app.names import write_name_keys
+from app.records import index_record
+
+# (derived column, source column, parser) for every column computed at ingest
+DERIVED = [
+    *((f"aspect_{a}", f"aspect_{a}_json", structure_aspect) for a in ASPECTS),
+    ("record_index", "structured_record", index_record),
+]
+TABLE = SourceCase.__table__
+
+# Rows with a source value whose derived column has not been filled yet
+NEEDS_BACKFILL = or_(*(
+    TABLE.c[source].isnot(None) & TABLE.c[target].is_(None) for target, source, _ in DERIVED
+))
+
+UPDATE_DERIVED = (
+    update(TABLE)
+    .where(TABLE.c.id == bindparam("_id"))
+    # Filling derived columns changes the content, so its hash is recomputed
+    .values({**{target: bindparam(f"_{target}") for target, _, _ in DERIVED}, "content_hash": None})
+)
+
+UPDATE_CONTENT_HASH = (
+    update(TABLE).where(TABLE.c.id == bindparam("_id")).values(content_hash=bindparam("_content_hash"))
+)
+
+
+def backfill(batch_size: int = 1000) -> int:
+    """Fill the columns computed at ingest (structured aspects from the
+    aspect_*_json text, record_index from structured_record) for older rows.
+
+    Rows are walked by id in batches of ``batch_size`` and each batch is
+    written with one executemany UPDATE. Structured values already present
+    are kept, so the script can be re-run or interrupted safely.
+    """
+    ensure_columns(engine)
+    updated = 0
+    last_id = 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(TABLE.c.id, *(TABLE.c[source] for _, source, _ in DERIVED), *(TABLE.c[t] for t, _, _ in DERIVED))
+                .where(TABLE.c.id > last_id, NEEDS_BACKFILL)
+                .order_by(TABLE.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                sources = row[1:1 + len(DERIVED)]
+                current = row[1 + len(DERIVED):]
+                item = {"_id": row.id}
+                for (target, _, parse), source, value in zip(DERIVED, sources, current):
+                    item[f"_{target}"] = value if value is not None else parse(source)
+                params.append(item)
+            conn.execute(UPDATE_DERIVED, params)
+        updated += len(rows)
+        last_id = rows[-1].id
+        print(f"Progress: {updated} rows backfilled (last id {last_id})", flush=True)
+
+    elapsed = time.perf_counter() - started
+    rate = updated / elapsed if elapsed > 0 else 0.0
+    print(f"Backfilled {updated} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return updated
+
+
+# Names with a character outside printable ASCII, whose keys changed when
+# non-Latin letters started being kept
+NON_ASCII_NAME = TABLE.c.candidate_name.op("GLOB")("*[^ -~]*")
+
+
+def backfill_name_keys(batch_size: int = 1000, rekey_non_ascii: bool = False) -> int:
+    """Write fuzzy-match name keys for cases that have a candidate_name but
+    no keys yet (ingested before the name_keys table existed), and with
+    ``rekey_non_ascii`` rewrite the keys of every non-ASCII name."""
+    NameKey.__table__.create(bind=engine, checkfirst=True)
+    NameKeyCount.__table__.create(bind=engine, checkfirst=True)
+    unkeyed = ~exists().where(NameKey.source_case_id == TABLE.c.id)
+    updated = 0
+    last_id = 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(TABLE.c.id, TABLE.c.candidate_name)
+                .where(
+                    TABLE.c.id > last_id,
+                    TABLE.c.candidate_name.isnot(None),
+                    or_(unkeyed, NON_ASCII_NAME) if rekey_non_ascii else unkeyed,
+                )
+                .order_by(TABLE.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            write_name_keys(conn, rows)
+        updated += len(rows)
+        last_id = rows[-1].id
+        print(f"Progress: {updated} names keyed (last id {last_id})", flush=True)
+
+    elapsed = time.perf_counter() - started
+    rate = updated / elapsed if elapsed > 0 else 0.0
+    print(f"Keyed {updated} names in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return updated
+
+
+def backfill_content_hash(batch_size: int = 1000) -> int:
+    """Store the ETag content hash of cases that have none (ingested before
+    it existed, or whose derived columns ``backfill`` just filled)."""
+    updated = 0
+    last_id = 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(TABLE.c.id, *(TABLE.c[c] for c in HASHED_COLUMNS))
+                .where(TABLE.c.id > last_id, TABLE.c.content_hash.is_(None))
+                .order_by(TABLE.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            conn.execute(UPDATE_CONTENT_HASH, [{"_id": row.id, "_content_hash": content_hash(row._mapping)} for row in rows])
+        updated += len(rows)
+        last_id = rows[-1].id
+        print(f"Progress: {updated} cases hashed (last id {last_id})", flush=True)
+
+    elapsed = time.perf_counter() - started
+    rate = updated / elapsed if elapsed > 0 else 0.0
+    print(f"Hashed {updated} cases in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return updated
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Backfill the structured aspect_* and record_index columns, the name_keys index and the content hash for rows ingested before them"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per UPDATE batch")
+    parser.add_argument(
+        "--rekey-names", action="store_true",
+        help="Also rewrite the name keys of non-ASCII names keyed before other scripts were kept",
+    )
+    args = parser.parse_args()
+    backfill(args.batch_size)
+    backfill_name_keys(args.batch_size, rekey_non_ascii=args.rekey_names)
+    backfill_content_hash(args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,15 @@ import pandas as pd
 import json
 import sys
 import os
+import time
+import hashlib
+import math
+from datetime import datetime
+from typing import Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 import re
 
@@ -9,9 +18,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Ensure we import DB configured for Turso if present
 from app.database import SessionLocal, engine
-from app.models import Base, Operator, SourceCase, CaseStatusSnapshot as CaseStatusModel, AspectFeedback, CaseLog
+from app.aspects import ASPECTS, structure_aspect
+from app.case_cache import HASHED_COLUMNS, content_hash
+from app.records import index_record
+from app.search import ensure_search_index
+from app.models import Base, Operator, SourceCase, CaseStatusSnapshot as CaseStatusModel, AspectFeedback, CaseLog, NameKey, NameKeyCount, ensure_columns, ensure_indexes
+from app.names import write_name_keys
 from app.auth import get_password_hash
 
+
 def create_default_operator(db: Session):
     """Create a default operator if none exists"""
     operator = db.query(Operator).first()
@@ -28,13 +43,474 @@ def create_default_operator(db: Session):
         return default_operator
     return operator
 
-def migrate_csv_data(csv_file_path: str, batch_size: int = 50):
+def sanitize_llm_output(raw_text: str) -> str:
+    if pd.isna(raw_text):
+        return json.dumps({"reasoning": "", "claims": []})
+    text = str(raw_text)
+    try:
+        obj = json.loads(text)
+    except Exception:
+        text2 = re.sub(r"'record:(\d+:\d+)'", r'"record:\\1"', text)
+        text2 = text2.replace("'", '"')
+        try:
+            obj = json.loads(text2)
+        except Exception:
+            return json.dumps({"reasoning": text, "claims": []})
+    reasoning = obj.get('reasoning') or (obj.get('category') or {}).get('reasoning') or ""
+    verdict = (obj.get('category') or {}).get('verdict')
+    claims = obj.get('claims') or []
+    norm_claims = []
+    for c in claims:
+        st = c.get('statement') if isinstance(c, dict) else str(c)
+        cits = []
+        raw_cits = c.get('citations', []) if isinstance(c, dict) else []
+        for cit in raw_cits:
+            m = re.search(r"(\d+):(\d+)", str(cit))
+            if m:
+                cits.append(f"record:{m.group(1)}:{m.group(2)}")
+        norm_claims.append({"statement": st, "citations": cits})
+    return json.dumps({"reasoning": reasoning, "claims": norm_claims, "category": {"verdict": verdict}})
+
+def parse_json_forgiving(raw_val):
+    try:
+        if isinstance(raw_val, (dict, list)):
+            return raw_val
+        return json.loads(raw_val)
+    except Exception:
+        try:
+            text = str(raw_val)
+            # attempt common fixes
+            text2 = re.sub(r"'record:(\d+:\d+)'", r'"record:\\1"', text)
+            text2 = text2.replace("'", '"')
+            return json.loads(text2)
+        except Exception:
+            return None
+
+def normalise_row(row, columns) -> dict:
+    """Turn one CSV row into the column values written to the v2 tables.
+
+    Shared by the row-by-row and bulk ingest paths so both store the same data.
+    """
+    profile_unique_id = str(row['profile_unique_id'])
+    dj_profile_id = str(row['dj_profile_id'])
+    pf = parse_json_forgiving(row['profile_info'])
+    profile_info = pf if pf is not None else {"raw": str(row['profile_info'])}
+    structured_record = row['structured_record']
+    candidate_name = None
+    m = re.search(r"Name\.fullName:\s*([^\n]+)", structured_record)
+    if m:
+        candidate_name = m.group(1).replace('-', '').strip()
+    hit_record = {
+        "dj_profile_id": dj_profile_id,
+        "source": profile_info.get('profile_sourceofname')
+    }
+    final_score = None
+    if 'final_score' in columns and pd.notna(row.get('final_score')):
+        final_score = float(row.get('final_score'))
+
+    # Parse aspect outputs if present, with the score stored on AspectFeedback
+    aspects = {}
+    aspect_structured = {}
+    for aspect in ASPECTS:
+        val = row.get(f'{aspect}_llm_output')
+        aspect_json = sanitize_llm_output(str(val)) if pd.notna(val) else None
+        aspect_structured[aspect] = structure_aspect(aspect_json)
+        score = None
+        if pd.notna(row.get('final_score')):
+            score = float(row.get('final_score'))
+        elif pd.notna(row.get(f'{aspect}_llm_verdict_score')):
+            score = float(row.get(f'{aspect}_llm_verdict_score'))
+        aspects[aspect] = (aspect_json, score)
+
+    return {
+        "profile_unique_id": profile_unique_id,
+        "dj_profile_id": dj_profile_id,
+        "reference_id": str(row.get('reference_id')) if 'reference_id' in columns else None,
+        "profile_info": profile_info,
+        "structured_record": structured_record,
+        "record_index": index_record(structured_record),
+        "hit_record": hit_record,
+        "candidate_name": candidate_name,
+        "final_score": final_score,
+        "aspects": aspects,
+        "aspect_structured": aspect_structured,
+    }
+
+def _merge_duplicate(old: dict, new: dict) -> dict:
+    """Fold a repeated (profile_unique_id, dj_profile_id) within one batch the
+    way the row-by-row path would: later non-empty values win."""
+    merged = {k: (new[k] if new[k] is not None else old[k]) for k in new if k not in ('aspects', 'aspect_structured')}
+    merged['aspect_structured'] = {
+        aspect: new['aspect_structured'][aspect] or old['aspect_structured'][aspect] for aspect in ASPECTS
+    }
+    merged['aspects'] = {
+        aspect: (
+            new['aspects'][aspect][0] or old['aspects'][aspect][0],
+            new['aspects'][aspect][1] if new['aspects'][aspect][1] is not None else old['aspects'][aspect][1],
+        )
+        for aspect in ASPECTS
+    }
+    return merged
+
+def _build_upsert(table, set_):
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(index_elements=[table.c.id], set_=set_(stmt.excluded, table.c))
+
+# Built once so SQLAlchemy compiles them once and runs each batch as an executemany
+SOURCE_CASE_UPSERT = _build_upsert(SourceCase.__table__, lambda new, old: {
+    'content_hash': new.content_hash,
+    **{col: func.coalesce(new[col], old[col]) for col in (
+        'reference_id', 'profile_info', 'structured_record', 'record_index', 'hit_record', 'candidate_name', 'final_score',
+        'aspect_name_json', 'aspect_age_json', 'aspect_nationality_json', 'aspect_risk_json',
+        'aspect_name', 'aspect_age', 'aspect_nationality', 'aspect_risk',
+    )},
+})
+ASPECT_FEEDBACK_UPSERT = _build_upsert(AspectFeedback.__table__, lambda new, old: {
+    'llm_output': new.llm_output,
+    'llm_verdict_score': func.coalesce(new.llm_verdict_score, old.llm_verdict_score),
+    'updated_at': func.now(),
+})
+
+def write_batch_bulk(db: Session, records: list, operator_id: int) -> None:
+    """Write one batch of normalised rows with set-based statements.
+
+    Existing keys for the batch are loaded with one tuple-keyed SELECT per table,
+    then every table is written with one executemany of a precompiled
+    ``INSERT ... ON CONFLICT DO UPDATE`` on its primary key.
+    """
+    by_key = {}
+    for rec in records:
+        key = (rec['profile_unique_id'], rec['dj_profile_id'])
+        by_key[key] = _merge_duplicate(by_key[key], rec) if key in by_key else rec
+    keys = list(by_key)
+
+    # Pre-load existing keys for the whole batch
+    src_ids = {
+        (p, d): i for i, p, d in db.query(SourceCase.id, SourceCase.profile_unique_id, SourceCase.dj_profile_id)
+        .filter(tuple_(SourceCase.profile_unique_id, SourceCase.dj_profile_id).in_(keys))
+    }
+    af_ids = {
+        (p, d, a): i for i, p, d, a in db.query(
+            AspectFeedback.id, AspectFeedback.profile_unique_id, AspectFeedback.dj_profile_id, AspectFeedback.aspect_type
+        ).filter(
+            tuple_(AspectFeedback.profile_unique_id, AspectFeedback.dj_profile_id).in_(keys),
+            AspectFeedback.operator_id == operator_id,
+        )
+    }
+    # Current content of re-ingested cases, to hash what the upsert's
+    # coalesce will leave in each row
+    existing = {
+        (row.profile_unique_id, row.dj_profile_id): row for row in db.execute(
+            select(*(SourceCase.__table__.c[c] for c in HASHED_COLUMNS))
+            .where(SourceCase.id.in_(list(src_ids.values())))
+        )
+    } if src_ids else {}
+    status_keys = set(
+        db.query(CaseStatusModel.profile_unique_id, CaseStatusModel.dj_profile_id)
+        .filter(tuple_(CaseStatusModel.profile_unique_id, CaseStatusModel.dj_profile_id).in_(keys))
+        .all()
+    )
+
+    # Upsert SourceCase
+    src_rows = []
+    for key, rec in by_key.items():
+        aspects = rec['aspects']
+        src_rows.append({
+            "id": src_ids.get(key),
+            "profile_unique_id": key[0],
+            "dj_profile_id": key[1],
+            "reference_id": rec['reference_id'],
+            "profile_info": rec['profile_info'],
+            "structured_record": rec['structured_record'],
+            "record_index": rec['record_index'],
+            "hit_record": rec['hit_record'],
+            "candidate_name": rec['candidate_name'],
+            "final_score": rec['final_score'],
+            "aspect_name_json": aspects['name'][0],
+            "aspect_age_json": aspects['age'][0],
+            "aspect_nationality_json": aspects['nationality'][0],
+            "aspect_risk_json": aspects['risk'][0],
+            **{f"aspect_{a}": rec['aspect_structured'][a] for a in ASPECTS},
+        })
+        row = src_rows[-1]
+        old = existing.get(key)
+        row["content_hash"] = content_hash(
+            row if old is None else {c: row[c] if row[c] is not None else old._mapping[c] for c in HASHED_COLUMNS}
+        )
+    db.execute(SOURCE_CASE_UPSERT, src_rows)
+
+    # Re-key fuzzy name matching from the merged names (new rows have ids now)
+    write_name_keys(db, db.query(SourceCase.id, SourceCase.candidate_name).filter(
+        tuple_(SourceCase.profile_unique_id, SourceCase.dj_profile_id).in_(keys)
+    ).all())
+
+    # Upsert AspectFeedback per aspect/operator
+    af_rows = []
+    for key, rec in by_key.items():
+        for aspect, (aspect_json, score) in rec['aspects'].items():
+            if aspect_json:
+                af_rows.append({
+                    "id": af_ids.get((key[0], key[1], aspect)),
+                    "profile_unique_id": key[0],
+                    "dj_profile_id": key[1],
+                    "aspect_type": aspect,
+                    "llm_output": aspect_json,
+                    "llm_verdict_score": score,
+                    "operator_id": operator_id,
+                })
+    if af_rows:
+        db.execute(ASPECT_FEEDBACK_UPSERT, af_rows)
+
+    # Init case status if missing
+    status_rows = [
+        {"profile_unique_id": k[0], "dj_profile_id": k[1], "case_status": "unreviewed", "aspects_status": {}}
+        for k in keys if k not in status_keys
+    ]
+    if status_rows:
+        db.execute(sqlite_insert(CaseStatusModel.__table__), status_rows)
+
+def write_row(db: Session, rec: dict, operator_id: int) -> None:
+    """Write one normalised row with per-row SELECT/INSERT/UPDATE round-trips."""
+    profile_unique_id = rec['profile_unique_id']
+    dj_profile_id = rec['dj_profile_id']
+    aspect_name_json = rec['aspects']['name'][0]
+    aspect_age_json = rec['aspects']['age'][0]
+    aspect_nat_json = rec['aspects']['nationality'][0]
+    aspect_risk_json = rec['aspects']['risk'][0]
+
+    # Upsert SourceCase
+    src = db.query(SourceCase).filter(
+        SourceCase.profile_unique_id==profile_unique_id,
+        SourceCase.dj_profile_id==dj_profile_id
+    ).first()
+    if not src:
+        src = SourceCase(
+            profile_unique_id=profile_unique_id,
+            dj_profile_id=dj_profile_id,
+            reference_id=rec['reference_id'],
+            profile_info=rec['profile_info'],
+            structured_record=rec['structured_record'],
+            record_index=rec['record_index'],
+            hit_record=rec['hit_record'],
+            candidate_name=rec['candidate_name'],
+            final_score=rec['final_score'],
+            aspect_name_json=aspect_name_json,
+            aspect_age_json=aspect_age_json,
+            aspect_nationality_json=aspect_nat_json,
+            aspect_risk_json=aspect_risk_json,
+            **{f"aspect_{a}": rec['aspect_structured'][a] for a in ASPECTS},
+        )
+        db.add(src)
+    else:
+        src.reference_id=rec['reference_id'] if rec['reference_id'] is not None else src.reference_id
+        src.profile_info=rec['profile_info'] or src.profile_info
+        src.structured_record=rec['structured_record'] or src.structured_record
+        src.record_index=rec['record_index'] or src.record_index
+        src.hit_record=rec['hit_record'] or src.hit_record
+        src.candidate_name=rec['candidate_name'] or src.candidate_name
+        src.final_score=rec['final_score'] if rec['final_score'] is not None else src.final_score
+        src.aspect_name_json=aspect_name_json or src.aspect_name_json
+        src.aspect_age_json=aspect_age_json or src.aspect_age_json
+        src.aspect_nationality_json=aspect_nat_json or src.aspect_nationality_json
+        src.aspect_risk_json=aspect_risk_json or src.aspect_risk_json
+        for a in ASPECTS:
+            setattr(src, f"aspect_{a}", rec['aspect_structured'][a] or getattr(src, f"aspect_{a}"))
+    src.content_hash = content_hash(src)
+    db.flush()
+    write_name_keys(db, [(src.id, src.candidate_name)])
+
+    # Upsert AspectFeedback per aspect/operator
+    for aspect, (aspect_json, score) in rec['aspects'].items():
+        if aspect_json:
+            af = db.query(AspectFeedback).filter(
+                AspectFeedback.profile_unique_id==profile_unique_id,
+                AspectFeedback.dj_profile_id==dj_profile_id,
+                AspectFeedback.aspect_type==aspect,
+                AspectFeedback.operator_id==operator_id
+            ).first()
+            if not af:
+                db.add(AspectFeedback(
+                    profile_unique_id=profile_unique_id,
+                    dj_profile_id=dj_profile_id,
+                    aspect_type=aspect,
+                    llm_output=aspect_json,
+                    llm_verdict_score=score,
+                    operator_id=operator_id
+                ))
+            else:
+                af.llm_output = aspect_json
+                af.llm_verdict_score = score if score is not None else af.llm_verdict_score
+
+    # Init case status if missing
+    status = db.query(CaseStatusModel).filter(
+        CaseStatusModel.profile_unique_id==profile_unique_id,
+        CaseStatusModel.dj_profile_id==dj_profile_id
+    ).first()
+    if not status:
+        db.add(CaseStatusModel(
+            profile_unique_id=profile_unique_id,
+            dj_profile_id=dj_profile_id,
+            case_status='unreviewed',
+            aspects_status={}
+        ))
+
+def normalise_batch(batch):
+    """Normalise one ``(columns, [(index, row), ...])`` batch.
+
+    Returns ``(index, record, error)`` triples in input order. Runs in the
+    worker processes when ``--workers`` > 1, so it must stay a top-level function.
+    """
+    columns, rows = batch
+    out = []
+    for index, row in rows:
+        try:
+            out.append((index, normalise_row(row, columns), None))
+        except Exception as e:
+            out.append((index, None, str(e)))
+    return out
+
+def iter_csv_batches(csv_file_path: str, chunk_size: int, batch_size: int, start: int = 0):
+    """Stream the CSV ``chunk_size`` rows at a time and yield ``batch_size`` row batches.
+
+    Rows before ``start`` (a checkpointed offset) are skipped by the reader's
+    tokenizer, so resuming never builds or normalises them. Row offsets stay
+    those of the whole file.
+    """
+    options = {}
+    if start:
+        # An integer skiprows skips whole records (quoted newlines included),
+        # so the header is skipped too and its names given back explicitly
+        options = {"skiprows": start + 1, "header": None, "names": list(pd.read_csv(csv_file_path, nrows=0).columns)}
+    for chunk in pd.read_csv(csv_file_path, chunksize=chunk_size, **options):
+        columns = list(chunk.columns)
+        rows = list(zip(chunk.index + start, chunk.to_dict('records')))
+        # Drop the chunk before the reader materialises the next one
+        del chunk
+        for i in range(0, len(rows), batch_size):
+            yield columns, rows[i:i + batch_size]
+
+def iter_journal_batches(journal_path: str, batch_size: int):
+    """Yield batches of the raw rows recorded in an error journal, for replay."""
+    rows = []
+    with open(journal_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            rows.append((entry['row'], entry['raw']))
+            if len(rows) >= batch_size:
+                yield list(rows[0][1].keys()), rows
+                rows = []
+    if rows:
+        yield list(rows[0][1].keys()), rows
+
+def iter_normalised_batches(batches, workers: int = 1):
+    """Normalise batches in order, optionally on a process pool.
+
+    Yields ``(rows, results)`` per batch. The pool only ever holds
+    ``2 * workers`` batches in flight, so it reads ahead of the single DB writer
+    without giving up the bounded memory of streaming.
+    """
+    if workers <= 1:
+        for batch in batches:
+            yield batch[1], normalise_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append((batch[1], pool.submit(normalise_batch, batch)))
+            if len(pending) >= workers * 2:
+                rows, future = pending.popleft()
+                yield rows, future.result()
+        while pending:
+            rows, future = pending.popleft()
+            yield rows, future.result()
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_checkpoint(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_checkpoint(path: str, csv_file_path: str, digest: str, offset: int) -> None:
+    """Record the input offset up to which every row is committed or journaled."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "csv": os.path.abspath(csv_file_path),
+            "sha256": digest,
+            "offset": offset,
+            "updated_at": datetime.utcnow().isoformat(),
+        }, f)
+    # Atomic so a crash mid-write never leaves a truncated checkpoint
+    os.replace(tmp_path, path)
+
+def journal_error(journal, index, error: str, row: dict) -> None:
+    """Append one failed row to the error journal so it can be replayed alone."""
+    raw = {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in row.items()}
+    journal.write(json.dumps({"row": int(index), "error": error, "raw": raw}, default=str) + "\n")
+    journal.flush()
+
+def write_rows_isolated(db: Session, records: list, operator_id: int, on_error) -> int:
+    """Write rows one by one so a bad row is journaled without losing the rest.
+
+    Each row is flushed on its own; when one fails the transaction is rolled
+    back and the batch is replayed without it. Returns the number of rows
+    written (uncommitted).
+    """
+    pending = list(records)
+    while pending:
+        for i, (index, rec) in enumerate(pending):
+            try:
+                write_row(db, rec, operator_id)
+                db.flush()
+            except Exception as e:
+                db.rollback()
+                on_error(index, str(e))
+                pending = pending[:i] + pending[i + 1:]
+                break
+        else:
+            return len(pending)
+    return 0
+
+def migrate_csv_data(
+    csv_file_path: str,
+    batch_size: int = 50,
+    bulk: bool = False,
+    chunk_size: int = 10000,
+    workers: int = 1,
+    resume: bool = False,
+    checkpoint_path: Optional[str] = None,
+    error_journal_path: Optional[str] = None,
+    replay: bool = False,
+):
     """Migrate data from CSV to v2 tables only.
 
     Accepts fe_input.csv style columns: profile_unique_id, dj_profile_id, profile_info,
     structured_record, name_llm_output, age_llm_output, nationality_llm_output,
     risk_llm_output, final_score, reference_id (optional)
+
+    The CSV is streamed ``chunk_size`` rows at a time, so memory use is bounded by
+    one chunk rather than the whole file. Rows are normalised on ``workers``
+    processes and written by this process alone. With ``bulk=True`` each batch is
+    written with set-based upserts (see ``write_batch_bulk``) instead of per-row
+    SELECT/INSERT round-trips.
+
+    After every committed batch the input offset and file hash are saved to
+    ``checkpoint_path``; ``resume=True`` continues from there. Rows that fail are
+    appended to ``error_journal_path`` (row index, error, raw row), and
+    ``replay=True`` treats ``csv_file_path`` as such a journal and re-ingests
+    only those rows.
     """
+    checkpoint_path = checkpoint_path or f"{csv_file_path}.checkpoint.json"
+    error_journal_path = error_journal_path or f"{csv_file_path}.errors.jsonl"
 
     # Create only v2 tables if not exist
     SourceCase.__table__.create(bind=engine, checkfirst=True)
@@ -42,186 +518,79 @@ def migrate_csv_data(csv_file_path: str, batch_size: int = 50):
     AspectFeedback.__table__.create(bind=engine, checkfirst=True)
     Operator.__table__.create(bind=engine, checkfirst=True)
     CaseLog.__table__.create(bind=engine, checkfirst=True)
+    NameKey.__table__.create(bind=engine, checkfirst=True)
+    NameKeyCount.__table__.create(bind=engine, checkfirst=True)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    ensure_search_index(engine)
+
+    digest = None
+    start = 0
+    if replay:
+        print(f"Replaying failed rows from journal {csv_file_path}")
+        batches = iter_journal_batches(csv_file_path, batch_size)
+    else:
+        digest = file_sha256(csv_file_path)
+        if resume:
+            checkpoint = load_checkpoint(checkpoint_path)
+            if checkpoint is None:
+                print(f"No checkpoint at {checkpoint_path}; starting from row 0")
+            elif checkpoint.get('sha256') != digest:
+                print(f"Checkpoint {checkpoint_path} was written for different file contents; refusing to resume")
+                return
+            else:
+                start = int(checkpoint['offset'])
+                print(f"Resuming from row {start} (checkpoint {checkpoint_path})")
+        print(f"Streaming {csv_file_path} in chunks of {chunk_size} rows ({workers} normalise worker(s))")
+        batches = iter_csv_batches(csv_file_path, chunk_size, batch_size, start=start)
 
     db = SessionLocal()
+    # Append when resuming so earlier failures stay replayable
+    journal = open(error_journal_path, "a" if resume else "w")
     try:
         operator = create_default_operator(db)
         print(f"Using operator: {operator.name} (ID: {operator.id})")
 
-        df = pd.read_csv(csv_file_path)
-        print(f"Processing {len(df)} rows from CSV")
-
-        def sanitize_llm_output(raw_text: str) -> str:
-            if pd.isna(raw_text):
-                return json.dumps({"reasoning": "", "claims": []})
-            text = str(raw_text)
-            try:
-                obj = json.loads(text)
-            except Exception:
-                text2 = re.sub(r"'record:(\d+:\d+)'", r'"record:\\1"', text)
-                text2 = text2.replace("'", '"')
-                try:
-                    obj = json.loads(text2)
-                except Exception:
-                    return json.dumps({"reasoning": text, "claims": []})
-            reasoning = obj.get('reasoning') or (obj.get('category') or {}).get('reasoning') or ""
-            verdict = (obj.get('category') or {}).get('verdict')
-            claims = obj.get('claims') or []
-            norm_claims = []
-            for c in claims:
-                st = c.get('statement') if isinstance(c, dict) else str(c)
-                cits = []
-                raw_cits = c.get('citations', []) if isinstance(c, dict) else []
-                for cit in raw_cits:
-                    m = re.search(r"(\d+):(\d+)", str(cit))
-                    if m:
-                        cits.append(f"record:{m.group(1)}:{m.group(2)}")
-                norm_claims.append({"statement": st, "citations": cits})
-            return json.dumps({"reasoning": reasoning, "claims": norm_claims, "category": {"verdict": verdict}})
-
-        def parse_json_forgiving(raw_val):
-            try:
-                if isinstance(raw_val, (dict, list)):
-                    return raw_val
-                return json.loads(raw_val)
-            except Exception:
-                try:
-                    text = str(raw_val)
-                    # attempt common fixes
-                    text2 = re.sub(r"'record:(\d+:\d+)'", r'"record:\\1"', text)
-                    text2 = text2.replace("'", '"')
-                    return json.loads(text2)
-                except Exception:
-                    return None
-
         success_count = 0
         error_count = 0
-        total = len(df)
-        ops_in_batch = 0
+        processed = 0
+        started = time.perf_counter()
 
-        for index, row in df.iterrows():
-            try:
-                profile_unique_id = row['profile_unique_id']
-                dj_profile_id = row['dj_profile_id']
-                pf = parse_json_forgiving(row['profile_info'])
-                profile_info = pf if pf is not None else {"raw": str(row['profile_info'])}
-                structured_record = row['structured_record']
-                candidate_name = None
-                m = re.search(r"Name\.fullName:\s*([^\n]+)", structured_record)
-                if m:
-                    candidate_name = m.group(1).replace('-', '').strip()
-                hit_record = {
-                    "dj_profile_id": dj_profile_id,
-                    "source": profile_info.get('profile_sourceofname')
-                }
-
-                # Parse aspect outputs if present
-                def get_aspect(col):
-                    val = row.get(col)
-                    return sanitize_llm_output(str(val)) if pd.notna(val) else None
-                aspect_name_json = get_aspect('name_llm_output')
-                aspect_age_json = get_aspect('age_llm_output')
-                aspect_nat_json = get_aspect('nationality_llm_output')
-                aspect_risk_json = get_aspect('risk_llm_output')
-
-                # Upsert SourceCase
-                src = db.query(SourceCase).filter(
-                    SourceCase.profile_unique_id==profile_unique_id,
-                    SourceCase.dj_profile_id==dj_profile_id
-                ).first()
-                if not src:
-                    src = SourceCase(
-                        profile_unique_id=profile_unique_id,
-                        dj_profile_id=dj_profile_id,
-                        reference_id=str(row.get('reference_id')) if 'reference_id' in df.columns else None,
-                        profile_info=profile_info,
-                        structured_record=structured_record,
-                        hit_record=hit_record,
-                        candidate_name=candidate_name,
-                        final_score=float(row.get('final_score')) if 'final_score' in df.columns and pd.notna(row.get('final_score')) else None,
-                        aspect_name_json=aspect_name_json,
-                        aspect_age_json=aspect_age_json,
-                        aspect_nationality_json=aspect_nat_json,
-                        aspect_risk_json=aspect_risk_json,
-                    )
-                    db.add(src)
+        for rows, results in iter_normalised_batches(batches, workers):
+            raw_rows = dict(rows)
+            processed += len(results)
+
+            def on_error(index, error):
+                nonlocal error_count
+                print(f"Error processing row {index}: {error}")
+                journal_error(journal, index, error, raw_rows[index])
+                error_count += 1
+
+            records = []
+            for index, rec, err in results:
+                if err is not None:
+                    on_error(index, err)
                 else:
-                    src.reference_id=str(row.get('reference_id')) if 'reference_id' in df.columns else src.reference_id
-                    src.profile_info=profile_info or src.profile_info
-                    src.structured_record=structured_record or src.structured_record
-                    src.hit_record=hit_record or src.hit_record
-                    src.candidate_name=candidate_name or src.candidate_name
-                    src.final_score=float(row.get('final_score')) if 'final_score' in df.columns and pd.notna(row.get('final_score')) else src.final_score
-                    src.aspect_name_json=aspect_name_json or src.aspect_name_json
-                    src.aspect_age_json=aspect_age_json or src.aspect_age_json
-                    src.aspect_nationality_json=aspect_nat_json or src.aspect_nationality_json
-                    src.aspect_risk_json=aspect_risk_json or src.aspect_risk_json
-
-                # Upsert AspectFeedback per aspect/operator
-                for aspect, aspect_json in {
-                    'name': aspect_name_json,
-                    'age': aspect_age_json,
-                    'nationality': aspect_nat_json,
-                    'risk': aspect_risk_json,
-                }.items():
-                    if aspect_json:
-                        af = db.query(AspectFeedback).filter(
-                            AspectFeedback.profile_unique_id==profile_unique_id,
-                            AspectFeedback.dj_profile_id==dj_profile_id,
-                            AspectFeedback.aspect_type==aspect,
-                            AspectFeedback.operator_id==operator.id
-                        ).first()
-                        score = None
-                        if pd.notna(row.get('final_score')):
-                            score = float(row.get('final_score'))
-                        elif pd.notna(row.get(f'{aspect}_llm_verdict_score')):
-                            score = float(row.get(f'{aspect}_llm_verdict_score'))
-                        if not af:
-                            db.add(AspectFeedback(
-                                profile_unique_id=profile_unique_id,
-                                dj_profile_id=dj_profile_id,
-                                aspect_type=aspect,
-                                llm_output=aspect_json,
-                                llm_verdict_score=score,
-                                operator_id=operator.id
-                            ))
-                        else:
-                            af.llm_output = aspect_json
-                            af.llm_verdict_score = score if score is not None else af.llm_verdict_score
-
-                # Init case status if missing
-                status = db.query(CaseStatusModel).filter(
-                    CaseStatusModel.profile_unique_id==profile_unique_id,
-                    CaseStatusModel.dj_profile_id==dj_profile_id
-                ).first()
-                if not status:
-                    db.add(CaseStatusModel(
-                        profile_unique_id=profile_unique_id,
-                        dj_profile_id=dj_profile_id,
-                        case_status='unreviewed',
-                        aspects_status={}
-                    ))
-                success_count += 1
-                if index % 20 == 0 or index == total - 1:
-                    print(f"Progress: {index+1}/{total} processed (ok={success_count}, err={error_count})", flush=True)
-
-                # Batch commit to avoid large end-of-run commit stalls
-                ops_in_batch += 1
-                if ops_in_batch >= batch_size:
-                    print(f"Committing batch (size={ops_in_batch})…", flush=True)
+                    records.append((index, rec))
+            if bulk and records:
+                try:
+                    write_batch_bulk(db, [rec for _, rec in records], operator.id)
                     db.commit()
-                    ops_in_batch = 0
-            except Exception as e:
-                print(f"Error processing row {index}: {str(e)}")
-                db.rollback()
-                error_count += 1
-                if index % 20 == 0 or index == total - 1:
-                    print(f"Progress: {index+1}/{total} processed (ok={success_count}, err={error_count})", flush=True)
-                continue
+                    success_count += len(records)
+                    records = []
+                except Exception as e:
+                    # Fall back to row-by-row so only the offending rows are journaled
+                    print(f"Error writing batch ending at row {records[-1][0]}: {str(e)}; retrying rows individually")
+                    db.rollback()
+            if records:
+                success_count += write_rows_isolated(db, records, operator.id, on_error)
+                print(f"Committing batch (size={len(records)})…", flush=True)
+                db.commit()
+            if digest is not None:
+                save_checkpoint(checkpoint_path, csv_file_path, digest, int(rows[-1][0]) + 1)
+            print(f"Progress: {start + processed} processed (ok={success_count}, err={error_count})", flush=True)
 
-        if ops_in_batch > 0:
-            print(f"Committing final batch (size={ops_in_batch})…", flush=True)
-            db.commit()
+        elapsed = time.perf_counter() - started
         print("Migration completed successfully (v2 only)!")
 
         total_src = db.query(SourceCase).count()
@@ -233,10 +602,18 @@ def migrate_csv_data(csv_file_path: str, batch_size: int = 50):
         print(f"- AspectFeedback: {total_feedback}")
         print(f"- Rows OK: {success_count}")
         print(f"- Rows ERR: {error_count}")
+        print(f"- Mode: {'bulk' if bulk else 'row-by-row'}")
+        print(f"- Elapsed: {elapsed:.2f}s")
+        print(f"- Throughput: {processed / elapsed if elapsed > 0 else 0:.1f} rows/sec")
+        if error_count:
+            print(f"- Failed rows journaled to: {error_journal_path} (replay with --replay-errors)")
     except Exception as e:
         print(f"Migration failed: {str(e)}")
+        if digest is not None:
+            print(f"Committed progress is checkpointed in {checkpoint_path}; rerun with --resume to continue")
         db.rollback()
     finally:
+        journal.close()
         db.close()
 
 if __name__ == "__main__":
@@ -244,10 +621,27 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Migrate CSV into v2 tables (Turso)")
     parser.add_argument("csv", nargs="?", default="/Users/simonting/Documents/aml-agent/aml-agent-fe/fe_input.csv", help="Path to CSV (default: repo fe_input.csv)")
     parser.add_argument("--batch-size", type=int, default=50, help="Rows per commit batch (default 50)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows read from the CSV per chunk; bounds peak memory (default 10000)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to normalise LLM outputs before the single DB writer (default 1)")
+    parser.add_argument("--bulk", action="store_true", help="Write each batch with set-based upserts instead of per-row queries")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last committed offset in the checkpoint file")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default <csv>.checkpoint.json)")
+    parser.add_argument("--error-journal", default=None, help="JSONL file for failed rows (default <csv>.errors.jsonl)")
+    parser.add_argument("--replay-errors", action="store_true", help="Treat the input as an error journal and re-ingest only its rows")
     args = parser.parse_args()
 
     if not os.path.exists(args.csv):
         print(f"CSV file not found: {args.csv}")
         sys.exit(1)
 
-    migrate_csv_data(args.csv, batch_size=args.batch_size)
\ No newline at end of file
+    migrate_csv_data(
+        args.csv,
+        batch_size=args.batch_size,
+        bulk=args.bulk,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        resume=args.resume,
+        checkpoint_path=args.checkpoint,
+        error_journal_path=args.error_journal,
+        replay=args.replay_errors,
+    )
@@ -0,0 +1,67 @@
+import sys
+import os
+import argparse
+import time
+
+# Ensure backend root is on sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import String, func, select, type_coerce, update
+
+from app.database import engine
+from app.models import CaseLog, ensure_columns
+
+TABLE = CaseLog.__table__
+CREATED_AT = type_coerce(TABLE.c.created_at, String)
+
+
+def normalize(batch_size: int = 50000) -> int:
+    """Rewrite ``case_logs.created_at`` values stored by the old
+    CURRENT_TIMESTAMP default ('YYYY-MM-DD HH:MM:SS') in the
+    'YYYY-MM-DD HH:MM:SS.ffffff' form every new row uses, and give those
+    rows an ``event_id``.
+
+    Rows are walked by id in batches of ``batch_size``; rewritten rows no
+    longer match, so the script can be re-run or interrupted safely.
+    """
+    ensure_columns(engine)
+    updated = 0
+    last_id = 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as conn:
+            ids =select(TABLE.c.id).where(TABLE.c.id > last_id).order_by(TABLE.c.id).limit(batch_size).subquery()
+            last = conn.execute(select(func.max(ids.c.id))).scalar()
+            if last is None:
+                break
+            result = conn.execute(
+                update(TABLE)
+                .where(TABLE.c.id > last_id, TABLE.c.id <= last, func.length(CREATED_AT) == 19)
+                .values(created_at=CREATED_AT.concat(".000000"))
+            )
+            conn.execute(
+                update(TABLE)
+                .where(TABLE.c.id > last_id, TABLE.c.id <= last, TABLE.c.event_id.is_(None))
+                .values(event_id=func.lower(func.hex(func.randomblob(16))))
+            )
+        updated += result.rowcount
+        last_id = last
+        print(f"Progress: {updated} timestamps rewritten (through id {last_id})", flush=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"Rewrote {updated} case_logs timestamps in {elapsed:.2f}s")
+    return updated
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Store every case_logs.created_at as 'YYYY-MM-DD HH:MM:SS.ffffff'"
+    )
+    parser.add_argument("--batch-size", type=int, default=50000, help="Rows per UPDATE transaction")
+    args = parser.parse_args()
+    normalize(args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
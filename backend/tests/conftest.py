@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Import the app against a throwaway local SQLite file: app.database falls
+# back to ./aml_screening.db in the working directory when no Turso URL is
+# configured, and app.main creates its tables on import.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.pop("TURSO_DATABASE_URL", None)
+os.environ.setdefault("AUDIT_WAL_DIR", os.path.join(tempfile.mkdtemp(prefix="aml-test-wal-"), "wal"))
+os.chdir(tempfile.mkdtemp(prefix="aml-test-"))
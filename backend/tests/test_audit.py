@@ -0,0 +1,70 @@
+"""Case log events are recorded exactly for the changes that commit."""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app import audit
+from app.auth import get_current_operator
+from app.database import SessionLocal
+from app.main import app
+from app.models import CaseLog, CaseStatusSnapshot, Operator
+
+
+def _logged(profile_id: str) -> int:
+    audit.sink.flush()
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(CaseLog).where(CaseLog.profile_unique_id == profile_id))
+
+
+def _change_status(profile_id: str, commit: bool) -> None:
+    with SessionLocal() as db:
+        db.add(CaseStatusSnapshot(profile_unique_id=profile_id, dj_profile_id="D1", case_status="closed", aspects_status={}))
+        audit.log_event(profile_id, "D1", "status_change", {"case_status": "closed"}, None, db)
+        if commit:
+            db.commit()
+        else:
+            db.rollback()
+
+
+@pytest.fixture(params=[True, False], ids=["write-behind", "in-transaction"])
+def write_behind(request, monkeypatch):
+    monkeypatch.setattr(audit, "WRITE_BEHIND", request.param)
+    return request.param
+
+
+def test_committed_change_is_logged(write_behind):
+    profile_id = uuid.uuid4().hex
+    _change_status(profile_id, commit=True)
+    assert _logged(profile_id) == 1
+
+
+def test_rolled_back_change_is_not_logged(write_behind):
+    profile_id = uuid.uuid4().hex
+    _change_status(profile_id, commit=False)
+    assert _logged(profile_id) == 0
+
+
+def test_failed_commit_is_not_logged(write_behind):
+    profile_id = uuid.uuid4().hex
+    _change_status(profile_id, commit=True)
+    # The same case key again: the commit fails on the unique index
+    with pytest.raises(Exception):
+        _change_status(profile_id, commit=True)
+    assert _logged(profile_id) == 1
+
+
+def test_appended_log_returns_its_id():
+    operator = Operator(id=1, name="Reviewer", email="reviewer@example.com", password_hash="x")
+    app.dependency_overrides[get_current_operator] = lambda: operator
+    try:
+        response = TestClient(app).post("/v2/cases/P1/D1/logs", json={"event_type": "comment", "payload": {"text": "hi"}})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert isinstance(body["id"], int)
+    with SessionLocal() as db:
+        assert db.get(CaseLog, body["id"]).event_id == body["event_id"]
@@ -0,0 +1,91 @@
+"""POST /v2/cases/status:batch: response shape and statement count."""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth import get_current_operator
+from app.database import get_db
+from app.main import app
+from app.models import Base, CaseStatusSnapshot, Operator
+from app.schemas import CaseStatusSchema
+
+
+@pytest.fixture
+def status_db():
+    """An in-memory database with statuses for P0..P9, the session factory
+    and a list of the statements executed on it."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session(expire_on_commit=False) as db:
+        operator = Operator(name="Reviewer", email="reviewer@example.com", password_hash="x")
+        db.add(operator)
+        db.add_all([
+            CaseStatusSnapshot(
+                profile_unique_id=f"P{i}", dj_profile_id=f"D{i}", case_status="in_review",
+                aspects_status={"name": "agree", "age": None}, last_updated_by=1,
+                last_updated_at=datetime(2024, 5, 1, 12, 30, i, 1000 * i),
+            )
+            for i in range(10)
+        ])
+        db.commit()
+        db.expunge(operator)
+
+    def session():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    app.dependency_overrides[get_db] = session
+    app.dependency_overrides[get_current_operator] = lambda: operator
+    yield Session, statements
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+def _pairs(keys):
+    return {"pairs": [{"profile_unique_id": p, "dj_profile_id": d} for p, d in keys]}
+
+
+def test_batch_status_matches_schema(status_db):
+    Session, _ = status_db
+    keys = [("P3", "D3"), ("P0", "D0"), ("P3", "D3"), ("N1", "D1")]
+
+    response = TestClient(app).post("/v2/cases/status:batch", json=_pairs(keys))
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [(i["profile_unique_id"], i["dj_profile_id"]) for i in items] == keys
+    with Session() as db:
+        for item in items:
+            status = db.query(CaseStatusSnapshot).filter_by(
+                profile_unique_id=item["profile_unique_id"], dj_profile_id=item["dj_profile_id"]
+            ).one()
+            assert item["status"] == CaseStatusSchema.model_validate(status, from_attributes=True).model_dump(mode="json")
+    assert items[3]["status"]["case_status"] == "unreviewed"
+
+
+@pytest.mark.parametrize("size", [1, 10])
+def test_batch_status_statement_count_is_flat(status_db, size):
+    _, statements = status_db
+    client = TestClient(app)
+
+    client.post("/v2/cases/status:batch", json=_pairs([(f"P{i}", f"D{i}") for i in range(size)]))
+    assert len(statements) == 1, statements
+
+    del statements[:]
+    client.post("/v2/cases/status:batch", json=_pairs([(f"N{i}", f"D{i}") for i in range(size)]))
+    # select, insert of the missing defaults, re-select
+    assert len(statements) == 3, statements
@@ -0,0 +1,87 @@
+"""Statement count of GET /v2/cases/{profile_id}/{dj_id}/review."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth import get_current_operator
+from app.main import app
+from app.models import AspectFeedback, Base, CaseLog, CaseStatusSnapshot, Operator, SourceCase
+from app.replica import get_read_db
+
+# case+status, feedback, recent logs
+CASE_REVIEW_MAX_STATEMENTS = 3
+
+
+@pytest.fixture
+def review_db():
+    """A seeded in-memory database serving the review endpoint, and a list
+    of the statements executed on it."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session(expire_on_commit=False) as db:
+        operator = Operator(name="Reviewer", email="reviewer@example.com", password_hash="x")
+        db.add(operator)
+        db.add_all([
+            SourceCase(profile_unique_id="P1", dj_profile_id="D1", structured_record="x", candidate_name="Open Case"),
+            SourceCase(profile_unique_id="P2", dj_profile_id="D2", structured_record="y", candidate_name="New Case"),
+            CaseStatusSnapshot(profile_unique_id="P1", dj_profile_id="D1", case_status="in_review", aspects_status={}),
+        ])
+        db.commit()
+        db.add_all([
+            AspectFeedback(profile_unique_id="P1", dj_profile_id="D1", aspect_type=a, operator_id=operator.id)
+            for a in ("name", "age", "nationality", "risk")
+        ])
+        db.add_all([
+            CaseLog(profile_unique_id="P1", dj_profile_id="D1", event_type="comment", payload={"n": i}, operator_id=operator.id)
+            for i in range(50)
+        ])
+        db.commit()
+        db.expunge(operator)
+
+    def read_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[get_current_operator] = lambda: operator
+    yield statements
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+def test_review_statement_count(review_db):
+    response = TestClient(app).get("/v2/cases/P1/D1/review")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"]["case_status"] == "in_review"
+    assert len(body["feedback"]) == 4
+    assert len(body["recent_logs"]) == 20
+    assert len(review_db) <= CASE_REVIEW_MAX_STATEMENTS, review_db
+
+
+def test_review_of_unopened_case_statement_count(review_db):
+    response = TestClient(app).get("/v2/cases/P2/D2/review")
+
+    assert response.status_code == 200
+    assert response.json()["status"] is None
+    assert len(review_db) <= CASE_REVIEW_MAX_STATEMENTS, review_db
+
+
+def test_review_statement_count_does_not_grow_with_log_limit(review_db):
+    response = TestClient(app).get("/v2/cases/P1/D1/review", params={"log_limit": 50})
+
+    assert len(response.json()["recent_logs"]) == 50
+    assert len(review_db) <= CASE_REVIEW_MAX_STATEMENTS, review_db
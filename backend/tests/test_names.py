@@ -0,0 +1,100 @@
+"""Fuzzy name keys and GET /v2/cases/similar-names across scripts."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth import get_current_operator
+from app.main import app
+from app.models import Base, Operator, SourceCase
+from app.names import name_keys, name_tokens, similarity, write_name_keys
+from app.replica import get_read_db
+
+NAMES = [
+    "Mohamed Ali",
+    "José Müller",
+    "Владимир Путин",
+    "Владислав Петров",
+    "محمد علي",
+    "王小明",
+    "김정은",
+]
+
+
+@pytest.mark.parametrize("name, tokens", [
+    ("José  MÜLLER", ["jose", "muller"]),
+    ("Łukasz O'Brien", ["brien", "lukasz", "o"]),
+    ("Владимир Путин", ["владимир", "путин"]),
+    ("محمد علي", ["علي", "محمد"]),
+    ("王小明", ["王小明"]),
+    ("김정은", ["김정은"]),
+])
+def test_name_tokens_keep_every_script(name, tokens):
+    assert name_tokens(name) == tokens
+
+
+@pytest.mark.parametrize("name", ["Владимир Путин", "محمد علي", "王小明", "김정은"])
+def test_non_latin_names_get_trigram_keys(name):
+    keys = name_keys(name)
+    assert keys and all(k.startswith("g:") for k in keys)
+
+
+def test_ascii_keys_unchanged():
+    assert name_keys("Mohamed Ali") == {
+        "g: mo", "g:moh", "g:oha", "g:ham", "g:ame", "g:med", "g:ed ",
+        "g: al", "g:ali", "g:li ", "s:M530", "s:A400",
+    }
+
+
+def test_non_latin_similarity():
+    assert similarity("Путин Владимир", "Владимир Путин") == 1.0
+    assert similarity("Владимир Путен", "Владимир Путин") > similarity("Владимир Путен", "Владислав Петров")
+    assert similarity("王小明", "Mohamed Ali") == 0.0
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session(expire_on_commit=False) as db:
+        operator = Operator(name="Reviewer", email="reviewer@example.com", password_hash="x")
+        db.add(operator)
+        cases = [
+            SourceCase(profile_unique_id=f"P{i}", dj_profile_id=f"D{i}", structured_record="x", candidate_name=name)
+            for i, name in enumerate(NAMES)
+        ]
+        db.add_all(cases)
+        db.flush()
+        write_name_keys(db, [(case.id, case.candidate_name) for case in cases])
+        db.commit()
+        db.expunge(operator)
+
+    def read_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[get_current_operator] = lambda: operator
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Путин Владимир", "Владимир Путин"),
+    ("Владимир Путен", "Владимир Путин"),
+    ("علي محمد", "محمد علي"),
+    ("王小明", "王小明"),
+    ("Muhammad Aly", "Mohamed Ali"),
+])
+def test_similar_names_endpoint(client, query, expected):
+    response = client.get("/v2/cases/similar-names", params={"name": query})
+
+    assert response.status_code == 200
+    hits = response.json()
+    assert hits and hits[0]["candidate_name"] == expected
@@ -0,0 +1,78 @@
+"""The operator cache forgets operators whose rows change."""
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth import create_access_token, get_current_operator, operator_cache
+from app.models import Base, Operator
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(Operator(name="Analyst", email="analyst@example.com", password_hash="x", role="analyst"))
+        db.commit()
+    operator_cache.clear()
+    yield Session
+    operator_cache.clear()
+    engine.dispose()
+
+
+def _current_role(Session, credentials) -> str:
+    with Session() as db:
+        return get_current_operator(credentials, db).role
+
+
+@pytest.fixture
+def credentials():
+    token = create_access_token(data={"sub": "analyst@example.com"})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_role_change_invalidates(Session, credentials):
+    assert _current_role(Session, credentials) == "analyst"
+
+    with Session() as db:
+        db.query(Operator).filter_by(email="analyst@example.com").one().role = "supervisor"
+        db.commit()
+
+    assert _current_role(Session, credentials) == "supervisor"
+
+
+def test_bulk_update_invalidates(Session, credentials):
+    assert _current_role(Session, credentials) == "analyst"
+
+    with Session() as db:
+        db.execute(update(Operator).values(role="senior_analyst"))
+        db.commit()
+
+    assert _current_role(Session, credentials) == "senior_analyst"
+
+
+def test_rolled_back_change_keeps_cache(Session, credentials):
+    assert _current_role(Session, credentials) == "analyst"
+
+    with Session() as db:
+        db.query(Operator).filter_by(email="analyst@example.com").one().role = "supervisor"
+        db.flush()
+        db.rollback()
+
+    assert operator_cache.stats()["size"] == 1
+    assert _current_role(Session, credentials) == "analyst"
+
+
+def test_deleted_operator_is_rejected(Session, credentials):
+    assert _current_role(Session, credentials) == "analyst"
+
+    with Session() as db:
+        db.delete(db.query(Operator).filter_by(email="analyst@example.com").one())
+        db.commit()
+
+    with pytest.raises(Exception) as exc:
+        _current_role(Session, credentials)
+    assert exc.value.status_code == 401
@@ -0,0 +1,61 @@
+"""GET /v2/profiles?updated_since against whole-second stored timestamps."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth import get_current_operator
+from app.main import app
+from app.models import Base, Operator
+from app.replica import get_read_db
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session(expire_on_commit=False) as db:
+        operator = Operator(name="Reviewer", email="reviewer@example.com", password_hash="x")
+        db.add(operator)
+        # As written by server_default=func.now(): whole seconds
+        db.execute(text(
+            "INSERT INTO source_cases (profile_unique_id, dj_profile_id, structured_record, created_at) VALUES "
+            "('P-old', 'D1', 'x', '2024-05-01 12:29:59'), "
+            "('P-same', 'D1', 'x', '2024-05-01 12:30:00'), "
+            "('P-new', 'D1', 'x', '2024-05-01 12:30:01')"
+        ))
+        db.execute(text(
+            "INSERT INTO case_status (profile_unique_id, dj_profile_id, case_status, aspects_status, last_updated_at) "
+            "VALUES ('P-old', 'D1', 'closed', '{}', '2024-05-01 12:29:59.900000')"
+        ))
+        db.commit()
+        db.expunge(operator)
+
+    def read_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[get_current_operator] = lambda: operator
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("updated_since, expected", [
+    ("2024-05-01T12:30:00.500000", ["P-new", "P-same"]),
+    ("2024-05-01T12:30:00", ["P-new", "P-same"]),
+    ("2024-05-01T12:29:59.950000", ["P-new", "P-old", "P-same"]),
+    ("2024-05-01T14:30:00.500000+02:00", ["P-new", "P-same"]),
+    ("2024-05-01T12:30:01.999999", ["P-new"]),
+])
+def test_updated_since_includes_its_own_second(client, updated_since, expected):
+    response = client.get("/v2/profiles", params={"updated_since": updated_since})
+
+    assert response.status_code == 200
+    assert [p["profile_unique_id"] for p in response.json()] == expected
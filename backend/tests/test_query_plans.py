@@ -0,0 +1,130 @@
+"""The v2 endpoint queries, as built by app.queries, are served by an index."""
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.models import Base
+from app.names import key_counts_stmt, name_keys, similar_names_stmt
+from app.pagination import encode_cursor
+from app.queries import (
+    CASE_SUMMARY_COLUMNS, CaseListParams, LogQueryParams, case_etag_stmt, case_page_stmt, case_with_status_stmt,
+    feedback_stmt, logs_stmt, profiles_stmt, recent_logs_stmt, record_index_stmt, status_stmt, statuses_by_key_stmt,
+)
+
+CASE_KEY = ("profile_unique_id", "dj_profile_id")
+PID, DJ, OP = "P1", "D1", 1
+CURSOR = encode_cursor("2024-01-01 00:00:00", 1)
+WEEK = {"since": datetime(2024, 1, 1), "until": datetime(2024, 1, 8), "cursor": encode_cursor("2024-01-02 00:00:00", 1)}
+
+
+def _cases(**filters):
+    return case_page_stmt(CaseListParams(**filters), CASE_SUMMARY_COLUMNS)
+
+
+# (statement, columns an index must constrain, whether a sort is expected).
+# A filter served by another index than the (created_at, id) page order has
+# its matching rows sorted; that is bounded by the filter.
+QUERIES = [
+    pytest.param(_cases(), (), False, id="GET /v2/cases"),
+    pytest.param(_cases(cursor=CURSOR), ("created_at",), False, id="GET /v2/cases?cursor"),
+    pytest.param(_cases(profile_unique_id=PID), ("profile_unique_id",), False, id="GET /v2/cases?profile_unique_id"),
+    pytest.param(
+        _cases(profile_unique_id=PID, cursor=CURSOR), ("profile_unique_id", "created_at"), False,
+        id="GET /v2/cases?profile_unique_id&cursor",
+    ),
+    pytest.param(_cases(candidate_name="Moh"), ("candidate_name",), True, id="GET /v2/cases?candidate_name"),
+    pytest.param(
+        _cases(candidate_name="Moh", cursor=CURSOR), ("candidate_name",), True, id="GET /v2/cases?candidate_name&cursor",
+    ),
+    pytest.param(_cases(case_status="closed"), ("case_status",) + CASE_KEY, True, id="GET /v2/cases?case_status"),
+    pytest.param(
+        _cases(case_status="in_review", cursor=CURSOR), ("case_status",) + CASE_KEY, True,
+        id="GET /v2/cases?case_status&cursor",
+    ),
+    # Cases without a status row match too, so the page order drives the join
+    pytest.param(_cases(case_status="unreviewed"), CASE_KEY, False, id="GET /v2/cases?case_status=unreviewed"),
+    pytest.param(profiles_stmt(None, None, 200), (), False, id="GET /v2/profiles"),
+    pytest.param(
+        profiles_stmt(datetime(2024, 1, 1), encode_cursor(PID), 200), ("profile_unique_id", "created_at", "last_updated_at"),
+        False, id="GET /v2/profiles?updated_since&cursor",
+    ),
+    pytest.param(case_etag_stmt(PID, DJ), CASE_KEY, False, id="GET /v2/cases/{profile_id}/{dj_id} (ETag)"),
+    pytest.param(record_index_stmt(PID, DJ), CASE_KEY, False, id="GET /v2/cases/{profile_id}/{dj_id}/record"),
+    pytest.param(status_stmt(PID, DJ), CASE_KEY, False, id="GET|PATCH /v2/cases/{profile_id}/{dj_id}/status"),
+    pytest.param(
+        statuses_by_key_stmt([(PID, DJ), ("P2", "D2")]), CASE_KEY, False, id="POST /v2/cases/status:batch",
+    ),
+    pytest.param(
+        feedback_stmt(PID, DJ, OP, "name"), CASE_KEY + ("operator_id", "aspect_type"), False,
+        id="POST /v2/cases/{profile_id}/{dj_id}/feedback",
+    ),
+    pytest.param(
+        feedback_stmt(PID, DJ, OP), CASE_KEY + ("operator_id",), False,
+        id="GET /v2/cases/{profile_id}/{dj_id}/feedback",
+    ),
+    pytest.param(
+        case_with_status_stmt(PID, DJ), CASE_KEY, False, id="GET /v2/cases/{profile_id}/{dj_id}/review (case + status)",
+    ),
+    pytest.param(
+        recent_logs_stmt(PID, DJ, 20), CASE_KEY, False, id="GET /v2/cases/{profile_id}/{dj_id}/review (recent logs)",
+    ),
+    pytest.param(
+        logs_stmt(LogQueryParams(limit=100, **WEEK), PID, DJ), CASE_KEY, False,
+        id="GET /v2/cases/{profile_id}/{dj_id}/logs",
+    ),
+    pytest.param(
+        logs_stmt(LogQueryParams(operator_id=OP, limit=100, **WEEK)), ("operator_id",), False,
+        id="GET /v2/logs?operator_id&since&until",
+    ),
+    pytest.param(
+        logs_stmt(LogQueryParams(operator_id=OP, event_type="comment", limit=100, **WEEK)), ("operator_id",), False,
+        id="GET /v2/logs?operator_id&event_type",
+    ),
+    pytest.param(
+        logs_stmt(LogQueryParams(event_type="comment", limit=100, **WEEK)), ("event_type",), False,
+        id="GET /v2/logs?event_type",
+    ),
+    pytest.param(logs_stmt(LogQueryParams(limit=100, **WEEK)), ("created_at",), False, id="GET /v2/logs?since&until"),
+    pytest.param(
+        key_counts_stmt(name_keys("Mohamed Ali")), ("key",), False, id="GET /v2/cases/similar-names (key counts)",
+    ),
+    # Ranks the matched cases by shared keys
+    pytest.param(
+        similar_names_stmt(sorted(name_keys("Mohamed Ali")), 20), ("key",), True,
+        id="GET /v2/cases/similar-names (ranked matches)",
+    ),
+]
+
+
+def plan_problems(details, key_columns, sorts: bool) -> list:
+    """Why a plan is not index-served: a table scan, an unexpected sort, or an
+    index search that leaves some key column to a row filter."""
+    scans = [d for d in details if d.startswith("SCAN") and "USING" not in d]
+    # Subqueries and json_each are scanned by design; tables must not be
+    problems = [d for d in scans if d.split()[1] in Base.metadata.tables]
+    if not sorts:
+        problems += [d for d in details if "USE TEMP B-TREE FOR" in d]
+    searches = [d for d in details if d.startswith("SEARCH")]
+    for column in key_columns:
+        if not any(re.search(rf"\b{column}[=<>]", d) for d in searches):
+            problems.append(f"index does not constrain {column}")
+    return problems
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("stmt, key_columns, sorts", QUERIES)
+def test_query_is_index_served(engine, stmt, key_columns, sorts):
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        details = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+    assert not plan_problems(details, key_columns, sorts), details
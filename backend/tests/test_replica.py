@@ -0,0 +1,34 @@
+"""Read replica sync against the local SQLite primary."""
+import os
+
+import pytest
+
+from app import replica
+from app.database import SessionLocal
+from app.models import CaseStatusSnapshot
+
+
+@pytest.fixture
+def replica_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "replica.db")
+    monkeypatch.setattr(replica, "READ_REPLICA_PATH", path)
+    monkeypatch.setattr(replica, "state", replica.ReplicaState())
+    yield path
+    replica.stop()
+
+
+def test_sync_copies_only_after_a_commit(replica_path):
+    replica.sync_replica()
+    assert os.path.exists(replica_path)
+    first = replica.state.synced_through
+
+    replica.sync_replica()
+    assert (replica.state.syncs, replica.state.syncs_skipped) == (1, 1)
+    # A skipped sync still vouches for every commit before it
+    assert replica.state.synced_through > first
+
+    with SessionLocal() as db:
+        db.add(CaseStatusSnapshot(profile_unique_id="R1", dj_profile_id="D1", case_status="unreviewed", aspects_status={}))
+        db.commit()
+    replica.sync_replica()
+    assert (replica.state.syncs, replica.state.syncs_skipped) == (2, 1)
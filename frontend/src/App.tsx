@@ -35,6 +35,7 @@ const App: React.FC = () => {
         >
           <Route index element={<Dashboard />} />
           <Route path="case/:profileId" element={<CaseReview />} />
+          <Route path="case/:profileId/:djId" element={<CaseReview />} />
         </Route>
       </Routes>
     </AuthProvider>
@@ -1,11 +1,12 @@
 import React, { useState } from 'react';
 import { Check, X, Minus, MessageSquare } from 'lucide-react';
 import { FeedbackType, AspectFeedback } from '../types';
+import { AspectOutputDTO } from '../services/api';
 
 interface AspectCardProps {
   title: string;
   icon: React.ReactNode;
-  llmOutput: string;
+  aspect?: AspectOutputDTO | null;
   status: 'match' | 'different' | 'unclear';
   statusLabel?: string;
   existingFeedback?: AspectFeedback;
@@ -15,7 +16,7 @@ interface AspectCardProps {
 const AspectCard: React.FC<AspectCardProps> = ({
   title,
   icon,
-  llmOutput,
+  aspect,
   status,
   statusLabel,
   existingFeedback,
@@ -51,72 +52,34 @@ const AspectCard: React.FC<AspectCardProps> = ({
     }
   };
 
-  const parseAndRender = (raw: string) => {
-    // Try to parse JSON-like content, fallback to plain text with citations
-    try {
-      const obj = JSON.parse(raw);
-      const reasoning: string = obj.reasoning || obj.explanation || raw;
-      const claims: Array<{ statement: string; citations?: string[] }> = obj.claims || [];
-      return (
-        <div className="space-y-2">
-          <div>{reasoning}</div>
-          {claims.length > 0 && (
-            <ul className="list-disc pl-5 space-y-1">
-              {claims.map((c, idx) => (
-                <li key={idx}>
-                  {c.statement}
-                  {c.citations?.map((cit, i) => {
-                    const m = /record:(\d+):(\d+)/.exec(cit);
-                    if (!m) return null;
-                    const startLine = parseInt(m[1]);
-                    const endLine = parseInt(m[2]);
-                    return (
-                      <button
-                        key={i}
-                        className="ml-2 inline-flex items-center px-2 py-0.5 text-xs bg-blue-100 text-blue-700 rounded hover:bg-blue-200"
-                        onClick={() => {
-                          const event = new CustomEvent('citationClick', { detail: { startLine, endLine } });
-                          window.dispatchEvent(event);
-                        }}
-                      >
-                        lines {startLine}-{endLine}
-                      </button>
-                    );
-                  })}
-                </li>
-              ))}
-            </ul>
-          )}
-        </div>
-      );
-    } catch {
-      // Fallback: render with inline citation buttons
-      const citationRegex = /record:(\d+):(\d+)/g;
-      const parts: (string | JSX.Element)[] = [];
-      let lastIndex = 0;
-      let match: RegExpExecArray | null;
-      while ((match = citationRegex.exec(raw)) !== null) {
-        if (match.index > lastIndex) parts.push(raw.slice(lastIndex, match.index));
-        const startLine = parseInt(match[1]);
-        const endLine = parseInt(match[2]);
-        parts.push(
-          <button
-            key={match.index}
-            className="inline-flex items-center px-2 py-1 text-xs bg-blue-100 text-blue-700 rounded hover:bg-blue-200 transition-colors"
-            onClick={() => {
-              const event = new CustomEvent('citationClick', { detail: { startLine, endLine } });
-              window.dispatchEvent(event);
-            }}
-          >
-            lines {startLine}-{endLine}
-          </button>
-        );
-        lastIndex = citationRegex.lastIndex;
-      }
-      if (lastIndex < raw.length) parts.push(raw.slice(lastIndex));
-      return parts;
-    }
-  };
+  const citationButton = (startLine: number, endLine: number, key: number) => (
+    <button
+      key={key}
+      className="ml-2 inline-flex items-center px-2 py-0.5 text-xs bg-blue-100 text-blue-700 rounded hover:bg-blue-200"
+      onClick={() => {
+        const event = new CustomEvent('citationClick', { detail: { startLine, endLine } });
+        window.dispatchEvent(event);
+      }}
+    >
+      lines {startLine}-{endLine}
+    </button>
+  );
+
+  const renderAspect = (output: AspectOutputDTO) => (
+    <div className="space-y-2">
+      <div>{output.reasoning}</div>
+      {output.claims.length > 0 && (
+        <ul className="list-disc pl-5 space-y-1">
+          {output.claims.map((c, idx) => (
+            <li key={idx}>
+              {c.statement}
+              {c.citations.map((cit, i) => citationButton(cit.start_line, cit.end_line, i))}
+            </li>
+          ))}
+        </ul>
+      )}
+    </div>
+  );
 
   return (
     <div className={`border rounded-lg p-4 ${config.bg} ${config.border}`}>
@@ -177,7 +140,7 @@ const AspectCard: React.FC<AspectCardProps> = ({
       </div>
 
       <div className="space-y-3">
-        <div className="text-sm text-gray-700 leading-relaxed">{parseAndRender(llmOutput)}</div>
+        <div className="text-sm text-gray-700 leading-relaxed">{aspect ? renderAspect(aspect) : null}</div>
 
         <div className="flex items-center justify-between text-xs text-gray-500">
           <div className="flex items-center gap-3" />
@@ -1,4 +1,5 @@
-import React, { useMemo, useRef, useState } from 'react';
+import React, { useEffect, useMemo, useRef, useState } from 'react';
+import { v2Api, RecordIndexDTO } from '../services/api';
 
 type SectionKey =
   | 'Key Data'
@@ -10,7 +11,10 @@ type SectionKey =
   | 'Hit Category';
 
 interface WorldCheckRecordViewerProps {
-  structuredRecord: string;
+  profileId: string;
+  djId: string;
+  // Section index from the case payload; fetched with the first section otherwise
+  recordIndex?: RecordIndexDTO | null;
   className?: string;
 }
 
@@ -20,66 +24,83 @@ interface CitationMatch {
   text: string;
 }
 
-const SECTION_TESTS: Array<{ key: SectionKey; test: (line: string) => boolean }> = [
-  { key: 'Key Data', test: (s) => /^\s*Key Data\s*$/i.test(s) },
-  { key: 'Further Information', test: (s) => /^\s*Further Information\s*$/i.test(s) },
-  { key: 'Aliases', test: (s) => /^\s*Aliases\s*$/i.test(s) },
-  { key: 'Keywords', test: (s) => /^\s*Keywords\s*$/i.test(s) },
-  { key: 'Connections/Relationships', test: (s) => /^\s*Connections\s*\/?\s*Relationships\s*$/i.test(s) },
-  { key: 'Sources', test: (s) => /^\s*Sources\s*$/i.test(s) },
-  { key: 'Hit Category', test: (s) => /^\s*Hit Category\s*$/i.test(s) }
+interface RecordLine {
+  line: number; // 1-based line in the whole record
+  text: string;
+}
+
+const SECTION_ORDER: SectionKey[] = [
+  'Key Data',
+  'Further Information',
+  'Aliases',
+  'Keywords',
+  'Connections/Relationships',
+  'Sources',
+  'Hit Category'
 ];
 
-const WorldCheckRecordViewer: React.FC<WorldCheckRecordViewerProps> = ({ structuredRecord, className = '' }) => {
-  const [activeTab, setActiveTab] = useState<SectionKey>('Key Data');
+const WorldCheckRecordViewer: React.FC<WorldCheckRecordViewerProps> = ({ profileId, djId, recordIndex, className = '' }) => {
+  const [index, setIndex] = useState<RecordIndexDTO | null>(recordIndex || null);
+  const [activeTab, setActiveTab] = useState<SectionKey>(
+    (recordIndex?.sections[0]?.name as SectionKey) || 'Key Data'
+  );
+  const [sectionLines, setSectionLines] = useState<RecordLine[]>([]);
+  const [rawLines, setRawLines] = useState<string[] | null>(null);
   const [highlightedRanges, setHighlightedRanges] = useState<CitationMatch[]>([]);
   const [showRaw, setShowRaw] = useState(false);
   const [query, setQuery] = useState('');
   const [pendingScrollTo, setPendingScrollTo] = useState<number | null>(null);
   const containerRef = useRef<HTMLDivElement>(null);
 
-  const lines = useMemo(() => structuredRecord.split('\n'), [structuredRecord]);
-
-  // Map logical item index (1-based for '1) Name.fullName') to actual physical line index (1-based)
-  const logicalToPhysical: Record<number, number> = useMemo(() => {
-    const map: Record<number, number> = {};
-    let counter = 0;
-    for (let i = 0; i < lines.length; i++) {
-      const m = /^\s*\d+\)\s+/u.exec(lines[i]);
-      if (m) {
-        counter += 1;
-        map[counter] = i + 1;
-      }
-    }
-    return map;
-  }, [lines]);
-
-  // Determine which section each physical line belongs to
-  const lineIndexToSection: Record<number, SectionKey> = useMemo(() => {
-    const mapping: Record<number, SectionKey> = {};
-    let current: SectionKey = 'Key Data';
-    for (let i = 0; i < lines.length; i++) {
-      const raw = lines[i].trim();
-      const match = SECTION_TESTS.find((s) => s.test(raw));
-      if (match) current = match.key;
-      mapping[i + 1] = current; // store as 1-based
-    }
-    return mapping;
-  }, [lines]);
+  useEffect(() => {
+    setIndex(recordIndex || null);
+    setRawLines(null);
+  }, [profileId, djId]);
+
+  // Fetch only the active section's lines; the server cuts them out by offset
+  useEffect(() => {
+    let cancelled = false;
+    v2Api.getCaseRecord(profileId, djId, activeTab)
+      .then((view) => {
+        if (cancelled) return;
+        setIndex(view.index);
+        const headerLines = new Set(view.index.sections.filter((s) => s.header).map((s) => s.start_line));
+        setSectionLines(
+          view.chunks.flatMap((chunk) =>
+            chunk.lines.map((text, i) => ({ line: chunk.start_line + i, text }))
+          ).filter((l) => !headerLines.has(l.line))
+        );
+      })
+      .catch((error) => {
+        if (cancelled) return;
+        console.error('Failed to load record section:', error);
+        setSectionLines([]);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [profileId, djId, activeTab]);
+
+  useEffect(() => {
+    if (!showRaw || rawLines) return;
+    v2Api.getCaseRecord(profileId, djId)
+      .then((view) => setRawLines(view.chunks.flatMap((chunk) => chunk.lines)))
+      .catch((error) => console.error('Failed to load record:', error));
+  }, [showRaw, rawLines, profileId, djId]);
 
   const availableTabs: SectionKey[] = useMemo(() => {
-    const set = new Set<SectionKey>();
-    Object.values(lineIndexToSection).forEach((sec) => set.add(sec));
-    // Ensure deterministic order based on SECTION_TESTS
-    return SECTION_TESTS.map((s) => s.key).filter((k) => set.has(k));
-  }, [lineIndexToSection]);
+    const present = new Set((index?.sections || []).map((s) => s.name));
+    return SECTION_ORDER.filter((k) => present.has(k));
+  }, [index]);
+
+  const sectionOfLine = (line: number): SectionKey => {
+    const run = index?.sections.find((s) => line >= s.start_line && line <= s.end_line);
+    return (run?.name as SectionKey) || 'Key Data';
+  };
 
   const getSectionForRange = (startLine: number, endLine: number): SectionKey => {
-    const startSection = lineIndexToSection[startLine] || 'Key Data';
-    for (let i = startLine; i <= endLine; i++) {
-      if ((lineIndexToSection[i] || 'Key Data') !== startSection) return 'Key Data';
-    }
-    return startSection;
+    const startSection = sectionOfLine(startLine);
+    return sectionOfLine(endLine) === startSection ? startSection : 'Key Data';
   };
 
   const highlightLines = (startLine: number, endLine: number) => {
@@ -105,28 +126,28 @@ const WorldCheckRecordViewer: React.FC<WorldCheckRecordViewerProps> = ({ structu
     }, 3000);
   };
 
-  const isLineHighlighted = (zeroBasedIndex: number): boolean => {
-    const oneBased = zeroBasedIndex + 1;
-    return highlightedRanges.some((range) => oneBased >= range.start && oneBased <= range.end);
-  };
+  const isLineHighlighted = (oneBased: number): boolean =>
+    highlightedRanges.some((range) => oneBased >= range.start && oneBased <= range.end);
 
   // Handle citation events dispatched by analysis components
   React.useEffect(() => {
     const handleCitationClick = (event: Event) => {
       const detail = (event as CustomEvent).detail as { startLine: number; endLine: number };
       let { startLine, endLine } = detail;
-      if (logicalToPhysical[startLine] && logicalToPhysical[endLine]) {
-        startLine = logicalToPhysical[startLine];
-        endLine = logicalToPhysical[endLine];
+      // Citations count numbered items; map them to record lines
+      const items = index?.items || [];
+      if (items[startLine - 1] && items[endLine - 1]) {
+        startLine = items[startLine - 1];
+        endLine = items[endLine - 1];
       }
       highlightLines(startLine, endLine);
     };
 
     window.addEventListener('citationClick', handleCitationClick as EventListener);
     return () => window.removeEventListener('citationClick', handleCitationClick as EventListener);
-  }, [logicalToPhysical]);
+  }, [index]);
 
-  // Scroll to a line after the tab changes and the DOM updates
+  // Scroll to a line once its section has loaded
   React.useEffect(() => {
     if (pendingScrollTo == null) return;
     const container = containerRef.current;
@@ -136,7 +157,7 @@ const WorldCheckRecordViewer: React.FC<WorldCheckRecordViewerProps> = ({ structu
       el.scrollIntoView({ behavior: 'smooth', block: 'center' });
       setPendingScrollTo(null);
     }
-  }, [activeTab, pendingScrollTo]);
+  }, [activeTab, sectionLines, pendingScrollTo]);
 
   const displayLine = (line: string): string => {
     // Hide leading logical numbers like "12) " for presentation only
@@ -152,14 +173,6 @@ const WorldCheckRecordViewer: React.FC<WorldCheckRecordViewerProps> = ({ structu
     return { key, value };
   };
 
-  const visibleLineIndices: number[] = useMemo(() => {
-    // Only lines for the active tab, excluding the header line (which equals the tab name)
-    return lines
-      .map((_, idx) => idx)
-      .filter((idx) => lineIndexToSection[idx + 1] === activeTab)
-      .filter((idx) => !SECTION_TESTS.find((s) => s.key === activeTab && s.test(lines[idx].trim())));
-  }, [lines, lineIndexToSection, activeTab]);
-
   const matchesQuery = (text: string): boolean =>
     query.trim() === '' || text.toLowerCase().includes(query.trim().toLowerCase());
 
@@ -226,22 +239,22 @@ const WorldCheckRecordViewer: React.FC<WorldCheckRecordViewerProps> = ({ structu
       {!showRaw && (
         <div ref={containerRef} className="border rounded p-3 max-h-96 overflow-y-auto font-sans text-sm leading-6">
           <div className="grid grid-cols-1 gap-2">
-            {visibleLineIndices.map((index) => {
-              const { key, value } = splitKeyValue(lines[index]);
+            {sectionLines.map(({ line, text }) => {
+              const { key, value } = splitKeyValue(text);
               if (!matchesQuery(`${key} ${value}`)) return null;
               return (
                 <div
-                  key={index}
-                  data-line={index + 1}
+                  key={line}
+                  data-line={line}
                   className={`rounded px-2 py-1 transition-colors ${
-                    isLineHighlighted(index) ? 'bg-yellow-100' : 'hover:bg-gray-50'
+                    isLineHighlighted(line) ? 'bg-yellow-100' : 'hover:bg-gray-50'
                   }`}
                 >
                   <div className="grid grid-cols-12 gap-3 items-start">
                     <div className="col-span-12 md:col-span-4 text-[11px] uppercase tracking-wide text-gray-500">
                       {key || '—'}
                     </div>
-                    <div className={`col-span-12 md:col-span-8 text-gray-900 ${isLineHighlighted(index) ? 'font-medium' : ''}`}>
+                    <div className={`col-span-12 md:col-span-8 text-gray-900 ${isLineHighlighted(line) ? 'font-medium' : ''}`}>
                       {renderHighlightedText(value)}
                     </div>
                   </div>
@@ -255,16 +268,16 @@ const WorldCheckRecordViewer: React.FC<WorldCheckRecordViewerProps> = ({ structu
       {/* Raw fallback (original with visible line numbers) */}
       {showRaw && (
         <div className="border rounded p-3 max-h-96 overflow-y-auto font-mono text-xs">
-          {lines.map((line, index) => (
+          {(rawLines || []).map((line, index) => (
             <div
               key={index}
               data-line={index + 1}
               className={`py-1 px-2 rounded transition-colors duration-300 ${
-                isLineHighlighted(index) ? 'bg-yellow-100' : 'hover:bg-gray-50'
+                isLineHighlighted(index + 1) ? 'bg-yellow-100' : 'hover:bg-gray-50'
               }`}
             >
               <span className="text-gray-400 mr-3 select-none">{(index + 1).toString().padStart(2, '0')}</span>
-              <span className={isLineHighlighted(index) ? 'font-medium' : ''}>{line}</span>
+              <span className={isLineHighlighted(index + 1) ? 'font-medium' : ''}>{line}</span>
             </div>
           ))}
         </div>
@@ -9,7 +9,7 @@ import WorldCheckRecordViewer from '../components/WorldCheckRecordViewer';
 import { format } from 'date-fns';
 
 const CaseReview: React.FC = () => {
-  const { profileId } = useParams<{ profileId: string }>();
+  const { profileId, djId } = useParams<{ profileId: string; djId?: string }>();
   useAuth();
   const [sourceCase, setSourceCase] = useState<any | null>(null);
   const [loading, setLoading] = useState(true);
@@ -27,51 +27,39 @@ const CaseReview: React.FC = () => {
     if (profileId) {
       loadCaseDetail();
     }
-  }, [profileId]);
+  }, [profileId, djId]);
 
   const loadCaseDetail = async () => {
     try {
       setLoading(true);
-      const cases = await v2Api.listCases({ profile_unique_id: profileId!, limit: 1 });
-      if (!cases || cases.length === 0) { setSourceCase(null); setLoading(false); return; }
-      const sc = cases[0];
-      setSourceCase(sc);
-
-      // Try to load existing case status
-      try {
-        const status = await v2Api.getCaseStatus(sc.profile_unique_id, sc.dj_profile_id);
-        setCaseStatus(status);
-        
-        if (status?.aspects_status) {
-          const aspectsStatus = status.aspects_status as any;
-          if (aspectsStatus.final_verdict) {
-            setFinalVerdict(aspectsStatus.final_verdict);
-          }
-          if (aspectsStatus.comments) {
-            setComments(aspectsStatus.comments);
-          }
-        }
-        
-        // Set editing state based on case status
-        const isSubmitted = status?.case_status === 'submitted';
-        setIsEditing(!isSubmitted);
-      } catch (statusError) {
-        // Case status doesn't exist yet, which is fine for new cases
-        console.log('No existing case status found (new case)');
-        setCaseStatus({ case_status: 'unreviewed' });
-        setIsEditing(true);
+      // Links from older bookmarks carry only the profile; resolve its first hit
+      let dj = djId;
+      if (!dj) {
+        const page = await v2Api.listCaseSummariesPage({ profile_unique_id: profileId!, limit: 1 });
+        if (page.items.length === 0) { setSourceCase(null); return; }
+        dj = page.items[0].dj_profile_id;
       }
 
-      // Load existing aspect feedbacks
-      try {
-        const feedbacks = await v2Api.getAspectFeedback(sc.profile_unique_id, sc.dj_profile_id);
-        setAspectFeedbacks(feedbacks);
-      } catch (feedbackError) {
-        console.log('No existing aspect feedbacks found');
-        setAspectFeedbacks([]);
+      // Case, status and this operator's feedback in one request
+      const review = await v2Api.getCaseReview(profileId!, dj);
+      setSourceCase(review.case);
+
+      const status = review.status ?? { case_status: 'unreviewed' };
+      setCaseStatus(status);
+      const aspectsStatus = review.status?.aspects_status as any;
+      if (aspectsStatus?.final_verdict) {
+        setFinalVerdict(aspectsStatus.final_verdict);
       }
+      if (aspectsStatus?.comments) {
+        setComments(aspectsStatus.comments);
+      }
+      // Set editing state based on case status
+      setIsEditing(status.case_status !== 'submitted');
+
+      setAspectFeedbacks(review.feedback);
     } catch (error) {
       console.error('Failed to load case detail:', error);
+      setSourceCase(null);
     } finally {
       setLoading(false);
     }
@@ -82,7 +70,14 @@ const CaseReview: React.FC = () => {
     const key = aspectType === 'name' ? 'aspect_name_json' : aspectType === 'age' ? 'aspect_age_json' : aspectType === 'nationality' ? 'aspect_nationality_json' : 'aspect_risk_json';
     const txt = sourceCase[key];
     if (!txt) return null;
-    return { output: txt, score: sourceCase.final_score || 0 };
+    return { output: txt, structured: sourceCase.aspects?.[aspectType] || null, score: sourceCase.final_score || 0 };
+  };
+
+  const aspectStatus = (aspectType: AspectType): 'match' | 'different' | 'unclear' => {
+    const verdict = getAspectData(aspectType)?.structured?.verdict;
+    if (verdict === 'strong_match') return 'match';
+    if (verdict === 'likely_no_match') return 'different';
+    return 'unclear';
   };
 
   const handleAspectFeedback = (aspectType: string, feedback: string, comment?: string) => {
@@ -92,53 +87,43 @@ const CaseReview: React.FC = () => {
     }));
   };
 
+  const pendingFeedbackPayloads = (): AspectFeedbackCreateDTO[] =>
+    Object.entries(pendingFeedbacks).map(([aspectType, data]) => {
+      const aspectData = getAspectData(aspectType as AspectType);
+      return {
+        aspect_type: aspectType,
+        llm_output: aspectData?.output || '',
+        llm_verdict_score: aspectData?.score || 0,
+        operator_feedback: data.feedback,
+        operator_comment: data.comment
+      };
+    });
+
   const handleSaveAllFeedbacks = async () => {
     if (!sourceCase || Object.keys(pendingFeedbacks).length === 0) return;
 
     try {
       setSavingFeedback(true);
       
-      const feedbackPromises = Object.entries(pendingFeedbacks).map(([aspectType, data]) => {
-        const aspectData = getAspectData(aspectType as AspectType);
-        const feedbackPayload: AspectFeedbackCreateDTO = {
-          aspect_type: aspectType,
-          llm_output: aspectData?.output || '',
-          llm_verdict_score: aspectData?.score || 0,
-          operator_feedback: data.feedback,
-          operator_comment: data.comment
-        };
-        
-        return v2Api.createAspectFeedback(sourceCase.profile_unique_id, sourceCase.dj_profile_id, feedbackPayload);
-      });
-
-      const savedFeedbacks = await Promise.all(feedbackPromises);
-      
-      // Update the aspect feedbacks state
-      setAspectFeedbacks(prev => {
-        const updated = [...prev];
-        savedFeedbacks.forEach(newFeedback => {
-          const existingIndex = updated.findIndex(f => f.aspect_type === newFeedback.aspect_type);
-          if (existingIndex >= 0) {
-            updated[existingIndex] = newFeedback;
-          } else {
-            updated.push(newFeedback);
+      const feedback = pendingFeedbackPayloads();
+
+      // Feedback upserts and the audit log entry commit together
+      const result = await v2Api.submitCaseReview(sourceCase.profile_unique_id, sourceCase.dj_profile_id, {
+        feedback,
+        logs: [{
+          event_type: 'aspect_feedback_saved',
+          payload: {
+            feedbacks_count: feedback.length,
+            aspect_types: feedback.map(f => f.aspect_type)
           }
-        });
-        return updated;
+        }]
       });
 
+      setAspectFeedbacks(result.feedback);
+
       // Clear pending feedbacks
       setPendingFeedbacks({});
 
-      // Log the feedback save action
-      await v2Api.appendLog(sourceCase.profile_unique_id, sourceCase.dj_profile_id, {
-        event_type: 'aspect_feedback_saved',
-        payload: {
-          feedbacks_count: savedFeedbacks.length,
-          aspect_types: savedFeedbacks.map(f => f.aspect_type)
-        }
-      });
-
       setNotification({ type: 'success', message: 'Aspect feedbacks saved successfully!' });
       setTimeout(() => setNotification(null), 3000);
     } catch (error) {
@@ -160,28 +145,28 @@ const CaseReview: React.FC = () => {
     try {
       setSubmitting(true);
       
-      // Update case status to draft
-      const updatedStatus = await v2Api.updateCaseStatus(sourceCase.profile_unique_id, sourceCase.dj_profile_id, {
-        case_status: 'draft',
-        aspects_status: {
-          final_verdict: finalVerdict,
-          comments: comments,
-          updated_at: new Date().toISOString()
-        }
-      });
-
-      // Log the draft save action
-      await v2Api.appendLog(sourceCase.profile_unique_id, sourceCase.dj_profile_id, {
-        event_type: 'draft_saved',
-        payload: {
-          final_verdict: finalVerdict,
-          comments: comments,
-          previous_status: caseStatus?.case_status || 'unreviewed'
-        }
+      // Status change and the audit log entry commit together
+      const result = await v2Api.submitCaseReview(sourceCase.profile_unique_id, sourceCase.dj_profile_id, {
+        status: {
+          case_status: 'draft',
+          aspects_status: {
+            final_verdict: finalVerdict,
+            comments: comments,
+            updated_at: new Date().toISOString()
+          }
+        },
+        logs: [{
+          event_type: 'draft_saved',
+          payload: {
+            final_verdict: finalVerdict,
+            comments: comments,
+            previous_status: caseStatus?.case_status || 'unreviewed'
+          }
+        }]
       });
 
       // Update local state
-      setCaseStatus(updatedStatus);
+      setCaseStatus(result.status);
 
       setNotification({ type: 'success', message: 'Draft saved successfully!' });
       setTimeout(() => setNotification(null), 3000);
@@ -200,29 +185,34 @@ const CaseReview: React.FC = () => {
     try {
       setSubmitting(true);
       
-      // Update case status to submitted
-      const updatedStatus = await v2Api.updateCaseStatus(sourceCase.profile_unique_id, sourceCase.dj_profile_id, {
-        case_status: 'submitted',
-        aspects_status: {
-          final_verdict: finalVerdict,
-          comments: comments,
-          submitted_at: new Date().toISOString(),
-          updated_at: new Date().toISOString()
-        }
-      });
-
-      // Log the submission action
-      await v2Api.appendLog(sourceCase.profile_unique_id, sourceCase.dj_profile_id, {
-        event_type: 'case_submitted',
-        payload: {
-          final_verdict: finalVerdict,
-          comments: comments,
-          previous_status: caseStatus?.case_status || 'unreviewed'
-        }
+      // Pending aspect feedback, the status change and the audit log entry
+      // are applied atomically
+      const feedback = pendingFeedbackPayloads();
+      const result = await v2Api.submitCaseReview(sourceCase.profile_unique_id, sourceCase.dj_profile_id, {
+        feedback,
+        status: {
+          case_status: 'submitted',
+          aspects_status: {
+            final_verdict: finalVerdict,
+            comments: comments,
+            submitted_at: new Date().toISOString(),
+            updated_at: new Date().toISOString()
+          }
+        },
+        logs: [{
+          event_type: 'case_submitted',
+          payload: {
+            final_verdict: finalVerdict,
+            comments: comments,
+            previous_status: caseStatus?.case_status || 'unreviewed'
+          }
+        }]
       });
 
       // Update local state
-      setCaseStatus(updatedStatus);
+      setCaseStatus(result.status);
+      setAspectFeedbacks(result.feedback);
+      setPendingFeedbacks({});
       setIsEditing(false);
 
       setNotification({ type: 'success', message: 'Case submitted successfully!' });
@@ -347,7 +337,7 @@ const CaseReview: React.FC = () => {
         <div className="grid grid-cols-1 lg:grid-cols-10 gap-6">
           <div className="lg:col-span-4 space-y-6">
             {hit && (
-              <WorldCheckRecordViewer structuredRecord={hit.structured_record} />
+              <WorldCheckRecordViewer profileId={sourceCase.profile_unique_id} djId={sourceCase.dj_profile_id} recordIndex={sourceCase.record_index} />
             )}
           </div>
 
@@ -358,36 +348,36 @@ const CaseReview: React.FC = () => {
                 <AspectCard 
                   title="Name Analysis" 
                   icon={<FileText className="w-4 h-4" />} 
-                  llmOutput={getAspectData('name')?.output || ''} 
-                  status={(function(){ try { const obj=JSON.parse(getAspectData('name')?.output||'{}'); const v=obj.category?.verdict; if (v==='strong_match') return 'match'; if (v==='likely_no_match') return 'different'; return 'unclear'; } catch { return 'unclear'; } })()} 
-                  statusLabel={(function(){ try { const obj=JSON.parse(getAspectData('name')?.output||'{}'); return obj.category?.verdict||undefined; } catch { return undefined; } })()} 
+                  aspect={getAspectData('name')?.structured} 
+                  status={aspectStatus('name')} 
+                  statusLabel={getAspectData('name')?.structured?.verdict || undefined} 
                   existingFeedback={getExistingFeedback('name') as any} 
                   onFeedbackSubmit={(feedback, comment) => handleAspectFeedback('name', feedback, comment)} 
                 />
                 <AspectCard 
                   title="Age/Timeline Analysis" 
                   icon={<FileText className="w-4 h-4" />} 
-                  llmOutput={getAspectData('age')?.output || ''} 
-                  status={(function(){ try { const obj=JSON.parse(getAspectData('age')?.output||'{}'); const v=obj.category?.verdict; if (v==='strong_match') return 'match'; if (v==='likely_no_match') return 'different'; return 'unclear'; } catch { return 'unclear'; } })()} 
-                  statusLabel={(function(){ try { const obj=JSON.parse(getAspectData('age')?.output||'{}'); return obj.category?.verdict||undefined; } catch { return undefined; } })()} 
+                  aspect={getAspectData('age')?.structured} 
+                  status={aspectStatus('age')} 
+                  statusLabel={getAspectData('age')?.structured?.verdict || undefined} 
                   existingFeedback={getExistingFeedback('age') as any} 
                   onFeedbackSubmit={(feedback, comment) => handleAspectFeedback('age', feedback, comment)} 
                 />
                 <AspectCard 
                   title="Location Analysis" 
                   icon={<MapPin className="w-4 h-4" />} 
-                  llmOutput={getAspectData('nationality')?.output || ''} 
-                  status={(function(){ try { const obj=JSON.parse(getAspectData('nationality')?.output||'{}'); const v=obj.category?.verdict; if (v==='strong_match') return 'match'; if (v==='likely_no_match') return 'different'; return 'unclear'; } catch { return 'unclear'; } })()} 
-                  statusLabel={(function(){ try { const obj=JSON.parse(getAspectData('nationality')?.output||'{}'); return obj.category?.verdict||undefined; } catch { return undefined; } })()} 
+                  aspect={getAspectData('nationality')?.structured} 
+                  status={aspectStatus('nationality')} 
+                  statusLabel={getAspectData('nationality')?.structured?.verdict || undefined} 
                   existingFeedback={getExistingFeedback('nationality') as any} 
                   onFeedbackSubmit={(feedback, comment) => handleAspectFeedback('nationality', feedback, comment)} 
                 />
                 <AspectCard 
                   title="Risk Profile" 
                   icon={<AlertTriangle className="w-4 h-4" />} 
-                  llmOutput={getAspectData('risk')?.output || ''} 
-                  status={(function(){ try { const obj=JSON.parse(getAspectData('risk')?.output||'{}'); const v=obj.category?.verdict; if (v==='strong_match') return 'match'; if (v==='likely_no_match') return 'different'; return 'unclear'; } catch { return 'unclear'; } })()} 
-                  statusLabel={(function(){ try { const obj=JSON.parse(getAspectData('risk')?.output||'{}'); return obj.category?.verdict||undefined; } catch { return undefined; } })()} 
+                  aspect={getAspectData('risk')?.structured} 
+                  status={aspectStatus('risk')} 
+                  statusLabel={getAspectData('risk')?.structured?.verdict || undefined} 
                   existingFeedback={getExistingFeedback('risk') as any} 
                   onFeedbackSubmit={(feedback, comment) => handleAspectFeedback('risk', feedback, comment)} 
                 />
@@ -2,25 +2,25 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { Search, Filter, Eye, Clock, CheckCircle, AlertCircle } from 'lucide-react';
 // no types needed from legacy hits
-import { v2Api, SourceCaseDTO, BatchCaseStatusRequestDTO } from '../services/api';
+import { v2Api, SourceCaseSummaryDTO, BatchCaseStatusRequestDTO } from '../services/api';
 import { format } from 'date-fns';
 
 const Dashboard: React.FC = () => {
-  const [cases, setCases] = useState<SourceCaseDTO[]>([]);
+  const [cases, setCases] = useState<SourceCaseSummaryDTO[]>([]);
   const [selectedProfileId, setSelectedProfileId] = useState<string | undefined>(undefined);
   const [loading, setLoading] = useState(true);
   const [search, setSearch] = useState('');
-  const [currentPage, setCurrentPage] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | undefined>(undefined);
   const [hasMore, setHasMore] = useState(true);
   const [allProfileIds, setAllProfileIds] = useState<string[]>([]);
   const [caseStatuses, setCaseStatuses] = useState<Record<string, any>>({});
   
   const ITEMS_PER_PAGE = 20;
 
-  const loadCases = async (page: number = 0, profileId?: string) => {
+  const loadCases = async (cursor?: string, profileId?: string) => {
     try {
       setLoading(true);
-      const data = await v2Api.listCases({ skip: page * ITEMS_PER_PAGE, limit: ITEMS_PER_PAGE, profile_unique_id: profileId });
+      const { items: data, next_cursor } = await v2Api.listCaseSummariesPage({ cursor, limit: ITEMS_PER_PAGE, profile_unique_id: profileId });
       
       // Batch fetch case statuses for all cases
       const pairs: BatchCaseStatusRequestDTO['pairs'] = data.map((c) => ({ profile_unique_id: c.profile_unique_id, dj_profile_id: c.dj_profile_id }));
@@ -52,7 +52,7 @@ const Dashboard: React.FC = () => {
         return (statusPriority[aStatus as keyof typeof statusPriority] || 0) - (statusPriority[bStatus as keyof typeof statusPriority] || 0);
       });
       
-      if (page === 0) {
+      if (!cursor) {
         setCases(sortedData);
         setCaseStatuses(statusMap);
       } else {
@@ -60,8 +60,8 @@ const Dashboard: React.FC = () => {
         setCaseStatuses(prev => ({ ...prev, ...statusMap }));
       }
       
-      setHasMore((data?.length || 0) === ITEMS_PER_PAGE);
-      setCurrentPage(page);
+      setHasMore(!!next_cursor);
+      setNextCursor(next_cursor);
     } catch (error) {
       console.error('Failed to load cases:', error);
     } finally {
@@ -72,16 +72,22 @@ const Dashboard: React.FC = () => {
   // Load all profile IDs for navigation
   const loadAllProfileIds = async () => {
     try {
-      const allCases = await v2Api.listCases({ skip: 0, limit: 1000 }); // Get enough to capture all profiles
-      const uniqueIds = Array.from(new Set(allCases.map(c => c.profile_unique_id)));
-      setAllProfileIds(uniqueIds);
+      // Distinct profiles come pre-aggregated from the server, one compact page at a time
+      const ids: string[] = [];
+      let cursor: string | undefined;
+      do {
+        const page = await v2Api.listProfilesPage({ cursor, limit: 1000 });
+        ids.push(...page.items.map(p => p.profile_unique_id));
+        cursor = page.next_cursor;
+      } while (cursor);
+      setAllProfileIds(ids);
     } catch (error) {
       console.error('Failed to load profile IDs:', error);
     }
   };
 
   useEffect(() => {
-    loadCases(0, selectedProfileId);
+    loadCases(undefined, selectedProfileId);
   }, [selectedProfileId]);
 
   // On first mount, load profile IDs and choose the first one
@@ -89,8 +95,8 @@ const Dashboard: React.FC = () => {
     (async () => {
       try {
         await loadAllProfileIds();
-        const initial = await v2Api.listCases({ skip: 0, limit: ITEMS_PER_PAGE });
-        if (initial && initial.length > 0) {
+        const { items: initial } = await v2Api.listCaseSummariesPage({ limit: 1 });
+        if (initial.length > 0) {
           setSelectedProfileId(initial[0].profile_unique_id);
         }
       } catch (e) {
@@ -102,14 +108,13 @@ const Dashboard: React.FC = () => {
 
   const handleSearch = (e: React.FormEvent) => {
     e.preventDefault();
-    setCurrentPage(0);
     const profileId = search.trim() || undefined;
     setSelectedProfileId(profileId);
   };
 
   const loadMore = () => {
-    if (!loading && hasMore) {
-      loadCases(currentPage + 1, selectedProfileId);
+    if (!loading && hasMore && nextCursor) {
+      loadCases(nextCursor, selectedProfileId);
     }
   };
 
@@ -161,7 +166,6 @@ const Dashboard: React.FC = () => {
               const next = allProfileIds[nextIdx];
               setSelectedProfileId(next);
               setSearch(next);
-              setCurrentPage(0); // Reset pagination
             }}>Prev Profile</button>
             <button className="px-2 py-1 border rounded text-sm" onClick={() => {
               if (allProfileIds.length === 0) return;
@@ -171,7 +175,6 @@ const Dashboard: React.FC = () => {
               const next = allProfileIds[nextIdx];
               setSelectedProfileId(next);
               setSearch(next);
-              setCurrentPage(0); // Reset pagination
             }}>Next Profile</button>
           </div>
         </div>
@@ -186,7 +189,7 @@ const Dashboard: React.FC = () => {
             </div>
           </div>
           <button type="submit" className="px-4 py-2 bg-blue-600 text-white rounded-md hover:bg-blue-700 focus:ring-2 focus:ring-blue-500">Apply</button>
-          <button type="button" className="px-4 py-2 border border-gray-300 rounded-md hover:bg-gray-50 focus:ring-2 focus:ring-blue-500" onClick={() => { setSearch(''); setSelectedProfileId(undefined); setCurrentPage(0); }}>
+          <button type="button" className="px-4 py-2 border border-gray-300 rounded-md hover:bg-gray-50 focus:ring-2 focus:ring-blue-500" onClick={() => { setSearch(''); setSelectedProfileId(undefined); }}>
             <Filter className="w-4 h-4" />
           </button>
         </form>
@@ -274,7 +277,7 @@ const Dashboard: React.FC = () => {
                     <td className="px-6 py-4 whitespace-nowrap">{getStatusBadge(actualStatus)}</td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">{caseStatus?.last_updated_by ? `Operator ${caseStatus.last_updated_by}` : '—'}</td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">{format(new Date(sc.created_at), 'MMM dd, yyyy')}</td>
-                    <td className="px-6 py-4 whitespace-nowrap text-sm font-medium"><Link to={`/case/${sc.profile_unique_id}`} className="inline-flex items-center px-3 py-1 border border-blue-300 text-blue-700 rounded-md hover:bg-blue-50 focus:ring-2 focus:ring-blue-500"><Eye className="w-4 h-4 mr-1" />Review</Link></td>
+                    <td className="px-6 py-4 whitespace-nowrap text-sm font-medium"><Link to={`/case/${sc.profile_unique_id}/${sc.dj_profile_id}`} className="inline-flex items-center px-3 py-1 border border-blue-300 text-blue-700 rounded-md hover:bg-blue-50 focus:ring-2 focus:ring-blue-500"><Eye className="w-4 h-4 mr-1" />Review</Link></td>
                   </tr>
                 );
               })}
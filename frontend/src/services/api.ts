@@ -11,6 +11,9 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || (typeof window !== 'un
 
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Sends the aml_last_write cookie back cross-origin (localhost:3000 -> :8000),
+  // so reads after a write are not served from a stale replica
+  withCredentials: true,
 });
 
 api.interceptors.request.use((config) => {
@@ -40,6 +43,38 @@ export const hitsApi = {
 };
 
 // v2 cases endpoints
+export interface AspectCitationDTO {
+  start_line: number;
+  end_line: number;
+}
+
+export interface AspectOutputDTO {
+  reasoning: string;
+  verdict?: string | null;
+  claims: Array<{ statement: string; citations: AspectCitationDTO[] }>;
+}
+
+export interface RecordSectionDTO {
+  name: string;
+  header: boolean;
+  start_line: number;
+  end_line: number;
+}
+
+// Section/line index of structured_record, computed at ingest
+export interface RecordIndexDTO {
+  line_count: number;
+  sections: RecordSectionDTO[];
+  // items[k - 1] is the line of numbered item k ("k) ...")
+  items: number[];
+}
+
+export interface RecordViewDTO {
+  index: RecordIndexDTO;
+  section?: string | null;
+  chunks: Array<{ start_line: number; lines: string[] }>;
+}
+
 export interface SourceCaseDTO {
   id: number;
   profile_unique_id: string;
@@ -54,9 +89,45 @@ export interface SourceCaseDTO {
   aspect_age_json?: string;
   aspect_nationality_json?: string;
   aspect_risk_json?: string;
+  // Parsed server-side at ingest; keyed by aspect type
+  aspects?: Record<string, AspectOutputDTO | null>;
+  record_index?: RecordIndexDTO | null;
   created_at: string;
 }
 
+// List projection returned by /v2/cases/summary (no record/aspect blobs)
+export type SourceCaseSummaryDTO = Pick<
+  SourceCaseDTO,
+  'id' | 'profile_unique_id' | 'dj_profile_id' | 'reference_id' | 'profile_info' | 'candidate_name' | 'final_score' | 'created_at'
+>;
+
+export interface SearchHitDTO {
+  profile_unique_id: string;
+  dj_profile_id: string;
+  candidate_name?: string;
+  final_score?: number;
+  // Matches are wrapped in <mark></mark>; the text is not HTML-escaped
+  snippet: string;
+  rank: number;
+}
+
+export interface SimilarNameDTO {
+  profile_unique_id: string;
+  dj_profile_id: string;
+  candidate_name?: string;
+  final_score?: number;
+  score: number; // 0..1 name similarity
+}
+
+export interface ProfileSummaryDTO {
+  profile_unique_id: string;
+  hit_count: number;
+  max_final_score?: number;
+  reviewed_count: number;
+  unreviewed_count: number;
+  last_updated_at?: string;
+}
+
 export interface CaseStatusDTO {
   id: number;
   profile_unique_id: string;
@@ -103,19 +174,100 @@ export interface AspectFeedbackCreateDTO {
   operator_comment?: string;
 }
 
+export interface CaseLogDTO {
+  id: number;
+  profile_unique_id: string;
+  dj_profile_id: string;
+  event_type: string;
+  payload?: any;
+  created_at: string;
+  operator_id?: number;
+  event_id?: string | null;
+}
+
+// Everything the review page needs; status is null until the case is first opened
+export interface CaseReviewDTO {
+  case: SourceCaseDTO;
+  status: CaseStatusDTO | null;
+  feedback: AspectFeedbackDTO[];
+  recent_logs: CaseLogDTO[];
+}
+
+// Applied by review:submit in one transaction
+export interface ReviewSubmissionDTO {
+  feedback?: AspectFeedbackCreateDTO[];
+  status?: { case_status?: string; aspects_status?: any };
+  logs?: { event_type: string; payload?: any }[];
+}
+
+export interface ReviewSubmissionResultDTO {
+  status: CaseStatusDTO | null;
+  feedback: AspectFeedbackDTO[];
+  logs: CaseLogDTO[];
+}
+
+export interface ListCasesParams {
+  skip?: number;
+  limit?: number;
+  profile_unique_id?: string;
+  case_status?: string;
+  min_score?: number;
+  max_score?: number;
+  candidate_name?: string;
+  cursor?: string;
+}
+
+export interface LogQueryParams {
+  operator_id?: number;
+  event_type?: string;
+  since?: string;
+  until?: string;
+  cursor?: string;
+  limit?: number;
+  // Read history moved out by scripts/archive_history.py
+  archived?: boolean;
+}
+
+export interface CasePageDTO<T = SourceCaseDTO> {
+  items: T[];
+  next_cursor?: string;
+}
+
 export const v2Api = {
-  listCases: (params?: { skip?: number; limit?: number; profile_unique_id?: string }): Promise<SourceCaseDTO[]> =>
+  listCases: (params?: ListCasesParams): Promise<SourceCaseDTO[]> =>
     api.get('/v2/cases', { params }).then(res => res.data),
+  // Keyset-paginated listing; next_cursor is absent on the last page
+  listCasesPage: (params?: ListCasesParams): Promise<CasePageDTO> =>
+    api.get('/v2/cases', { params }).then(res => ({ items: res.data, next_cursor: res.headers['x-next-cursor'] || undefined })),
+  listCaseSummariesPage: (params?: ListCasesParams): Promise<CasePageDTO<SourceCaseSummaryDTO>> =>
+    api.get('/v2/cases/summary', { params }).then(res => ({ items: res.data, next_cursor: res.headers['x-next-cursor'] || undefined })),
+  listProfilesPage: (params?: { cursor?: string; limit?: number; updated_since?: string }): Promise<CasePageDTO<ProfileSummaryDTO>> =>
+    api.get('/v2/profiles', { params }).then(res => ({ items: res.data, next_cursor: res.headers['x-next-cursor'] || undefined })),
+  searchCases: (params: { q: string; cursor?: string; limit?: number }): Promise<CasePageDTO<SearchHitDTO>> =>
+    api.get('/v2/search', { params }).then(res => ({ items: res.data, next_cursor: res.headers['x-next-cursor'] || undefined })),
+  listSimilarNames: (params: { name: string; limit?: number; min_score?: number }): Promise<SimilarNameDTO[]> =>
+    api.get('/v2/cases/similar-names', { params }).then(res => res.data),
   getCase: (profileId: string, djId: string): Promise<SourceCaseDTO> =>
     api.get(`/v2/cases/${profileId}/${djId}`).then(res => res.data),
+  getCaseRecord: (profileId: string, djId: string, section?: string): Promise<RecordViewDTO> =>
+    api.get(`/v2/cases/${profileId}/${djId}/record`, { params: section ? { section } : undefined }).then(res => res.data),
+  getCaseReview: (profileId: string, djId: string, params?: { log_limit?: number }): Promise<CaseReviewDTO> =>
+    api.get(`/v2/cases/${profileId}/${djId}/review`, { params }).then(res => res.data),
+  submitCaseReview: (profileId: string, djId: string, submission: ReviewSubmissionDTO): Promise<ReviewSubmissionResultDTO> =>
+    api.post(`/v2/cases/${profileId}/${djId}/review:submit`, submission).then(res => res.data),
   getCaseStatus: (profileId: string, djId: string): Promise<CaseStatusDTO> =>
     api.get(`/v2/cases/${profileId}/${djId}/status`).then(res => res.data),
   updateCaseStatus: (profileId: string, djId: string, payload: Partial<CaseStatusDTO>): Promise<CaseStatusDTO> =>
     api.patch(`/v2/cases/${profileId}/${djId}/status`, payload).then(res => res.data),
   batchGetCaseStatus: (payload: BatchCaseStatusRequestDTO): Promise<BatchCaseStatusResponseDTO> =>
     api.post('/v2/cases/status:batch', payload).then(res => res.data),
-  appendLog: (profileId: string, djId: string, payload: { event_type: string; payload?: any }) =>
+  appendLog: (profileId: string, djId: string, payload: { event_type: string; payload?: any }): Promise<CaseLogDTO> =>
     api.post(`/v2/cases/${profileId}/${djId}/logs`, payload).then(res => res.data),
+  // Oldest first; since is inclusive, until exclusive (ISO timestamps)
+  listCaseLogsPage: (profileId: string, djId: string, params?: LogQueryParams): Promise<CasePageDTO<CaseLogDTO>> =>
+    api.get(`/v2/cases/${profileId}/${djId}/logs`, { params }).then(res => ({ items: res.data, next_cursor: res.headers['x-next-cursor'] || undefined })),
+  listLogsPage: (params?: LogQueryParams): Promise<CasePageDTO<CaseLogDTO>> =>
+    api.get('/v2/logs', { params }).then(res => ({ items: res.data, next_cursor: res.headers['x-next-cursor'] || undefined })),
   createAspectFeedback: (profileId: string, djId: string, feedback: AspectFeedbackCreateDTO): Promise<AspectFeedbackDTO> =>
     api.post(`/v2/cases/${profileId}/${djId}/feedback`, feedback).then(res => res.data),
   getAspectFeedback: (profileId: string, djId: string): Promise<AspectFeedbackDTO[]> =>